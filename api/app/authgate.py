@@ -119,7 +119,9 @@ def _legacy_grants(token: str, path: str) -> bool:
 
 
 def _resolve(path: str, cookie_token: str, header_token: str, query_token: str):
-    """Runs in a worker thread — every branch here touches the database.
+    """Runs in a worker thread — any branch may touch the database, though a
+    credential seen in the last `auth_cache_seconds` resolves from memory
+    (services/auth.py) and the session below then never connects.
 
     Returns `(user, allowed)`. A legacy shared token yields `(None, True)`: it
     authenticates a machine, never a person, so it carries no admin rights and
@@ -22,6 +22,21 @@ class Settings(BaseSettings):
     # "local" -> invoke kicad-cli directly (handy for dev on the Mac)
     render_mode: str = "http"
     render_url: str = "http://localhost:8100"
+    # render_many(): previews per /render-batch call (one kicad-cli launch in
+    # the render container) and how many calls / local renders run at once.
+    render_batch_size: int = 25
+    render_concurrency: int = 4
+    # Project renders (services/project_render.py: board GLB, layer SVGs,
+    # schematic pages, DRC/ERC, BOM export) running at once per process — API
+    # replica or job worker; the render container's RENDER_WORKERS is the
+    # deployment-wide bound. Viewer requests jump the queue ahead of ingest
+    # and tag-push prewarming; snapshot prerender runs this many ops at once.
+    project_render_concurrency: int = 2
+    # Component preview cache budgets (services/render_cache.py): hot bodies
+    # in process memory, then render_cache_dir on disk, both LRU-evicted; the
+    # MinIO tier behind them is shared by all replicas and unbounded.
+    render_cache_memory_mb: int = 64
+    render_cache_disk_mb: int = 2048
     kicad_cli: str = "/Applications/KiCad/KiCad.app/Contents/MacOS/kicad-cli"
 
     # kicad-cli color themes for SVG previews. Theme names as shown in the
@@ -61,6 +76,11 @@ class Settings(BaseSettings):
     # UTC unless TZ is set).
     datasheet_recheck_nightly: bool = True
     datasheet_recheck_hour: int = 3
+    # Fetch runs keep one serial queue per supplier host, waiting
+    # `datasheet_domain_delay_s` between two requests to it; this many hosts
+    # are fetched from at once.
+    datasheet_fetch_domains: int = 6
+    datasheet_domain_delay_s: float = 0.3
 
     # Token expected in "Authorization: Token <...>" on /kicad/v1/* endpoints.
     httplib_token: str = "dev-token"
@@ -109,6 +129,14 @@ class Settings(BaseSettings):
     login_max_failures: int = 8
     login_lockout_minutes: int = 15
 
+    # Resolved sessions / API tokens kept in process memory (services/auth.py),
+    # so an authenticated request costs no database lookup. Sign-out, token
+    # revocation and user changes drop the entry on the replica that handled
+    # them; OTHER replicas keep honouring it for up to `auth_cache_seconds`.
+    # 0 = look up every request.
+    auth_cache_seconds: int = 30
+    auth_cache_size: int = 4096
+
     # ------------------------------------------------------------- projects
     # MinIO object storage: project snapshot archives, cached renders
     # (board layer SVGs, schematic SVGs, GLB/STEP, gerber bundles) and
@@ -118,6 +146,14 @@ class Settings(BaseSettings):
     minio_secret_key: str = "kicadlib-secret"
     minio_bucket: str = "kicadlib"
     minio_secure: bool = False
+    minio_region: str = "us-east-1"
+    # MinIO as reachable by CLIENTS (e.g. "https://files.example.com"). Set,
+    # firmware / production-file / attachment downloads answer with a
+    # redirect to a presigned URL valid `minio_presign_seconds`, and the bytes
+    # never pass through the API. Empty = the API streams them itself, which
+    # is what a MinIO on the internal network only allows.
+    minio_public_endpoint: str = ""
+    minio_presign_seconds: int = 900
 
     # Encrypts stored git tokens at rest (Fernet key derived via SHA-256).
     secret_key: str = "dev-secret-change-me"
@@ -131,6 +167,14 @@ class Settings(BaseSettings):
     # Refresh LCSC price ladders older than this many days on startup.
     price_ladder_max_age_days: int = 30
     price_ladder_autofetch: bool = True
+    # Supplier HTTP (services/supplier.py) — the LCSC detail fetches behind
+    # ladder refreshes and stock checks. Requests in flight at once per
+    # batch, sustained requests per second per supplier host (each process
+    # has its own budget), and how long an answer is reused from the
+    # `supplier_responses` table before asking again.
+    supplier_concurrency: int = 8
+    supplier_rate_per_s: float = 5.0
+    supplier_cache_minutes: int = 15
 
     # Touch the stored jlcpcb.com browser session this often (minutes; 0 = off).
     # The session's short-lived pieces — `secretkey` (25 min) and `XSRF-TOKEN`
@@ -166,6 +210,31 @@ class Settings(BaseSettings):
     httplib_timeout_categories_s: int = 3600
     httplib_timeout_parts_s: int = 600
 
+    # Worker processes for a full mirror rebuild (services/mirror.py): each
+    # top-level symbol library is generated in its own process, footprints and
+    # 3D models are written from a thread pool. Also the process pool that
+    # compresses new 3D models for the PCM models package (services/pcm.py).
+    # 0 = one per CPU core; 1 = the
+    # old serial in-process build (also what an incremental single-library
+    # update always uses — a pool is not worth its startup for one file).
+    mirror_workers: int = 0
+
+    # Events between persisted checkpoints of the stock-pool replay
+    # (services/pool_checkpoints.py, under data_dir/pool-checkpoints). A
+    # pool_state call replays only the events after the latest checkpoint that
+    # still matches the data; 0 = always replay from the first invoice.
+    pool_checkpoint_events: int = 2000
+
+    # Background job workers (services/jobs.py): threads in this API process
+    # that claim queued work — snapshot ingests, datasheet fetch runs, the PCM
+    # build, ladder refreshes — from the `jobs` table. Every replica runs
+    # them; `python -m app.worker` adds dedicated worker processes against the
+    # same database and data volume. 0 = this process only enqueues.
+    job_workers: int = 2
+    # Snapshot ingests running at once across ALL workers and replicas (each
+    # holds a checkout and runs kicad-cli BOM exports).
+    job_ingest_concurrency: int = 4
+
     @property
     def cors_origin_list(self) -> list[str]:
         return [o.strip() for o in self.cors_origins.split(",") if o.strip()]
@@ -21,6 +21,7 @@ from .routers import (
     jlc_import,
     jlc_stock,
     jlc_web,
+    jobs,
     kicad_http,
     kicad_sync,
     ledger,
@@ -91,6 +92,7 @@ app.include_router(jlc_import.router)
 app.include_router(ledger.router)
 app.include_router(run_costs.router)
 app.include_router(flasher.router)
+app.include_router(jobs.router)
 
 # Published-state file mirror, served read-only (sync + downloads).
 app.mount("/files", StaticFiles(directory=settings.mirror_dir), name="files")
@@ -234,6 +236,22 @@ _PHASE1_DDL = (
      "material_sha varchar(64) NOT NULL DEFAULT ''"),
     ("footprint_versions.recheck_required",
      "ALTER TABLE footprint_versions ADD COLUMN IF NOT EXISTS recheck_required boolean"),
+    # Component search (services/search_index.py). Without pg_trgm the
+    # substring match still works, as a scan of the narrow index table; the
+    # word index needs nothing beyond core Postgres.
+    ("pg_trgm", "CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    ("ix_component_search_trgm",
+     "CREATE INDEX IF NOT EXISTS ix_component_search_trgm "
+     "ON component_search USING gin (haystack gin_trgm_ops)"),
+    ("ix_component_search_tsv",
+     "CREATE INDEX IF NOT EXISTS ix_component_search_tsv "
+     "ON component_search USING gin (search_vector)"),
+    # As-of price resolution (services/ladder.py::history_points_at).
+    # create_all only indexes tables it creates; this one predates the index.
+    ("ix_price_history_asof",
+     "CREATE INDEX IF NOT EXISTS ix_price_history_asof "
+     "ON component_price_history (component_id, recorded_at, id) "
+     "WHERE points <> '[]'::jsonb"),
 )
 
 # name -> "ok" | "failed: ..."; served by GET /api/health/schema.
@@ -720,6 +738,12 @@ def startup() -> None:
     from .services import pcm
 
     pcm.start_background_build()
+    # Background job workers (services/jobs.py): ingests, fetch runs and the
+    # warm-ups queued above. Queued work survives a restart in the table; any
+    # replica or `python -m app.worker` process may pick it up.
+    from .services import jobs as job_queue
+
+    job_queue.start_workers(settings.job_workers)
 
 
 @app.get("/api/health")
@@ -734,6 +758,25 @@ def health():
     return {"ok": True, "db": db_ok}
 
 
+@app.get("/api/health/render-cache")
+def health_render_cache():
+    """Component preview cache counters (services/render_cache.py) — hits per
+    tier, misses, evictions and bytes against the budgets — plus the project
+    render gate's running and queued counts (services/project_render.py)."""
+    from .services import project_render, render_cache
+
+    return {**render_cache.stats(), "project_renders": project_render.gate_stats()}
+
+
+@app.get("/api/health/auth-cache")
+def health_auth_cache():
+    """Credential cache counters (services/auth.py): hits, misses, hit rate,
+    the average lookup a miss costs and the lookup time the hits saved."""
+    from .services import auth
+
+    return auth.cache_stats()
+
+
 @app.get("/api/health/schema")
 def health_schema():
     """Which additive schema statements landed on this database.
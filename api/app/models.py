@@ -14,6 +14,7 @@ from datetime import datetime, timezone
 
 from sqlalchemy import (
     Boolean,
+    Computed,
     DateTime,
     Float,
     ForeignKey,
@@ -25,7 +26,7 @@ from sqlalchemy import (
     UniqueConstraint,
     text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .db import Base
@@ -146,7 +147,10 @@ class FootprintVersion(Base):
 
 # ----------------------------------------------------------------- 3D models
 class Model3D(Base):
-    """3D model files, content-addressed. rel_path mirrors 3DModels/<rel_path>."""
+    """3D model files, content-addressed. rel_path mirrors 3DModels/<rel_path>.
+
+    `data` is deferred: listing or looking up models never pulls the blobs.
+    Read the bytes in chunks through services/model_blobs.py."""
 
     __tablename__ = "models3d"
 
@@ -154,7 +158,7 @@ class Model3D(Base):
     rel_path: Mapped[str] = mapped_column(String(500), unique=True)
     sha256: Mapped[str] = mapped_column(String(64))
     size_bytes: Mapped[int] = mapped_column(Integer)
-    data: Mapped[bytes] = mapped_column(LargeBinary)
+    data: Mapped[bytes] = mapped_column(LargeBinary, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
 
@@ -232,6 +236,41 @@ class ComponentProperty(Base):
     __table_args__ = (UniqueConstraint("component_version_id", "position", name="uq_property_position"),)
 
 
+class ComponentSearch(Base):
+    """Derived search row per component: the CURRENT published version's
+    browse fields, flattened so search, category filter and paging run as one
+    indexed query (services/search_index.py owns every write). `haystack` is
+    the lowercased name + every property value + category path, trigram-indexed
+    for substring match; `search_vector` is its word index. Both GIN indexes
+    are created by the startup DDL, because the trigram one needs pg_trgm.
+
+    `component_id` is a plain integer, like the `current_version_id` pointers:
+    the import station wipes components, and a derived table must not block it.
+    """
+
+    __tablename__ = "component_search"
+
+    component_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    component_version_id: Mapped[int] = mapped_column(Integer)
+    version_no: Mapped[int] = mapped_column(Integer)
+    status: Mapped[str] = mapped_column(String(20))
+    category_id: Mapped[int] = mapped_column(Integer, index=True)
+    category_path: Mapped[str] = mapped_column(Text, default="")
+    name: Mapped[str] = mapped_column(String(200), index=True)
+    base_component: Mapped[str] = mapped_column(String(200), default="")
+    mfg_pn: Mapped[str] = mapped_column(Text, default="")
+    manufacturer: Mapped[str] = mapped_column(Text, default="")
+    value: Mapped[str] = mapped_column(Text, default="")
+    description: Mapped[str] = mapped_column(Text, default="")
+    footprint: Mapped[str] = mapped_column(Text, default="")
+    lcsc: Mapped[str] = mapped_column(Text, default="")
+    # the footprint display name props_dict injected, so a rename is noticed
+    fp_display: Mapped[str] = mapped_column(String(200), default="")
+    haystack: Mapped[str] = mapped_column(Text, default="")
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('simple', haystack)", persisted=True))
+
+
 # -------------------------------------------------------- prices / datasheets
 class ComponentPrice(Base):
     """Auto-managed LCSC pricing — component-scoped (NOT versioned; prices are
@@ -641,6 +680,29 @@ class ComponentPriceHistory(Base):
     points: Mapped[list] = mapped_column(JSONB)
     recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, index=True)
 
+    # The as-of probe of `ladder.history_points_at`: one index descent per
+    # component either side of an instant. Empty snapshots are not candidates
+    # there, so they are left out of the index too.
+    __table_args__ = (
+        Index("ix_price_history_asof", "component_id", "recorded_at", "id",
+              postgresql_where=text("points <> '[]'::jsonb")),
+    )
+
+
+class SupplierResponse(Base):
+    """Short-lived cache of supplier API answers (services/supplier.py), keyed
+    like "lcsc:detail:C25804". Shared by every process, so a stock check
+    right after a ladder refresh — or the same BOM checked from two tabs —
+    does not ask LCSC again within `supplier_cache_minutes`. `body` NULL =
+    the supplier answered but knows no such part. Disposable: rows past
+    their TTL are pruned on write and nothing else reads them."""
+
+    __tablename__ = "supplier_responses"
+
+    key: Mapped[str] = mapped_column(String(200), primary_key=True)
+    body: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, index=True)
+
 
 class ComponentSupply(Base):
     """Supplier availability bookkeeping. `stock` is LCSC retail stock
@@ -986,6 +1048,26 @@ class SnapshotBomLine(Base):
     snapshot: Mapped[ProjectSnapshot] = relationship(back_populates="bom_lines")
 
 
+class ComponentUsage(Base):
+    """Derived where-used row: one matched BOM line of a project's LATEST
+    ready snapshot (services/usage_index.py owns every write), so "which
+    projects use this component" is one indexed read instead of two queries
+    per project. Plain integers, like `ComponentSearch`: a derived table must
+    not block deleting a snapshot, a project or the components."""
+
+    __tablename__ = "component_usage"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    component_id: Mapped[int] = mapped_column(Integer, index=True)
+    project_id: Mapped[int] = mapped_column(Integer, index=True)
+    snapshot_id: Mapped[int] = mapped_column(Integer)
+    board: Mapped[str] = mapped_column(String(200))
+    variant: Mapped[str] = mapped_column(String(100), default="")
+    refs: Mapped[str] = mapped_column(Text, default="")
+    qty: Mapped[int] = mapped_column(Integer, default=0)
+    dnp: Mapped[bool] = mapped_column(Boolean, default=False)
+
+
 class ProjectCostRevision(Base):
     """Immutable revision of a project's manual cost data — the cost items
     AND extra BOM items visible at a given commit, versioned together.
@@ -2127,3 +2209,47 @@ class LoginAttempt(Base):
     first_failed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     last_failed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+# ------------------------------------------------------------------ job queue
+class Job(Base):
+    """One unit of background work (services/jobs.py): a snapshot ingest, a
+    datasheet fetch run, a PCM build, a ladder refresh.
+
+    Postgres IS the queue. Workers — threads in every API replica plus any
+    number of `python -m app.worker` processes — claim rows with
+    `FOR UPDATE SKIP LOCKED`, so a queued job survives a restart and any
+    replica may run it. `dedupe_key` keeps one queued-or-running job per
+    logical task (the partial unique index below), which is what stops a
+    double click or two replicas' startup hooks from doing the work twice.
+    """
+
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(40))
+    payload: Mapped[dict] = mapped_column(JSONB, default=dict)
+    dedupe_key: Mapped[str] = mapped_column(String(200), default="")
+    # queued | running | done | failed
+    status: Mapped[str] = mapped_column(String(20), default="queued")
+    priority: Mapped[int] = mapped_column(Integer, default=0)  # lower runs first
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    run_after: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    locked_by: Mapped[str] = mapped_column(String(100), default="")
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # free-form, handler-written: stage, counters — what the status API shows
+    progress: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str] = mapped_column(Text, default="")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_job_claim", "status", "priority", "id"),
+        Index(
+            "uq_job_dedupe", "dedupe_key", unique=True,
+            postgresql_where=text("dedupe_key <> '' AND status IN ('queued', 'running')"),
+        ),
+    )
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from .. import models as M
 from ..db import get_db
+from ..services import catalog, search_index
 from .util import audit
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
@@ -73,6 +74,8 @@ def create(body: CategoryCreate, db: Session = Depends(get_db)):
     db.flush()
     audit(db, "category.create", "category", cat.id, {"name": body.name, "parent_id": body.parent_id})
     db.commit()
+    catalog.invalidate()  # categories.json lists every category by its path
+    search_index.refresh()
     return {"id": cat.id, "name": cat.name, "parent_id": cat.parent_id}
 
 
@@ -100,6 +103,10 @@ def update(cat_id: int, body: CategoryUpdate, db: Session = Depends(get_db)):
         cat.position = body.position
     audit(db, "category.update", "category", cat.id, changes)
     db.commit()
+    catalog.invalidate()  # a rename or move changes the path of the whole subtree
+    # Rewritten now, not invalidated: other replicas' component stamps do not
+    # move on a rename, so they would keep serving the old category_path.
+    search_index.refresh()
     return {"id": cat.id, "name": cat.name, "parent_id": cat.parent_id, "position": cat.position}
 
 
@@ -115,4 +122,6 @@ def delete(cat_id: int, db: Session = Depends(get_db)):
     db.delete(cat)
     audit(db, "category.delete", "category", cat_id, {"name": cat.name})
     db.commit()
+    catalog.invalidate()
+    search_index.refresh()
     return {"deleted": cat_id}
@@ -2,8 +2,11 @@
 SVG previews, and save-as-new-version."""
 from __future__ import annotations
 
+import base64
+
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Response, UploadFile
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
 from .. import models as M
@@ -20,7 +23,7 @@ from ..services.generator import (
     load_symbol_lib_from_text,
     property_row_to_dict,
 )
-from ..services import signoff
+from ..services import search_index, signoff
 from ..services.mirror import top_level_of, update_mirror_symbols
 from ..services.render import render_svg
 from .util import audit, category_and_descendant_ids, category_path, current_version, props_dict, resolved_value
@@ -77,18 +80,6 @@ def _datasheets_json(rows: list[M.Datasheet]) -> list[dict]:
     return out
 
 
-def _load_components(db: Session) -> list[M.Component]:
-    return (
-        db.query(M.Component)
-        .options(
-            selectinload(M.Component.versions).selectinload(M.ComponentVersion.properties),
-            selectinload(M.Component.versions).selectinload(M.ComponentVersion.category),
-        )
-        .order_by(M.Component.name)
-        .all()
-    )
-
-
 @router.get("")
 def list_components(
     q: str | None = None,
@@ -97,11 +88,26 @@ def list_components(
     page_size: int = Query(1000, ge=1, le=5000),
     db: Session = Depends(get_db),
 ):
-    comps = _load_components(db)
-    cat_ids = category_and_descendant_ids(db, category_id) if category_id else None
-    price_map = {p.component_id: (p.price_bulk, p.bulk_qty) for p in db.query(M.ComponentPrice)}
+    # One indexed query for search, category filter, order and page
+    # (services/search_index.py); only the page's rows are decorated below.
+    search_index.ensure(db)
+    S = M.ComponentSearch
+    query = db.query(S, M.Component).join(M.Component, M.Component.id == S.component_id)
+    if category_id:
+        query = query.filter(S.category_id.in_(category_and_descendant_ids(db, category_id)))
+    if q:
+        query = query.filter(search_index.text_filter(q))
+    total = query.count()
+    rows = query.order_by(S.name).offset((page - 1) * page_size).limit(page_size).all()
+
+    ids = [comp.id for _, comp in rows]
+    price_map = {
+        p.component_id: (p.price_bulk, p.bulk_qty)
+        for p in db.query(M.ComponentPrice).filter(M.ComponentPrice.component_id.in_(ids))
+    }
     ds_map: dict[int, str] = {}
-    for d in db.query(M.Datasheet).order_by(M.Datasheet.position.desc()):
+    for d in (db.query(M.Datasheet).filter(M.Datasheet.component_id.in_(ids))
+              .order_by(M.Datasheet.position.desc())):
         if d.source_url:
             ds_map[d.component_id] = d.source_url  # descending order → position 0 wins
 
@@ -109,21 +115,10 @@ def list_components(
     # `detail=False` so no version or property is loaded to derive a word the
     # list does not print. The badge sits on the browse list's critical path,
     # same reasoning as kicad_http.library_versions.
-    signoff_states = signoff.states_for(db, comps, detail=False)
+    signoff_states = signoff.states_for(db, [comp for _, comp in rows], detail=False)
 
     items = []
-    needle = q.lower() if q else None
-    for comp in comps:
-        cv = current_version(comp)
-        if cv is None:
-            continue
-        if cat_ids is not None and cv.category_id not in cat_ids:
-            continue
-        props = props_dict(cv)
-        if needle and needle not in comp.name.lower() and not any(
-            needle in (v or "").lower() for v in props.values()
-        ):
-            continue
+    for row, comp in rows:
         price_bulk, bulk_qty = price_map.get(comp.id, (None, None))
         items.append(
             {
@@ -131,27 +126,130 @@ def list_components(
                 "name": comp.name,
                 "in_library": comp.in_library,
                 "purchasable": comp.purchasable,
-                "mfg_pn": props.get("Manufacturer Part Number 1") or "",
-                "manufacturer": props.get("Manufacturer 1") or "",
-                "version_no": cv.version_no,
-                "status": cv.status,
-                "category_id": cv.category_id,
-                "category_path": category_path(cv.category),
-                "base_component": cv.base_component,
-                "description": resolved_value(props.get("ki_description"), props),
-                "value": props.get("Value") or "",
-                "footprint": (props.get("Footprint") or "").removeprefix("7Sigma:"),
-                "lcsc": props.get("LCSC Part") or "",
+                "mfg_pn": row.mfg_pn,
+                "manufacturer": row.manufacturer,
+                "version_no": row.version_no,
+                "status": row.status,
+                "category_id": row.category_id,
+                "category_path": row.category_path,
+                "base_component": row.base_component,
+                "description": row.description,
+                "value": row.value,
+                "footprint": row.footprint.removeprefix("7Sigma:"),
+                "lcsc": row.lcsc,
                 "price_bulk": price_bulk or "",
                 "bulk_qty": bulk_qty or "",
                 "datasheet": ds_map.get(comp.id) or "",
                 "signoff": signoff_states.get(comp.id, {}).get("state", "unsigned"),
             }
         )
+    return {"total": total, "page": page, "page_size": page_size, "items": items}
+
+
+# `GET /browse?fields=` columns, all straight off the search index except the
+# price pair (ComponentPrice) and the first datasheet link. `id` and `name` are
+# always returned: `name` is the keyset, `id` what the UI links by.
+_BROWSE_COLUMNS = {
+    "in_library": M.Component.in_library,
+    "purchasable": M.Component.purchasable,
+    "mfg_pn": M.ComponentSearch.mfg_pn,
+    "manufacturer": M.ComponentSearch.manufacturer,
+    "version_no": M.ComponentSearch.version_no,
+    "status": M.ComponentSearch.status,
+    "category_id": M.ComponentSearch.category_id,
+    "category_path": M.ComponentSearch.category_path,
+    "base_component": M.ComponentSearch.base_component,
+    "description": M.ComponentSearch.description,
+    "value": M.ComponentSearch.value,
+    "footprint": M.ComponentSearch.footprint,
+    "lcsc": M.ComponentSearch.lcsc,
+    "price_bulk": M.ComponentPrice.price_bulk,
+    "bulk_qty": M.ComponentPrice.bulk_qty,
+    "datasheet": (
+        select(M.Datasheet.source_url)
+        .where(M.Datasheet.component_id == M.ComponentSearch.component_id,
+               M.Datasheet.source_url.is_not(None), M.Datasheet.source_url != "")
+        .order_by(M.Datasheet.position)
+        .limit(1)
+        .scalar_subquery()
+    ),
+}
+# Not a column: derived per row by services/signoff.py, for the page only.
+_BROWSE_DERIVED = {"signoff"}
+
+
+def _encode_cursor(name: str) -> str:
+    return base64.urlsafe_b64encode(name.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (ValueError, UnicodeError):
+        raise HTTPException(422, "invalid cursor") from None
+
 
-    total = len(items)
-    start = (page - 1) * page_size
-    return {"total": total, "page": page, "page_size": page_size, "items": items[start : start + page_size]}
+@router.get("/browse")
+def browse_components(
+    q: str | None = None,
+    category_id: int | None = None,
+    fields: str = "",
+    cursor: str = "",
+    limit: int = Query(200, ge=1, le=2000),
+    db: Session = Depends(get_db),
+):
+    """Keyset-paginated browse: `limit` rows after `cursor` in name order,
+    carrying only the requested `fields` (comma-separated; empty = all).
+
+    Unlike `list_components` a page costs the same however deep it is — the
+    cursor is a `name >` seek on the search index, the projection and filters
+    are one SQL query, and nothing is built for rows the client did not ask
+    for. Pass back `next_cursor` until it comes back null.
+    """
+    wanted = [f.strip() for f in fields.split(",") if f.strip()] or [*_BROWSE_COLUMNS, *_BROWSE_DERIVED]
+    unknown = [f for f in wanted if f not in _BROWSE_COLUMNS and f not in _BROWSE_DERIVED
+               and f not in ("id", "name")]
+    if unknown:
+        raise HTTPException(422, f"unknown fields: {', '.join(unknown)}")
+    columns = [f for f in wanted if f in _BROWSE_COLUMNS]
+
+    search_index.ensure(db)
+    S = M.ComponentSearch
+    query = db.query(S.component_id, S.name, *(_BROWSE_COLUMNS[f].label(f) for f in columns))
+    query = query.join(M.Component, M.Component.id == S.component_id)
+    if "price_bulk" in columns or "bulk_qty" in columns:
+        query = query.outerjoin(M.ComponentPrice, M.ComponentPrice.component_id == S.component_id)
+    if category_id:
+        query = query.filter(S.category_id.in_(category_and_descendant_ids(db, category_id)))
+    if q:
+        query = query.filter(search_index.text_filter(q))
+    if cursor:
+        query = query.filter(S.name > _decode_cursor(cursor))
+    rows = query.order_by(S.name).limit(limit + 1).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+
+    states = {}
+    if "signoff" in wanted:
+        comps = db.query(M.Component).filter(M.Component.id.in_([r.component_id for r in rows])).all()
+        states = signoff.states_for(db, comps, detail=False)
+    items = []
+    for r in rows:
+        item = {"id": r.component_id, "name": r.name}
+        for f in columns:
+            v = getattr(r, f)
+            if f == "footprint":
+                v = v.removeprefix("7Sigma:")
+            elif f in ("price_bulk", "bulk_qty", "datasheet"):
+                v = v or ""
+            item[f] = v
+        if "signoff" in wanted:
+            item["signoff"] = states.get(r.component_id, {}).get("state", "unsigned")
+        items.append(item)
+    return {
+        "items": items,
+        "next_cursor": _encode_cursor(rows[-1].name) if more else None,
+    }
 
 
 def _get_component(db: Session, comp_id: int) -> M.Component:
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from .. import models as M
 from ..config import settings
 from ..db import get_db
+from ..services import jobs
 from ..services.datasheet_store import (
     FETCH_STATE,
     current_version,
@@ -42,7 +43,13 @@ def fetch_status(db: Session = Depends(get_db)):
                                          M.Datasheet.source_url.isnot(None)).count()
     with_copy = db.query(M.Datasheet).filter(M.Datasheet.archived.is_(False),
                                              M.Datasheet.current_version_id.isnot(None)).count()
-    return {**FETCH_STATE, "datasheets_total": total, "datasheets_with_local_copy": with_copy}
+    state = dict(FETCH_STATE)
+    # the run may be a job in another process: its progress is the truth
+    job = jobs.latest(db, "datasheet_fetch_all")
+    if job is not None:
+        state.update(job.progress or {})
+        state.update(running=job.status in ("queued", "running"), job_id=job.id, job_status=job.status)
+    return {**state, "datasheets_total": total, "datasheets_with_local_copy": with_copy}
 
 
 @router.post("/{ds_id}/fetch")
@@ -19,7 +19,7 @@ import struct
 from datetime import datetime, timezone
 
 from fastapi import (
-    APIRouter, Depends, File, Form, HTTPException, UploadFile, WebSocket,
+    APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, WebSocket,
     WebSocketDisconnect,
 )
 from fastapi.responses import Response
@@ -33,7 +33,7 @@ from ..services import storage
 from ..services import crypto
 from ..services.flasher import bundle, checks as checks_svc, validate
 from ..services.flasher.engine import RunEngine
-from .util import audit
+from .util import audit, object_download
 
 router = APIRouter(prefix="/api/flasher", tags=["flasher"])
 
@@ -245,17 +245,14 @@ def firmware_usage(asset_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/firmware/{asset_id}/bin")
-def firmware_bin(asset_id: int, db: Session = Depends(get_db)):
+def firmware_bin(asset_id: int, request: Request, db: Session = Depends(get_db)):
+    """Streamed, with the sha256 as ETag: a station that already holds this
+    image revalidates to a 304 without the API touching MinIO."""
     asset = db.get(M.FirmwareAsset, asset_id)
     if asset is None:
         raise HTTPException(404, "no such firmware asset")
-    data = storage.get_bytes(asset.minio_key)
-    if data is None:
-        raise HTTPException(410, "firmware bytes missing from storage")
-    return Response(
-        content=data, media_type="application/octet-stream",
-        headers={"Content-Disposition": f'attachment; filename="{asset.filename}"'},
-    )
+    return object_download(request, asset.minio_key, asset.filename, etag=asset.sha256,
+                           missing="firmware bytes missing from storage")
 
 
 class PublishIn(BaseModel):
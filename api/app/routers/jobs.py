@@ -0,0 +1,85 @@
+"""Background job queue status (services/jobs.py): what is queued, running,
+done or failed on any replica, with progress and errors; manual retry."""
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from .. import models as M
+from ..db import get_db
+from ..models import utcnow
+from ..services import jobs
+from .util import audit
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def _iso(dt) -> str | None:
+    return dt.isoformat() if dt else None
+
+
+def _job_json(j: M.Job) -> dict:
+    return {
+        "id": j.id,
+        "kind": j.kind,
+        "status": j.status,
+        "payload": j.payload,
+        "priority": j.priority,
+        "attempts": j.attempts,
+        "max_attempts": j.max_attempts,
+        "run_after": _iso(j.run_after),
+        "locked_by": j.locked_by,
+        "heartbeat_at": _iso(j.heartbeat_at),
+        "progress": j.progress,
+        "result": j.result,
+        "error": j.error,
+        "created_at": _iso(j.created_at),
+        "started_at": _iso(j.started_at),
+        "finished_at": _iso(j.finished_at),
+    }
+
+
+@router.get("")
+def list_jobs(status: str | None = None, kind: str | None = None,
+              limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
+    q = db.query(M.Job)
+    if status:
+        q = q.filter(M.Job.status == status)
+    if kind:
+        q = q.filter(M.Job.kind == kind)
+    return [_job_json(j) for j in q.order_by(M.Job.id.desc()).limit(limit)]
+
+
+@router.get("/stats")
+def job_stats(db: Session = Depends(get_db)):
+    """Counts per kind and status, each kind's concurrency cap, and the
+    worker threads in the process that answered."""
+    return jobs.stats(db)
+
+
+@router.get("/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    j = db.get(M.Job, job_id)
+    if j is None:
+        raise HTTPException(404, "job not found")
+    return _job_json(j)
+
+
+@router.post("/{job_id}/retry")
+def retry_job(job_id: int, db: Session = Depends(get_db)):
+    """Put a failed job back in the queue with a fresh set of attempts."""
+    j = db.get(M.Job, job_id)
+    if j is None:
+        raise HTTPException(404, "job not found")
+    if j.status != "failed":
+        raise HTTPException(409, f"job is {j.status}, only failed jobs can be retried")
+    if j.dedupe_key and db.query(M.Job.id).filter(
+            M.Job.dedupe_key == j.dedupe_key, M.Job.status.in_(("queued", "running"))).first():
+        raise HTTPException(409, "the same work is already queued or running")
+    j.status = "queued"
+    j.attempts = 0
+    j.run_after = utcnow()
+    j.finished_at = None
+    audit(db, "job.retry", "job", j.id, {"kind": j.kind})
+    db.commit()
+    return _job_json(j)
@@ -12,17 +12,23 @@ spec allows a category listing to carry only {id, name, description}, but
 KiCad treats a `fields` object as "this record is complete" and then never
 issues the per-part request — which is the difference between 15 requests and
 400+ to open the symbol chooser.
+
+`categories.json` and the category listings are served from the materialized
+snapshot in `services/catalog.py`, rebuilt on publish and revalidated with a
+strong ETag. The helpers below are what that snapshot is built from.
 """
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import Response
 from sqlalchemy.orm import Query, Session, contains_eager, defer, joinedload, selectinload
 
 from .. import models as M
 from ..config import settings
 from ..db import get_db
+from ..services import catalog
 from ..services.generator import base_hidden_maps, injected_props, schematic_field_visibility
-from .util import category_path, props_dict, resolved_value
+from .util import category_path, etag_matches, props_dict, resolved_value
 
 router = APIRouter(prefix="/kicad/v1", tags=["kicad-http-library"])
 
@@ -88,12 +94,28 @@ def root():
     return {"categories": "", "parts": ""}
 
 
-@router.get("/categories.json", dependencies=[Depends(require_token)])
-def categories(db: Session = Depends(get_db)):
+def categories_payload(db: Session) -> list[dict]:
     cats = db.query(M.Category).order_by(M.Category.position, M.Category.name).all()
     return [{"id": str(c.id), "name": category_path(c)} for c in cats]
 
 
+def snapshot_response(request: Request, db: Session, key: str) -> Response:
+    """One catalog document from the published snapshot, or a 304 when the
+    client already holds it. `db` is only used if there is no snapshot yet."""
+    etag, body = catalog.lookup(db, key)
+    # `no-cache` = store it, but revalidate every time: the snapshot changes on
+    # publish, and revalidation against an unchanged one is a bodiless 304.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/categories.json", dependencies=[Depends(require_token)])
+def categories(request: Request, db: Session = Depends(get_db)):
+    return snapshot_response(request, db, catalog.CATEGORIES_KEY)
+
+
 def datasheets_by_component(db: Session, comp_ids) -> dict[int, list[M.Datasheet]]:
     """Every component's datasheet rows, one query, WITHOUT the stored PDFs.
 
@@ -192,14 +214,10 @@ def part_payloads(db: Session, versions: list) -> list[dict]:
 
 
 @router.get("/parts/category/{cat_id}.json", dependencies=[Depends(require_token)])
-def parts_in_category(cat_id: int, db: Session = Depends(get_db)):
-    versions = (
-        library_versions(db)
-        .filter(M.ComponentVersion.category_id == cat_id)
-        .order_by(M.Component.name)
-        .all()
-    )
-    return part_payloads(db, versions)
+def parts_in_category(cat_id: int, request: Request, db: Session = Depends(get_db)):
+    # Built once per publish (services/catalog.py), not per request: every seat
+    # opens the chooser many times a day and the catalog only changes on publish.
+    return snapshot_response(request, db, catalog.parts_key(cat_id))
 
 
 @router.get("/parts/{part_id}.json", dependencies=[Depends(require_token)])
@@ -3,13 +3,11 @@ KiCad's Plugin and Content Manager), the .kicad_httplib config (built from
 the configured public URL + token) and the legacy kicadlib sync CLI."""
 from __future__ import annotations
 
-import io
 import json
-import zipfile
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import FileResponse, JSONResponse, Response
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -121,26 +119,31 @@ def pcm_models_delta(body: ModelsDeltaIn):
     """Incremental updates for the sync plugin: a compressed batch of just
     the requested 3D model files (LZMA — ~2x smaller than deflate on STEP
     text), so adding one model never re-downloads the 300+ MB full package.
-    Oversized deltas get 413 — the plugin falls back to the full zip."""
+    Oversized deltas get 413 — the plugin falls back to the full zip.
+
+    Members come from pcm's content-addressed LZMA cache — the many plugins
+    asking for the same delta after a publish share one compression — and
+    the zip is streamed as it is assembled."""
     if not body.paths:
         raise HTTPException(422, "no paths requested")
     if len(body.paths) > DELTA_MAX_FILES:
         raise HTTPException(413, "delta too large — download the full models package")
     root = settings.mirror_dir
-    buf = io.BytesIO()
+    files = []
     total = 0
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_LZMA) as zf:
-        for rel in body.paths:
-            if not rel.startswith("3DModels/") or ".." in rel:
-                raise HTTPException(422, f"invalid path: {rel}")
-            f = root / rel
-            if not f.is_file():
-                raise HTTPException(404, f"not in mirror: {rel}")
-            total += f.stat().st_size
-            if total > DELTA_MAX_BYTES:
-                raise HTTPException(413, "delta too large — download the full models package")
-            zf.write(f, rel)
-    return Response(content=buf.getvalue(), media_type="application/zip")
+    for rel in body.paths:
+        if not rel.startswith("3DModels/") or ".." in rel:
+            raise HTTPException(422, f"invalid path: {rel}")
+        f = root / rel
+        if not f.is_file():
+            raise HTTPException(404, f"not in mirror: {rel}")
+        total += f.stat().st_size
+        if total > DELTA_MAX_BYTES:
+            raise HTTPException(413, "delta too large — download the full models package")
+        files.append((rel, f))
+    # compressed up front: a failure is still an HTTP error, not a torn zip
+    members = pcm.delta_members(files)
+    return StreamingResponse(pcm.stream_zip(members), media_type="application/zip")
 
 
 @router.get("/pcm/{filename}")
@@ -22,7 +22,7 @@ from ..services.geometry_proposals import (
     set_footprint_header,
     set_symbol_entry_name,
 )
-from ..services.mirror import top_level_of, update_mirror_symbols, write_manifest
+from ..services.mirror import remove_file, top_level_of, update_mirror_symbols, write_manifest
 from ..services.render import render_svg
 from .util import audit
 
@@ -372,11 +372,7 @@ def delete_footprint(fp_id: int, db: Session = Depends(get_db)):
           {"name": name, "versions_removed": n_versions, "source_text": source})
     db.commit()
 
-    removed = False
-    path = settings.mirror_dir / "Footprints" / "7Sigma.pretty" / f"{name}.kicad_mod"
-    if path.exists():
-        path.unlink()
-        removed = True
+    removed = remove_file(settings, settings.mirror_dir / "Footprints" / "7Sigma.pretty" / f"{name}.kicad_mod")
     return {"deleted": fp_id, "name": name, "versions_removed": n_versions,
             "mirror_file_removed": removed, "manifest_files": write_manifest(settings)}
 
@@ -75,6 +75,6 @@ async def upload_model3d(rel_path: str, file: UploadFile = File(...), db: Sessio
     audit(db, action, "model3d", m.id, details={"rel_path": rel_path, "size_bytes": len(data)})
     db.commit()
 
-    mirror_result = update_mirror_model3d(settings, m)
+    mirror_result = update_mirror_model3d(db, settings, m)
     return {"ok": True, "rel_path": m.rel_path, "sha256": m.sha256, "size_bytes": m.size_bytes,
             "mirror": mirror_result}
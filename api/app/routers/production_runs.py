@@ -5,7 +5,7 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 from fastapi.responses import Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -13,7 +13,7 @@ from sqlalchemy.orm import Session
 from .. import models as M
 from ..db import get_db
 from ..services import production, project_bom, run_actuals, storage
-from .util import audit
+from .util import audit, object_download
 
 router = APIRouter(prefix="/api", tags=["production-runs"])
 
@@ -284,7 +284,7 @@ async def upload_attachment(run_id: int, file: UploadFile = File(...), db: Sessi
 
 
 @router.get("/run-attachments/{attachment_id}")
-def download_attachment(attachment_id: int, inline: bool = False,
+def download_attachment(attachment_id: int, request: Request, inline: bool = False,
                         db: Session = Depends(get_db)):
     """`inline=true` serves the bytes for display instead of download, so a
     scanned invoice opens in the browser's PDF viewer (the same treatment
@@ -292,15 +292,8 @@ def download_attachment(attachment_id: int, inline: bool = False,
     a = db.get(M.RunAttachment, attachment_id)
     if a is None:
         raise HTTPException(404, "attachment not found")
-    data = storage.get_bytes(a.minio_key)
-    if data is None:
-        raise HTTPException(410, "attachment bytes missing from storage")
-    disposition = "inline" if inline else "attachment"
-    return Response(
-        content=data,
-        media_type=a.content_type,
-        headers={"Content-Disposition": f'{disposition}; filename="{a.filename}"'},
-    )
+    return object_download(request, a.minio_key, a.filename, media_type=a.content_type,
+                           inline=inline, missing="attachment bytes missing from storage")
 
 
 @router.delete("/run-attachments/{attachment_id}")
@@ -380,18 +373,12 @@ def production_generate(run_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/production-files/{file_id}")
-def production_file(file_id: int, db: Session = Depends(get_db)):
+def production_file(file_id: int, request: Request, db: Session = Depends(get_db)):
     f = db.get(M.ProductionFile, file_id)
     if f is None:
         raise HTTPException(404, "file not found")
-    data = storage.get_bytes(f.minio_key)
-    if data is None:
-        raise HTTPException(410, "file bytes missing from storage")
-    return Response(
-        content=data,
-        media_type="application/octet-stream",
-        headers={"Content-Disposition": f'attachment; filename="{f.filename}"'},
-    )
+    return object_download(request, f.minio_key, f.filename,
+                           missing="file bytes missing from storage")
 
 
 @router.delete("/production-sets/{set_id}")
@@ -12,7 +12,17 @@ from .. import models as M
 from ..config import settings
 from ..db import get_db
 from ..models import utcnow
-from ..services import cost_state, fx, gitrepo, ladder, project_bom, project_ingest, project_render, storage
+from ..services import (
+    cost_state,
+    fx,
+    gitrepo,
+    ladder,
+    project_bom,
+    project_ingest,
+    project_render,
+    storage,
+    usage_index,
+)
 from ..services.crypto import decrypt_token, encrypt_token
 from .util import audit
 
@@ -180,6 +190,7 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
     db.delete(p)
     audit(db, "project.delete", "project", project_id, {"name": p.name})
     db.commit()
+    usage_index.refresh_project(project_id)
     storage.delete_prefix(f"projects/{project_id}/")
     import shutil
 
@@ -268,7 +279,8 @@ def list_snapshots(project_id: int, db: Session = Depends(get_db)):
         .order_by(M.ProjectSnapshot.created_at.desc())
         .all()
     )
-    return [_snap_json(s) for s in snaps]
+    stages = project_ingest.active_stages(db)
+    return [_snap_json(s, stages.get(s.id)) for s in snaps]
 
 
 @router.post("/projects/{project_id}/snapshots")
@@ -283,15 +295,15 @@ def ingest_snapshot(project_id: int, body: IngestIn, db: Session = Depends(get_d
         raise HTTPException(404, f"unknown ref: {e}") from e
     tag_names = {t["name"]: t["sha"] for t in gitrepo.tags(p.id)}
     is_tag = ref in tag_names
-    project_ingest.start_ingest(p.id, sha, ref_name=ref, is_tag=is_tag)
-    audit(db, "project.ingest", "project", p.id, {"ref": ref, "sha": sha})
+    job_id = project_ingest.start_ingest(db, p.id, sha, ref_name=ref, is_tag=is_tag)
+    audit(db, "project.ingest", "project", p.id, {"ref": ref, "sha": sha, "job_id": job_id})
     db.commit()
-    return {"status": "started", "sha": sha}
+    return {"status": "queued" if job_id else "already queued", "sha": sha, "job_id": job_id}
 
 
 @router.get("/snapshots/{snapshot_id}")
 def get_snapshot(snapshot_id: int, db: Session = Depends(get_db)):
-    return _snap_json(_snapshot(db, snapshot_id))
+    return _snap_json(_snapshot(db, snapshot_id), project_ingest.active_stages(db).get(snapshot_id))
 
 
 @router.delete("/snapshots/{snapshot_id}")
@@ -301,6 +313,7 @@ def delete_snapshot(snapshot_id: int, db: Session = Depends(get_db)):
     db.delete(s)
     audit(db, "snapshot.delete", "project_snapshot", snapshot_id)
     db.commit()
+    usage_index.refresh_project(project_id)
     storage.delete_prefix(f"projects/{project_id}/renders/{sha}/")
     storage.delete_prefix(f"projects/{project_id}/snapshots/{sha}/")
     return {"deleted": snapshot_id}
@@ -330,8 +343,8 @@ def snapshot_bom_curve(snapshot_id: int, board: str, variant: str = "",
         vols = sorted({max(1, int(v)) for v in volumes.split(",") if v.strip()})
     except ValueError:
         raise HTTPException(422, "volumes must be a comma-separated list of integers") from None
-    if len(vols) > 12:
-        raise HTTPException(422, "at most 12 volumes")
+    if len(vols) > 60:
+        raise HTTPException(422, "at most 60 volumes")
     return project_bom.cost_curve(db, p, s, board, variant, vols, currency)
 
 
@@ -755,41 +768,12 @@ def delete_note(note_id: int, db: Session = Depends(get_db)):
 
 @router.get("/components/{comp_id}/where-used")
 def where_used(comp_id: int, db: Session = Depends(get_db)):
-    """Projects whose latest ready snapshot uses this component."""
+    """Projects whose latest ready snapshot uses this component
+    (services/usage_index.py)."""
     if db.get(M.Component, comp_id) is None:
         raise HTTPException(404, "component not found")
-    out = []
-    for p in db.query(M.Project).order_by(M.Project.name).all():
-        latest = (
-            db.query(M.ProjectSnapshot)
-            .filter_by(project_id=p.id, status="ready")
-            .order_by(M.ProjectSnapshot.created_at.desc())
-            .first()
-        )
-        if latest is None:
-            continue
-        lines = (
-            db.query(M.SnapshotBomLine)
-            .filter_by(snapshot_id=latest.id, component_id=comp_id)
-            .all()
-        )
-        if not lines:
-            continue
-        out.append(
-            {
-                "project_id": p.id,
-                "project_name": p.name,
-                "snapshot_id": latest.id,
-                "ref": latest.ref_name,
-                "sha": latest.sha,
-                "usages": [
-                    {"board": li.board, "variant": li.variant, "refs": li.refs,
-                     "qty": li.qty, "dnp": li.dnp}
-                    for li in lines
-                ],
-            }
-        )
-    return out
+    usage_index.ensure(db)
+    return usage_index.where_used(db, [comp_id]).get(comp_id, [])
 
 
 # ---------------------------------------------------------------------- FX
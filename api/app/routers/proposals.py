@@ -11,9 +11,9 @@ from sqlalchemy.orm import Session, selectinload
 from .. import models as M
 from ..config import settings
 from ..db import get_db
-from ..services import material, signoff
+from ..services import material, signoff, usage_index
 from ..services.mirror import top_level_of, update_mirror_footprint, update_mirror_symbols
-from ..services.render import render_svg
+from ..services.render import prewarm, render_svg
 from ..services.repoint import repoint_for
 from .util import actor_of, audit, category_path
 
@@ -83,12 +83,26 @@ def list_proposals(db: Session = Depends(get_db)):
             "comment": sv.comment,
             "status": sv.status,
         })
+    # The review page shows a draft and a current preview per geometry
+    # proposal; rendering them all now, in batches, means its image requests
+    # find them cached instead of each launching kicad-cli in turn.
+    previews: list[tuple[str, str, str]] = []
     for kind, ver_model, parent_attr in (("symbol", M.SymbolVersion, "symbol"),
                                          ("footprint", M.FootprintVersion, "footprint")):
-        drafts_g = (db.query(ver_model).filter(ver_model.status == "draft")
+        drafts_g = (db.query(ver_model)
+                    .options(selectinload(getattr(ver_model, parent_attr)))
+                    .filter(ver_model.status == "draft")
                     .order_by(ver_model.created_at.desc()).all())
+        # The current versions of every parent in one query, not one per row.
+        current_ids = {getattr(v, parent_attr).current_version_id for v in drafts_g} - {None}
+        current = ({x.id: x for x in db.query(ver_model).filter(ver_model.id.in_(current_ids))}
+                   if current_ids else {})
         for v in drafts_g:
             parent = getattr(v, parent_attr)
+            previews.append((kind, parent.name, v.source_text))
+            cur = current.get(parent.current_version_id)
+            if cur is not None:
+                previews.append((kind, parent.name, cur.source_text))
             out.append({
                 "kind": kind,
                 "proposal_id": v.id,
@@ -104,6 +118,7 @@ def list_proposals(db: Session = Depends(get_db)):
                 "status": v.status,
             })
     out.sort(key=lambda x: x["created_at"], reverse=True)
+    prewarm(previews)
     return out
 
 
@@ -325,12 +340,13 @@ def geometry_material_diff(kind: str, ver_id: int, db: Session = Depends(get_db)
     affected = _components_using(db, kind, parent)
     states = signoff.states_for(db, affected, detail=False)
     signed = sum(1 for s in states.values() if s["state"] == "signed")
+    projects = _projects_using(db, affected)
 
     if cur is None:
         return {"kind": kind, "name": parent.name, "is_new": True, "same_material": False,
                 "changed": ["this is a new template — there is nothing to compare against"],
                 "suggest_recheck": True, "affected_components": len(affected),
-                "affected_signed": signed}
+                "affected_signed": signed, "affected_projects": projects}
 
     old_sha = signoff.ensure_material_sha(cur, kind)
     new_sha = signoff.ensure_material_sha(v, kind)
@@ -350,6 +366,7 @@ def geometry_material_diff(kind: str, ver_id: int, db: Session = Depends(get_db)
         "suggest_recheck": not same,
         "affected_components": len(affected),
         "affected_signed": signed,
+        "affected_projects": projects,
     }
 
 
@@ -374,6 +391,23 @@ def _components_using(db: Session, kind: str, parent) -> list[M.Component]:
     )
 
 
+def _projects_using(db: Session, components: list[M.Component]) -> list[dict]:
+    """Projects whose latest ready snapshot places any of `components`, with
+    which of them — the boards a geometry change reaches on their next
+    re-ingest. One read of the where-used index."""
+    usage_index.ensure(db)
+    names = {c.id: c.name for c in components}
+    by_project: dict[int, dict] = {}
+    for cid, projects in usage_index.where_used(db, names).items():
+        for p in projects:
+            entry = by_project.setdefault(p["project_id"], {
+                "project_id": p["project_id"], "project_name": p["project_name"],
+                "ref": p["ref"], "components": [],
+            })
+            entry["components"].append(names[cid])
+    return sorted(by_project.values(), key=lambda e: e["project_name"])
+
+
 @router.post("/symbols/{ver_id}/approve")
 def approve_symbol(ver_id: int, request: Request, body: GeometryApproveIn | None = None,
                    db: Session = Depends(get_db)):
@@ -193,6 +193,7 @@ def update_user(user_id: int, body: UserPatch, db: Session = Depends(get_db),
             raise HTTPException(409, "this is the only administrator")
         user.role = body.role
         changed["role"] = body.role
+        auth.forget_user(db, user.id)
     if body.active is not None and body.active != user.active:
         if admin is not None and user.id == admin.id and not body.active:
             raise HTTPException(409, "you cannot deactivate yourself")
@@ -232,6 +233,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db),
     if user.role == "admin" and _admin_count(db) <= 1:
         raise HTTPException(409, "this is the only administrator")
     username = user.username
+    auth.forget_user(db, user.id)
     db.delete(user)  # tokens and sessions cascade
     audit(db, "user.delete", "user", user_id, details={"username": username},
           actor=_actor(admin))
@@ -278,7 +280,7 @@ def revoke_token(user_id: int, token_id: int, db: Session = Depends(get_db),
     tok = db.get(M.ApiToken, token_id)
     if tok is None or tok.user_id != user_id:
         raise HTTPException(404, "no such token")
-    tok.revoked_at = auth.utcnow()
+    auth.revoke_token(db, tok)
     audit(db, "user.token_revoke", "user", user_id, details={"prefix": tok.prefix},
           actor=_actor(admin))
     db.commit()
@@ -1,9 +1,15 @@
 """Shared helpers for routers."""
 from __future__ import annotations
 
+import re
+
+from fastapi import HTTPException, Request
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 
 from .. import models as M
+from ..config import settings
+from ..services import storage
 from ..services.templates import has_template, resolve_templates
 
 
@@ -61,6 +67,94 @@ def resolved_value(value: str | None, props: dict[str, str | None]) -> str:
     return value
 
 
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Does an `If-None-Match` header value cover `etag`?
+
+    The weak comparison RFC 9110 prescribes for this header: a `W/` prefix is
+    ignored, a list matches if any member does, and `*` matches anything.
+    """
+    for candidate in (if_none_match or "").split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def _byte_range(header: str, size: int) -> tuple[int, int] | None | bool:
+    """The one `bytes=` range in a `Range` header as (start, end inclusive);
+    None to serve the whole object (no header, or one we do not support —
+    multiple ranges, other units); False when it cannot be satisfied."""
+    m = _RANGE.fullmatch(header.strip()) if header else None
+    if m is None:
+        return None
+    first, last = m.groups()
+    if not first:
+        if not last:
+            return None
+        n = int(last)  # suffix: the final n bytes
+        return (max(size - n, 0), size - 1) if n and size else False
+    start = int(first)
+    if start >= size:
+        return False
+    end = min(int(last), size - 1) if last else size - 1
+    return (start, end) if end >= start else None
+
+
+def object_download(request: Request, key: str, filename: str, *, etag: str = "",
+                    media_type: str = "application/octet-stream", inline: bool = False,
+                    missing: str = "bytes missing from storage") -> Response:
+    """Serve a MinIO object as a download without loading it into memory.
+
+    `etag` is the object's content hash when the row records one (firmware's
+    sha256) — then a revalidating client gets its 304 without MinIO being
+    asked at all; otherwise MinIO's own ETag is used. A single `Range` is
+    answered with a 206 read from that offset (resumed transfers, bench
+    tools fetching a header), guarded by `If-Range`. With
+    `minio_public_endpoint` set the client is redirected to a presigned URL
+    instead and MinIO serves the bytes and the ranges.
+
+    Every key served here is write-once (content hash or uuid in the name),
+    so `no-cache` only costs a conditional request per use.
+    """
+    disposition = f'{"inline" if inline else "attachment"}; filename="{filename}"'
+    headers = {"Cache-Control": "private, no-cache", "Accept-Ranges": "bytes"}
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+        if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    url = storage.presigned_url(key, settings.minio_presign_seconds, {
+        "response-content-disposition": disposition, "response-content-type": media_type,
+    })
+    if url:
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-store"})
+    info = storage.stat(key)
+    if info is None:
+        raise HTTPException(410, missing)
+    if not etag and info.etag:
+        headers["ETag"] = f'"{info.etag}"'
+        if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = disposition
+    rng = _byte_range(request.headers.get("range", ""), info.size)
+    if_range = request.headers.get("if-range", "")
+    if rng is not None and if_range and if_range != headers.get("ETag"):
+        rng = None  # the client's partial copy is of another version: send it all
+    if rng is False:
+        headers["Content-Range"] = f"bytes */{info.size}"
+        return Response(status_code=416, headers=headers)
+    if rng is None:
+        headers["Content-Length"] = str(info.size)
+        return StreamingResponse(storage.stream(key), media_type=media_type, headers=headers)
+    start, end = rng
+    headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(storage.stream(key, start, end - start + 1), status_code=206,
+                             media_type=media_type, headers=headers)
+
+
 def audit(db: Session, action: str, entity_type: str, entity_id, details: dict | None = None,
           actor: str = "user") -> None:
     db.add(M.AuditLog(actor=actor, action=action, entity_type=entity_type,
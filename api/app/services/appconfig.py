@@ -175,6 +175,17 @@ def apply_overrides(db: Session) -> int:
     return n
 
 
+def reload_overrides(db: Session) -> int:
+    """`apply_overrides` for a process that did not make the change itself
+    (`python -m app.worker` re-reads before every job): a knob whose
+    override was cleared meanwhile goes back to its environment value."""
+    stored = _rows(db)
+    for key, value in _BASELINE.items():
+        if key not in stored:
+            setattr(settings, key, value)
+    return apply_overrides(db)
+
+
 def set_override(db: Session, key: str, raw: str, actor: str = "user") -> Knob:
     knob = BY_KEY.get(key)
     if knob is None:
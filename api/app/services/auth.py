@@ -19,16 +19,29 @@ Two credential families, deliberately different:
   a call. Passwords, which are low-entropy, get argon2id.
 
 See `models.py::ApiToken` for why the token is also stored encrypted.
+
+Both lookups sit in front of EVERY authenticated request — each KiCad
+catalog call, each mirror file the sync plugin fetches — so a resolved
+credential is cached in process for `auth_cache_seconds`, keyed by its
+digest. Everything that ends a credential here (`end_session`,
+`end_all_sessions`, `revoke_token`, `forget_user`) drops the entry on this
+process at once; another replica keeps serving it until its entry expires,
+which is what bounds the TTL.
 """
 from __future__ import annotations
 
 import hashlib
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 
 from argon2 import PasswordHasher
 from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from .. import models as M
 from ..config import settings
@@ -56,6 +69,96 @@ def _aware(value: datetime | None) -> datetime | None:
     return value.replace(tzinfo=timezone.utc)
 
 
+# ------------------------------------------------------------ resolve cache
+# digest-keyed ("s:" session id, "t:" token — the latter IS `token_hash`)
+# -> (expires at, monotonic; user id; the user's column values)
+_cache: OrderedDict[str, tuple[float, int, dict]] = OrderedDict()
+_cache_lock = threading.Lock()
+# Bumped by every invalidation. A lookup that started before one may have
+# read the row it invalidated, so it does not get to cache its answer.
+_generation = 0
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+_miss_seconds = 0.0
+
+
+def _cached(key: str) -> M.User | None:
+    """A detached copy of the cached user — never the shared values, since
+    handlers assign to `request.state.user` (a password change does)."""
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        _cache.move_to_end(key)
+        _cache_stats["hits"] += 1
+        cols = entry[2]
+    user = M.User(**cols)
+    make_transient_to_detached(user)
+    return user
+
+
+def _remember(key: str, user: M.User, generation: int, started: float,
+              until: datetime | None = None) -> None:
+    global _miss_seconds
+    ttl = float(settings.auth_cache_seconds)
+    if until is not None:
+        ttl = min(ttl, (until - utcnow()).total_seconds())
+    cols = {a.key: getattr(user, a.key) for a in sa_inspect(M.User).column_attrs}
+    with _cache_lock:
+        _miss_seconds += time.perf_counter() - started
+        if ttl <= 0 or generation != _generation or settings.auth_cache_size <= 0:
+            return
+        _cache[key] = (time.monotonic() + ttl, user.id, cols)
+        _cache.move_to_end(key)
+        while len(_cache) > settings.auth_cache_size:
+            _cache.popitem(last=False)
+            _cache_stats["evictions"] += 1
+
+
+def _lookup_start() -> tuple[int, float]:
+    with _cache_lock:
+        _cache_stats["misses"] += 1
+        return _generation, time.perf_counter()
+
+
+def _drop(keys: set[str] = frozenset(), user_id: int | None = None) -> None:
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        doomed = [k for k, (_, uid, _) in _cache.items() if k in keys or uid == user_id]
+        for k in doomed:
+            del _cache[k]
+        _cache_stats["invalidations"] += len(doomed)
+
+
+def _forget(db: Session, keys: set[str] = frozenset(), user_id: int | None = None) -> None:
+    """Drop entries now AND once `db` commits: a lookup racing the caller's
+    transaction still reads the old row and could otherwise re-cache it."""
+    _drop(keys, user_id)
+    event.listen(db, "after_commit", lambda _s: _drop(keys, user_id), once=True)
+
+
+def forget_user(db: Session, user_id: int) -> None:
+    """Re-read this user on their next request — for a change that must take
+    effect at once but ends no credential (role, delete)."""
+    _forget(db, user_id=user_id)
+
+
+def cache_stats() -> dict:
+    with _cache_lock:
+        lookups = _cache_stats["hits"] + _cache_stats["misses"]
+        miss_ms = 1000 * _miss_seconds / _cache_stats["misses"] if _cache_stats["misses"] else None
+        return {
+            **_cache_stats,
+            "hit_rate": round(_cache_stats["hits"] / lookups, 4) if lookups else None,
+            "entries": len(_cache),
+            "size_limit": settings.auth_cache_size,
+            "ttl_seconds": settings.auth_cache_seconds,
+            "avg_lookup_ms": round(miss_ms, 3) if miss_ms is not None else None,
+            # What the hits would have cost had each been a lookup.
+            "saved_ms_est": round(miss_ms * _cache_stats["hits"], 1) if miss_ms is not None else None,
+        }
+
+
 # --------------------------------------------------------------- passwords
 def normalize_username(name: str) -> str:
     return name.strip().lower()
@@ -139,6 +242,11 @@ def resolve_token(db: Session, raw: str) -> M.User | None:
     """
     if not raw:
         return None
+    key = "t:" + _digest(raw)
+    cached = _cached(key)
+    if cached is not None:
+        return cached
+    generation, started = _lookup_start()
     tok = (
         db.query(M.ApiToken)
         .filter(M.ApiToken.token_hash == _digest(raw), M.ApiToken.revoked_at.is_(None))
@@ -154,9 +262,16 @@ def resolve_token(db: Session, raw: str) -> M.User | None:
     if last is None or now - last > _TOUCH_INTERVAL:
         tok.last_used_at = now
         db.commit()
+    _remember(key, user, generation, started)
     return user
 
 
+def revoke_token(db: Session, tok: M.ApiToken) -> None:
+    """The caller commits."""
+    tok.revoked_at = utcnow()
+    _forget(db, keys={"t:" + tok.token_hash})
+
+
 def is_legacy_token(raw: str) -> bool:
     """A pre-auth shared secret from the environment. Never an identity."""
     if not settings.auth_legacy_tokens or not raw:
@@ -186,6 +301,11 @@ def resolve_session(db: Session, sid: str) -> M.User | None:
     """
     if not sid:
         return None
+    key = "s:" + _digest(sid)
+    cached = _cached(key)
+    if cached is not None:
+        return cached
+    generation, started = _lookup_start()
     row = db.get(M.UserSession, sid)
     if row is None:
         return None
@@ -206,10 +326,12 @@ def resolve_session(db: Session, sid: str) -> M.User | None:
     if last is None or now - last > _TOUCH_INTERVAL:
         row.last_seen_at = now
         db.commit()
+    _remember(key, user, generation, started, until=_aware(row.expires_at))
     return user
 
 
 def end_session(db: Session, sid: str) -> None:
+    _forget(db, keys={"s:" + _digest(sid)})
     row = db.get(M.UserSession, sid)
     if row is not None:
         db.delete(row)
@@ -217,7 +339,10 @@ def end_session(db: Session, sid: str) -> None:
 
 def end_all_sessions(db: Session, user_id: int) -> int:
     """Sign a user out everywhere. Used on deactivate, delete and password
-    change — a changed password that leaves live sessions is not a change."""
+    change — a changed password that leaves live sessions is not a change.
+    Also drops the user's cached TOKENS, which costs them one lookup each and
+    makes a deactivation refuse those at once too."""
+    _forget(db, user_id=user_id)
     rows = db.query(M.UserSession).filter(M.UserSession.user_id == user_id).all()
     for row in rows:
         db.delete(row)
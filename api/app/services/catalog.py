@@ -0,0 +1,203 @@
+"""Materialized KiCad HTTP catalog — the bodies `routers/kicad_http.py` serves.
+
+Every seat opens the symbol chooser many times a day, and each open asks for
+`categories.json` plus one `parts/category/{id}.json` per category. Building
+those answers from the DB per request repeats the same four lookups
+(`library_versions`, `datasheets_by_component`, `base_hidden_maps`,
+`schematic_field_visibility`) for a catalog that only changes when something is
+published. So the whole catalog is built ONCE per publish — from
+`mirror.update_mirror_symbols` and friends — serialized to the exact bytes the
+endpoint returns, and stored under DATA_DIR/catalog:
+
+    catalog/
+      index.json          {"settings": ..., "entries": {key: digest}}
+      <digest>.json       one body, named by its own content hash
+
+Bodies are content-addressed, so an index written by a newer build never
+points at an older file, and the ETag a client revalidates with IS the name.
+`index.json` is replaced atomically and is the only file a reader stats; a
+request against an unchanged catalog is served from memory with no Postgres
+query at all, and `If-None-Match` turns it into a 304.
+
+The disk copy is what lets a restart — or a second API replica on the same
+data volume — serve the catalog without rebuilding it. Nothing depends on it
+for correctness: a missing or stale index (settings that feed the payload
+changed, a category was renamed) just means the next request builds one.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from .. import models as M
+from ..config import settings
+
+log = logging.getLogger(__name__)
+
+INDEX = "index.json"
+CATEGORIES_KEY = "categories"
+
+
+def parts_key(cat_id: int) -> str:
+    return f"parts-{cat_id}"
+
+
+# What a category the snapshot does not know is answered with — the same `[]`
+# the live query gave for an unknown or empty category.
+EMPTY_KEY = "parts-empty"
+
+_lock = threading.Lock()
+# Serializes lazy builds so a burst of chooser requests after a restart builds
+# the snapshot once, not once per request.
+_build_lock = threading.Lock()
+# In-process copy of the on-disk index, keyed by the index file's stat stamp,
+# plus the bodies already read for it. A new index clears the bodies.
+_memo: dict = {"stamp": None, "index": None, "bodies": {}}
+
+
+def _catalog_dir() -> Path:
+    d = settings.data_dir / "catalog"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def _settings_key() -> str:
+    """The settings a payload bakes in. A stored override changing any of them
+    (appconfig) must not keep serving bodies built under the old values."""
+    return "|".join((settings.httplib_symbol_lib, settings.footprint_lib_nickname,
+                      settings.public_base_url))
+
+
+def _serialize(content) -> bytes:
+    # Byte-for-byte what FastAPI's JSONResponse emits, so switching the
+    # endpoint to stored bodies changes nothing a client can see.
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def _digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def build(db: Session) -> dict:
+    """Rebuild the whole snapshot from the DB and publish it. Returns the index.
+
+    One pass over `library_versions` for the entire library instead of one per
+    category — the page helpers batch their lookups, so the cost is a handful
+    of queries however many categories there are.
+    """
+    from ..routers.kicad_http import categories_payload, library_versions, part_payloads
+
+    versions = library_versions(db).order_by(M.Component.name).all()
+    by_cat: dict[int, list[dict]] = {}
+    for cv, payload in zip(versions, part_payloads(db, versions)):
+        by_cat.setdefault(cv.category_id, []).append(payload)
+
+    bodies: dict[str, bytes] = {
+        CATEGORIES_KEY: _serialize(categories_payload(db)),
+        EMPTY_KEY: _serialize([]),
+    }
+    for cat_id, parts in by_cat.items():
+        bodies[parts_key(cat_id)] = _serialize(parts)
+
+    out = _catalog_dir()
+    entries: dict[str, str] = {}
+    for key, body in bodies.items():
+        digest = _digest(body)
+        entries[key] = digest
+        path = out / f"{digest}.json"
+        if not path.exists():
+            tmp = path.with_suffix(".part")
+            tmp.write_bytes(body)
+            tmp.replace(path)
+    index = {"settings": _settings_key(), "entries": entries}
+    tmp = out / f"{INDEX}.part"
+    tmp.write_text(json.dumps(index, indent=1), encoding="utf-8")
+    # Atomic publish: a reader sees the old catalog or the new one, never half.
+    tmp.replace(out / INDEX)
+
+    # Prune bodies no index references any more. A reader holding the previous
+    # index in memory already has its bodies, or re-reads the new index below.
+    keep = {f"{d}.json" for d in entries.values()} | {INDEX}
+    for f in out.iterdir():
+        if f.name not in keep and not f.name.endswith(".part"):
+            f.unlink(missing_ok=True)
+    with _lock:
+        _memo.update(stamp=None, index=None, bodies={})
+    log.info(f"catalog: {len(versions)} parts in {len(by_cat)} categories")
+    return index
+
+
+def rebuild(db: Session) -> None:
+    """`build`, for the publish paths: a failure leaves the catalog to be built
+    by the next request rather than failing the publish that triggered it."""
+    try:
+        build(db)
+    except Exception as e:  # noqa: BLE001 — a derived cache must never fail a publish
+        log.warning(f"catalog rebuild failed, next request rebuilds: {type(e).__name__}: {e}")
+        invalidate()
+
+
+def invalidate() -> None:
+    """Drop the published index. For changes the catalog reflects but that do
+    not go through a mirror write (category renames and moves)."""
+    (_catalog_dir() / INDEX).unlink(missing_ok=True)
+    with _lock:
+        _memo.update(stamp=None, index=None, bodies={})
+
+
+def _current_index() -> dict | None:
+    path = _catalog_dir() / INDEX
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        if _memo["stamp"] != stamp:
+            try:
+                index = json.loads(path.read_bytes())
+            except (OSError, ValueError):
+                return None
+            _memo.update(stamp=stamp, index=index, bodies={})
+        index = _memo["index"]
+    return index if index.get("settings") == _settings_key() else None
+
+
+def _body(digest: str) -> bytes | None:
+    with _lock:
+        body = _memo["bodies"].get(digest)
+    if body is not None:
+        return body
+    try:
+        body = (_catalog_dir() / f"{digest}.json").read_bytes()
+    except FileNotFoundError:
+        return None
+    with _lock:
+        _memo["bodies"][digest] = body
+    return body
+
+
+def lookup(db: Session, key: str) -> tuple[str, bytes]:
+    """(strong ETag, body) for one catalog document, building the snapshot if
+    there is none. `db` is only touched on that build path."""
+    for _ in range(3):
+        index = _current_index()
+        if index is None:
+            with _build_lock:
+                # another request may have built it while this one waited
+                index = _current_index() or build(db)
+        entries = index["entries"]
+        digest = entries.get(key) or entries[EMPTY_KEY]
+        body = _body(digest)
+        if body is not None:
+            return f'"{digest}"', body
+        # pruned under us by a concurrent rebuild — re-read the new index
+        with _lock:
+            _memo.update(stamp=None, index=None, bodies={})
+    raise RuntimeError(f"catalog document {key!r} kept disappearing during rebuilds")
@@ -6,16 +6,26 @@
   current version, the component is AUTO-BUMPED to a new published version
   (auto-managed lane — audited, created_by "system") so "which PDF was used in
   which component version" is always answerable via the pin table.
-- A background worker fetches all missing (or all) datasheets.
+- A background job fetches all missing (or all) datasheets: one serial,
+  politely paced queue per supplier host, different hosts in parallel.
+  Downloads are streamed and hashed into a spool, so an unchanged PDF is
+  never held in memory whole.
 """
 from __future__ import annotations
 
 import hashlib
 import logging
+import queue
 import re
+import tempfile
 import threading
-import time
+from collections import defaultdict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import IO
+from urllib.parse import urlsplit
 
 import httpx
 from sqlalchemy.orm import Session
@@ -26,12 +36,17 @@ from ..db import SessionLocal
 log = logging.getLogger(__name__)
 
 _HEADERS = {"User-Agent": "curl/8.1"}  # some suppliers 403 unusual UAs
+CHUNK = 1 << 20
+SPOOL_BYTES = 8 << 20  # a download bigger than this spools to a temp file
 
 FETCH_STATE: dict = {"running": False, "mode": None, "done": 0, "total": 0,
                      "new_versions": 0, "unchanged": 0, "not_modified": 0, "errors": 0,
                      "started_at": None, "finished_at": None, "last_error": None,
-                     "trigger": None, "next_nightly_at": None, "last_nightly_at": None}
+                     "trigger": None, "next_nightly_at": None, "last_nightly_at": None,
+                     "domains": 0}
 _lock = threading.Lock()
+_client_lock = threading.Lock()
+_http: httpx.Client | None = None
 _nightly_started = False
 
 
@@ -114,6 +129,85 @@ def _bump_component_version(
     return new_no
 
 
+@dataclass
+class _Download:
+    """One GET of a datasheet URL, before anything touches the database. A
+    200's body is spooled (memory up to SPOOL_BYTES, then a temp file) and
+    hashed on the way in, so it is only read back in full when it really is a
+    new version to store."""
+
+    status: int
+    url: str
+    sha256: str = ""
+    size: int = 0
+    head: bytes = b""  # first bytes, for the %PDF- sniff
+    content_type: str | None = None
+    filename: str = ""
+    etag: str | None = None
+    last_modified: str | None = None
+    body: IO[bytes] | None = None
+
+    def read(self) -> bytes:
+        self.body.seek(0)
+        return self.body.read()
+
+    def close(self) -> None:
+        if self.body is not None:
+            self.body.close()
+            self.body = None
+
+
+def _client() -> httpx.Client:
+    """The process-wide client: keep-alive per supplier host instead of a
+    fresh TLS handshake per datasheet. httpx.Client is thread-safe."""
+    global _http
+    with _client_lock:
+        if _http is None:
+            from ..config import settings
+
+            _http = httpx.Client(
+                headers=_HEADERS, follow_redirects=True, timeout=60,
+                limits=httpx.Limits(max_connections=max(settings.datasheet_fetch_domains, 1) * 2),
+            )
+        return _http
+
+
+def _download(url: str, fallback_name: str, etag: str | None = None,
+              last_modified: str | None = None) -> _Download:
+    """GET `url`, replaying the validators given. Raises httpx.HTTPError on
+    network failure or an error status; the caller closes the result."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    with _client().stream("GET", url, headers=headers) as resp:
+        if resp.status_code == 304:
+            return _Download(304, str(resp.url))
+        resp.raise_for_status()
+        dl = _Download(
+            200, str(resp.url),
+            content_type=(resp.headers.get("content-type") or "").split(";")[0].strip() or None,
+            filename=_filename_from(resp, str(resp.url), fallback_name),
+            etag=(resp.headers.get("etag") or "").strip() or None,
+            last_modified=(resp.headers.get("last-modified") or "").strip() or None,
+            body=tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES),
+        )
+        h = hashlib.sha256()
+        try:
+            for piece in resp.iter_bytes(CHUNK):
+                if len(dl.head) < 5:
+                    dl.head += piece[:5 - len(dl.head)]
+                h.update(piece)
+                dl.body.write(piece)
+                dl.size += len(piece)
+        except BaseException:
+            dl.close()
+            raise
+        dl.sha256 = h.hexdigest()
+        return dl
+
+
 def fetch_datasheet(db: Session, ds: M.Datasheet, conditional: bool = True) -> dict:
     """Download ds.source_url; create a new version only on content change.
     Returns a result dict; raises httpx.HTTPError on network failure.
@@ -127,14 +221,18 @@ def fetch_datasheet(db: Session, ds: M.Datasheet, conditional: bool = True) -> d
     if not ds.source_url:
         return {"id": ds.id, "result": "no_url"}
     cur = current_version(ds)
-    headers = dict(_HEADERS)
-    if conditional and cur is not None:
-        if cur.etag:
-            headers["If-None-Match"] = cur.etag
-        if cur.last_modified:
-            headers["If-Modified-Since"] = cur.last_modified
-    resp = httpx.get(ds.source_url, headers=headers, follow_redirects=True, timeout=60)
-    if resp.status_code == 304:
+    validators = (cur.etag, cur.last_modified) if conditional and cur is not None else (None, None)
+    dl = _download(ds.source_url, f"{ds.label}.pdf", *validators)
+    try:
+        return _apply(db, ds, dl)
+    finally:
+        dl.close()
+
+
+def _apply(db: Session, ds: M.Datasheet, dl: _Download) -> dict:
+    """Record one download of `ds` (see fetch_datasheet) and commit."""
+    cur = current_version(ds)
+    if dl.status == 304:
         # The supplier confirms the document we hold is still current. A 304
         # carries no body, so never fall through to the download path — a
         # server that answers 304 unconditionally would otherwise store an
@@ -145,15 +243,9 @@ def fetch_datasheet(db: Session, ds: M.Datasheet, conditional: bool = True) -> d
         db.commit()
         return {"id": ds.id, "result": "unchanged", "version_no": cur.version_no,
                 "not_modified": True}
-    resp.raise_for_status()
-    data = resp.content
-    sha = hashlib.sha256(data).hexdigest()
-    content_type = (resp.headers.get("content-type") or "").split(";")[0].strip() or None
-    filename = _filename_from(resp, str(resp.url), f"{ds.label}.pdf")
-
-    new_is_pdf = (content_type == "application/pdf") or data[:5] == b"%PDF-"
-    etag = (resp.headers.get("etag") or "").strip() or None
-    last_modified = (resp.headers.get("last-modified") or "").strip() or None
+    sha, content_type, filename = dl.sha256, dl.content_type, dl.filename
+    new_is_pdf = (content_type == "application/pdf") or dl.head == b"%PDF-"
+    etag, last_modified = dl.etag, dl.last_modified
 
     if cur is not None and cur.sha256 == sha:
         cur.fetched_at = datetime.now(timezone.utc)  # bookkeeping: last verified
@@ -177,7 +269,7 @@ def fetch_datasheet(db: Session, ds: M.Datasheet, conditional: bool = True) -> d
     new_no = (cur.version_no if cur else 0) + 1
     dv = M.DatasheetVersion(
         datasheet_id=ds.id, version_no=new_no, filename=filename,
-        content_type=content_type, size_bytes=len(data), sha256=sha, data=data,
+        content_type=content_type, size_bytes=dl.size, sha256=sha, data=dl.read(),
         etag=etag, last_modified=last_modified,
     )
     db.add(dv)
@@ -198,7 +290,7 @@ def fetch_datasheet(db: Session, ds: M.Datasheet, conditional: bool = True) -> d
 
     db.add(M.AuditLog(actor="system", action="datasheet.fetch", entity_type="datasheet",
                       entity_id=str(ds.id),
-                      details={"url": ds.source_url, "pdf_version": new_no, "size": len(data),
+                      details={"url": ds.source_url, "pdf_version": new_no, "size": dl.size,
                                "content_type": content_type,
                                "component_bumped_to": bumped}))
     db.commit()
@@ -300,17 +392,34 @@ def add_component_file(
 
 
 def start_fetch_all(mode: str = "missing", trigger: str = "manual") -> bool:
-    """Background fetch of every non-archived datasheet with a source URL.
-    mode 'missing': only those without a local copy; 'all': re-check everything
-    (content-change detection)."""
+    """Queue a fetch of every non-archived datasheet with a source URL (a
+    `datasheet_fetch_all` job, services/jobs.py). mode 'missing': only those
+    without a local copy; 'all': re-check everything (content-change
+    detection). False when a run is already queued or running."""
+    from . import jobs
+
+    return jobs.submit("datasheet_fetch_all", {"mode": mode, "trigger": trigger},
+                       dedupe_key="datasheet_fetch_all", max_attempts=1) is not None
+
+
+def run_fetch_all_job(payload: dict) -> dict:
+    """Job handler for kind `datasheet_fetch_all`. FETCH_STATE is this
+    process's view; the job's progress carries the same counters for the
+    status endpoint of whichever replica is asked."""
+    mode = payload.get("mode", "missing")
     with _lock:
-        if FETCH_STATE["running"]:
-            return False
-        FETCH_STATE.update(running=True, mode=mode, trigger=trigger, done=0, total=0,
-                           new_versions=0, unchanged=0, not_modified=0, errors=0, last_error=None,
-                           started_at=datetime.now(timezone.utc).isoformat(), finished_at=None)
-    threading.Thread(target=_fetch_all_worker, args=(mode,), daemon=True).start()
-    return True
+        FETCH_STATE.update(running=True, mode=mode, trigger=payload.get("trigger", "manual"),
+                           done=0, total=0, domains=0, new_versions=0, unchanged=0, not_modified=0,
+                           errors=0, last_error=None, started_at=datetime.now(timezone.utc).isoformat(),
+                           finished_at=None)
+    _fetch_all_worker(mode)
+    return _fetch_progress()
+
+
+def _fetch_progress() -> dict:
+    return {k: FETCH_STATE[k] for k in ("running", "mode", "trigger", "done", "total", "domains",
+                                        "new_versions", "unchanged", "not_modified", "errors",
+                                        "last_error", "started_at", "finished_at")}
 
 
 def _next_nightly(hour: int, now: datetime | None = None) -> datetime:
@@ -353,45 +462,135 @@ def start_nightly_recheck(hour: int = 3) -> None:
     arm()
 
 
+@dataclass(frozen=True)
+class _Target:
+    id: int
+    url: str
+    label: str
+    etag: str | None
+    last_modified: str | None
+
+
+def _targets(db: Session, mode: str) -> list[_Target]:
+    """What a fetch run re-checks, with the current copy's validators —
+    read by column so no stored PDF is loaded just to plan the run."""
+    q = (
+        db.query(M.Datasheet.id, M.Datasheet.source_url, M.Datasheet.label,
+                 M.DatasheetVersion.etag, M.DatasheetVersion.last_modified)
+        .outerjoin(M.DatasheetVersion, M.DatasheetVersion.id == M.Datasheet.current_version_id)
+        .filter(M.Datasheet.archived.is_(False), M.Datasheet.source_url.isnot(None))
+    )
+    if mode == "missing":
+        q = q.filter(M.Datasheet.current_version_id.is_(None))
+    return [_Target(*row) for row in q.order_by(M.Datasheet.id)]
+
+
+def _domain_queue(targets: list[_Target], delay_s: float, out: queue.Queue,
+                  stop: threading.Event) -> None:
+    """One host's datasheets, one at a time with `delay_s` between requests.
+    Every target ends up on `out` as (target, download, error)."""
+    for i, t in enumerate(targets):
+        if stop.is_set() or (i and stop.wait(delay_s)):
+            return
+        try:
+            out.put((t, _download(t.url, f"{t.label}.pdf", t.etag, t.last_modified), None))
+        except Exception as e:  # noqa: BLE001 — reported per datasheet by the consumer
+            out.put((t, None, e))
+
+
+def _fetch_concurrently(targets: list[_Target]) -> Iterator[tuple[_Target, _Download | None,
+                                                                   Exception | None]]:
+    """Download `targets`, politely per host and in parallel across hosts,
+    yielding each result as it arrives. The queue is bounded so downloads
+    cannot run far ahead of the caller storing them; closing the generator
+    early stops the domain queues and discards what they still had."""
+    from ..config import settings
+
+    by_host: dict[str, list[_Target]] = defaultdict(list)
+    for t in targets:
+        by_host[(urlsplit(t.url).hostname or "").lower()].append(t)
+    FETCH_STATE["domains"] = len(by_host)
+    workers = max(min(settings.datasheet_fetch_domains, len(by_host)), 1)
+    out: queue.Queue = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+    # Biggest hosts first: they set the run's length, so they should not wait
+    # behind a row of one-PDF domains for a free worker.
+    hosts = sorted(by_host.values(), key=len, reverse=True)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="datasheet-fetch")
+    futures = [pool.submit(_domain_queue, ts, settings.datasheet_domain_delay_s, out, stop)
+               for ts in hosts]
+    try:
+        for _ in range(len(targets)):
+            yield out.get()
+    finally:
+        stop.set()
+        while not all(f.done() for f in futures) or not out.empty():
+            try:
+                _, dl, _ = out.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if dl is not None:
+                dl.close()
+        pool.shutdown()
+
+
+def _changed_libraries(db: Session, component_ids: set[int]) -> set[str]:
+    """Top-level categories (= mirror symbol libraries) holding `component_ids`."""
+    from .mirror import top_level_of
+
+    tops = set()
+    for comp in db.query(M.Component).filter(M.Component.id.in_(component_ids)):
+        cv = db.get(M.ComponentVersion, comp.current_version_id) if comp.current_version_id else None
+        if cv is not None:
+            tops.add(top_level_of(cv.category).name)
+    return tops
+
+
 def _fetch_all_worker(mode: str) -> None:
+    from . import jobs
+
     db = SessionLocal()
+    changed: set[int] = set()  # components whose generated Datasheet link moved
     try:
-        q = db.query(M.Datasheet).filter(M.Datasheet.archived.is_(False),
-                                         M.Datasheet.source_url.isnot(None))
-        if mode == "missing":
-            q = q.filter(M.Datasheet.current_version_id.is_(None))
-        ids = [ds.id for ds in q.all()]
-        FETCH_STATE["total"] = len(ids)
-        for ds_id in ids:
-            ds = db.get(M.Datasheet, ds_id)
-            if ds is None:
-                continue
+        targets = _targets(db, mode)
+        FETCH_STATE["total"] = len(targets)
+        for t, dl, err in _fetch_concurrently(targets):
             try:
-                r = fetch_datasheet(db, ds)
-                if r["result"] == "new_version":
-                    FETCH_STATE["new_versions"] += 1
-                elif r["result"] == "unchanged":
-                    FETCH_STATE["unchanged"] += 1
-                    if r.get("not_modified"):
-                        FETCH_STATE["not_modified"] += 1
+                if err is not None:
+                    raise err
+                ds = db.get(M.Datasheet, t.id)
+                if ds is not None:
+                    r = _apply(db, ds, dl)
+                    if r["result"] == "new_version":
+                        FETCH_STATE["new_versions"] += 1
+                        changed.add(ds.component_id)
+                    elif r["result"] == "unchanged":
+                        FETCH_STATE["unchanged"] += 1
+                        if r.get("not_modified"):
+                            FETCH_STATE["not_modified"] += 1
             except Exception as e:
                 db.rollback()
                 FETCH_STATE["errors"] += 1
-                FETCH_STATE["last_error"] = f"datasheet {ds_id}: {e}"
+                FETCH_STATE["last_error"] = f"datasheet {t.id}: {e}"
+            finally:
+                if dl is not None:
+                    dl.close()
             FETCH_STATE["done"] += 1
-            time.sleep(0.3)  # be polite to supplier servers
+            if FETCH_STATE["done"] % 25 == 0:
+                jobs.progress(**_fetch_progress())
         # Newly local PDF copies change the generated Datasheet links —
-        # refresh all mirror symbol libraries once at the end of the run.
-        if FETCH_STATE["new_versions"]:
+        # refresh the symbol libraries of the components that got one, once,
+        # at the end of the run.
+        if changed:
             try:
                 from ..config import settings
                 from .mirror import update_mirror_symbols
 
-                tops = {c.name for c in db.query(M.Category).filter(M.Category.parent_id.is_(None))}
-                update_mirror_symbols(db, settings, tops)
+                update_mirror_symbols(db, settings, _changed_libraries(db, changed))
             except Exception as e:
                 FETCH_STATE["last_error"] = f"mirror refresh: {e}"
     finally:
         db.close()
         FETCH_STATE["running"] = False
         FETCH_STATE["finished_at"] = datetime.now(timezone.utc).isoformat()
+        jobs.progress(**_fetch_progress())
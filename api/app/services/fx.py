@@ -9,8 +9,11 @@ from __future__ import annotations
 
 import logging
 import threading
+from bisect import bisect_right
+from collections.abc import Iterable
 
 import httpx
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from .. import models as M
@@ -41,30 +44,95 @@ def record_rate_history(db: Session, currency: str, rate_usd: float) -> bool:
     if last is not None and last.rate_usd == rate_usd:
         return False
     db.add(M.ExchangeRateHistory(currency=cur, rate_usd=rate_usd, recorded_at=utcnow()))
+    invalidate_timeline()
     return True
 
 
+# Per-currency rate timeline: (recorded_at keys, rates), both in (recorded_at,
+# id) order, so "latest row at-or-before `at`" is one bisect instead of a walk
+# over the whole history. Pool replays resolve a rate table per distinct event
+# date; before this every one of them re-read and re-scanned every row.
+#
+# The timeline is keyed by a stamp of the history table (row count, max id,
+# rate sum) taken in the CALLER's session, so it is rebuilt whenever the table
+# changed — including writes from another process, an in-place correction
+# (`nbp.record_history`) and rows this session has flushed but not committed.
+# `invalidate_timeline()` from the in-process writers just makes that cheaper.
+_timeline_lock = threading.Lock()
+_timeline: dict = {"stamp": None, "series": {}}
+
+
+def invalidate_timeline() -> None:
+    with _timeline_lock:
+        _timeline.update(stamp=None, series={})
+
+
+def _history_stamp(db: Session) -> tuple:
+    H = M.ExchangeRateHistory
+    return tuple(db.query(func.count(H.id), func.max(H.id), func.sum(H.rate_usd)).one())
+
+
+def _rate_series(db: Session) -> dict[str, tuple[list, list[float]]]:
+    stamp = _history_stamp(db)
+    with _timeline_lock:
+        if _timeline["stamp"] == stamp:
+            return _timeline["series"]
+        H = M.ExchangeRateHistory
+        rows = (
+            db.query(H.currency, H.recorded_at, H.rate_usd)
+            .order_by(H.recorded_at, H.id)
+            .all()
+        )
+        series: dict[str, tuple[list, list[float]]] = {}
+        for currency, recorded_at, rate_usd in rows:
+            times, rates = series.setdefault(currency.upper(), ([], []))
+            times.append(recorded_at)
+            rates.append(rate_usd)
+        _timeline.update(stamp=stamp, series=series)
+        return series
+
+
+def rates_at_many(db: Session, dates: Iterable) -> list[dict[str, float]]:
+    """`rates_at` for every datetime in `dates`, in order — two small queries
+    for the whole batch, then one bisect per (date, currency)."""
+    live = get_rates(db)
+    series = _rate_series(db)
+    out = []
+    for at in dates:
+        rates = dict(live)
+        for cur, (times, values) in series.items():
+            i = bisect_right(times, at)
+            rates[cur] = values[i - 1] if i else values[0]
+        rates["USD"] = 1.0
+        out.append(rates)
+    return out
+
+
+def rate_lookup(db: Session):
+    """`(currency, at) -> rate_usd | None` resolving ONE currency exactly like
+    `rates_at` does, for callers that need a single rate per row rather than a
+    whole table per date. None = no rate known (what `convert` flags)."""
+    live = get_rates(db)
+    series = _rate_series(db)
+
+    def rate(currency: str, at) -> float | None:
+        cur = currency.upper() or "USD"
+        if cur == "USD":
+            return 1.0
+        hist = series.get(cur)
+        if hist is None:
+            return live.get(cur)
+        i = bisect_right(hist[0], at)
+        return hist[1][i - 1] if i else hist[1][0]
+
+    return rate
+
+
 def rates_at(db: Session, at) -> dict[str, float]:
     """Rates AS OF `at` from history — per currency the latest row
     at-or-before `at`, else the earliest after it. Currencies with no history
     fall back to the current live rate (better than dropping the line)."""
-    rates = get_rates(db)
-    rows = (
-        db.query(M.ExchangeRateHistory)
-        .order_by(M.ExchangeRateHistory.recorded_at, M.ExchangeRateHistory.id)
-        .all()
-    )
-    by_cur: dict[str, list[M.ExchangeRateHistory]] = {}
-    for r in rows:
-        by_cur.setdefault(r.currency.upper(), []).append(r)
-    for cur, hist in by_cur.items():
-        chosen = hist[0]
-        for r in hist:
-            if r.recorded_at <= at:
-                chosen = r
-        rates[cur] = chosen.rate_usd
-    rates["USD"] = 1.0
-    return rates
+    return rates_at_many(db, [at])[0]
 
 
 def convert(amount: float, currency: str, target: str, rates: dict[str, float]) -> tuple[float, bool]:
@@ -102,6 +170,7 @@ def refresh_rates(db: Session) -> dict:
             record_rate_history(db, currency, rate_usd)
             updated += 1
     db.commit()
+    invalidate_timeline()
     return {"updated": updated, "currencies": len(data)}
 
 
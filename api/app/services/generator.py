@@ -9,11 +9,11 @@ instead of raw f-string eval().
 from __future__ import annotations
 
 import copy
-import tempfile
-from pathlib import Path
 
 from kiutils.items.common import Effects, Font, Position, Property
 from kiutils.symbol import SymbolLib
+from kiutils.utils.sexpr import sexp_prettify as prettify
+from kiutils.utils.sexpr import sexp_to_string
 
 from .templates import has_template, resolve_templates
 
@@ -23,18 +23,15 @@ def load_symbol_lib_from_text(source_text: str) -> SymbolLib:
 
     Uses the RAW text (no sanitizing): the vendored kiutils carries the
     KiCad-10 patch and preserves unknown tokens via _unknown_fields, so
-    generated output keeps full fidelity with the legacy pipeline."""
-    with tempfile.TemporaryDirectory() as td:
-        path = Path(td) / "lib.kicad_sym"
-        path.write_text(source_text, encoding="utf-8")
-        return SymbolLib.from_file(str(path))
+    generated output keeps full fidelity with the legacy pipeline.
+
+    Straight from the string — mirror rebuilds and previews call this hundreds
+    of times, and a temp-file round trip per call was pure overhead."""
+    return SymbolLib.from_text(source_text)
 
 
 def symbol_lib_to_text(lib: SymbolLib) -> str:
-    with tempfile.TemporaryDirectory() as td:
-        path = Path(td) / "lib.kicad_sym"
-        lib.to_file(str(path))
-        return path.read_text(encoding="utf-8")
+    return lib.to_text()
 
 
 def rename_symbol_units(symbol) -> None:
@@ -143,17 +140,88 @@ def build_component_symbol(
     return apply_properties(new_component, properties, remove_properties, warnings, component_name)
 
 
-def build_library_text(meta_lib: SymbolLib, symbols: list) -> str:
-    """Assemble a .kicad_sym library, copying version/generator metadata from
-    a sample base library (exact port of create_or_update_library)."""
+def _library_shell(meta_lib: SymbolLib) -> SymbolLib:
     new_lib = SymbolLib()
     for attr in ("version", "generator", "generator_version", "embedded_fonts"):
         if hasattr(meta_lib, attr) and hasattr(new_lib, attr):
             setattr(new_lib, attr, getattr(meta_lib, attr))
+    return new_lib
+
+
+def build_library_text(meta_lib: SymbolLib, symbols: list) -> str:
+    """Assemble a .kicad_sym library, copying version/generator metadata from
+    a sample base library (exact port of create_or_update_library)."""
+    new_lib = _library_shell(meta_lib)
     new_lib.symbols = symbols
     return symbol_lib_to_text(new_lib)
 
 
+# Prettify is a character state machine, but its state is fully reset at
+# every child of the library root: the child opens on a fresh "\n\t(" line and
+# closes its own multi-line block. So a library's text is the root opener, each
+# child's block as prettified on its own, and the root closer — which is what
+# lets the mirror cache one serialized block per generated symbol and build a
+# library by concatenation instead of re-prettifying every symbol in it.
+_LIB_OPEN = "(kicad_symbol_lib"
+_LIB_CLOSE = "\n)\n"
+
+
+def _lib_block(raw_item) -> str:
+    text = prettify(f"{_LIB_OPEN} {sexp_to_string(raw_item)})")
+    return text[len(_LIB_OPEN) : -len(_LIB_CLOSE)]
+
+
+def symbol_block(symbol) -> str:
+    """One symbol serialized exactly as it appears inside a library file."""
+    return _lib_block(symbol._to_sexpr_raw())
+
+
+def library_text_from_blocks(meta_lib: SymbolLib, blocks: list[str]) -> str:
+    """`build_library_text`, byte for byte, from already serialized symbol
+    blocks (`symbol_block`)."""
+    new_lib = _library_shell(meta_lib)
+    raw = new_lib._to_sexpr_raw()[1:]
+    if not raw and not blocks:
+        return symbol_lib_to_text(new_lib)
+    # embedded_fonts is the one root child written after the symbols
+    tail = raw[-1:] if new_lib.embedded_fonts is not None else []
+    head = raw[: len(raw) - len(tail)]
+    return "".join([
+        _LIB_OPEN,
+        *map(_lib_block, head),
+        *blocks,
+        *map(_lib_block, tail),
+        _LIB_CLOSE,
+    ])
+
+
+def build_symbol_blocks(
+    entries: list[tuple],
+    templates: dict[str, tuple[str, str]],
+) -> list[tuple[str | None, list[str]]]:
+    """Generated symbols as serialized library blocks (`symbol_block`), from
+    plain data — no DB session, no ORM rows — so `mirror.write_symbol_libs`
+    can run it in a worker process.
+
+    `entries` are `(component name, template key, properties, removed
+    properties)`; `templates` maps template key -> (base component, base
+    symbol source). Returns one `(block, warnings)` per entry, in order; the
+    block is None when generation failed (the reason is in its warnings)."""
+    provider = BaseSymbolProvider()
+    out: list[tuple[str | None, list[str]]] = []
+    for name, key, props, removed in entries:
+        warnings: list[str] = []
+        try:
+            base_name, source_text = templates[key]
+            template = provider.get(base_name, source_text, cache_key=key)
+            block = symbol_block(build_component_symbol(template, name, props, removed, warnings))
+        except Exception as e:
+            warnings.append(f"{name}: generation failed — {e}")
+            block = None
+        out.append((block, warnings))
+    return out
+
+
 def property_row_to_dict(prop) -> dict:
     """Convert a ComponentProperty DB row back to the YAML dict shape the
     generator consumes (single code path for import and DB-driven writes)."""
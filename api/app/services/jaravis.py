@@ -21,7 +21,8 @@ from anthropic import beta_tool
 from .. import models as M
 from ..config import settings
 from ..db import SessionLocal
-from ..routers.util import category_path, current_version, props_dict, resolved_value
+from ..routers.util import category_path, current_version
+from ..services import search_index, usage_index
 from ..services.generator import PRICE_KEY_TO_COL
 from ..services.lcsc import fetch_metadata
 
@@ -68,27 +69,24 @@ def search_components(query: str = "", category: str = "") -> str:
     """
     db = SessionLocal()
     try:
-        out = []
-        for comp in db.query(M.Component).order_by(M.Component.name):
-            cv = current_version(comp)
-            if cv is None:
-                continue
-            path = category_path(cv.category)
-            if category and category.lower() not in path.lower():
-                continue
-            props = props_dict(cv)
-            hay = comp.name.lower() + " " + " ".join((v or "").lower() for v in props.values())
-            if query and query.lower() not in hay:
-                continue
-            out.append({
-                "name": comp.name,
-                "description": resolved_value(props.get("ki_description"), props),
-                "value": props.get("Value") or "",
-                "footprint": props.get("Footprint") or "",
-                "category": path,
-            })
-            if len(out) >= 50:
-                break
+        search_index.ensure(db)
+        S = M.ComponentSearch
+        rows = db.query(S)
+        if category:
+            rows = rows.filter(S.category_path.ilike(search_index.like_pattern(category.lower()),
+                                                     escape="\\"))
+        if query:
+            rows = rows.filter(search_index.text_filter(query))
+        out = [
+            {
+                "name": r.name,
+                "description": r.description,
+                "value": r.value,
+                "footprint": r.footprint,
+                "category": r.category_path,
+            }
+            for r in rows.order_by(S.name).limit(50)
+        ]
         return json.dumps({"count": len(out), "components": out})
     finally:
         db.close()
@@ -785,20 +783,12 @@ def component_where_used(component_name: str) -> str:
         comp = db.query(M.Component).filter_by(name=component_name.strip()).first()
         if comp is None:
             return json.dumps({"error": f"component {component_name!r} not found"})
-        out = []
-        for p in db.query(M.Project).order_by(M.Project.name):
-            latest = _latest_ready(db, p.id)
-            if latest is None:
-                continue
-            lines = db.query(M.SnapshotBomLine).filter_by(
-                snapshot_id=latest.id, component_id=comp.id).all()
-            if lines:
-                out.append({
-                    "project": p.name, "ref": latest.ref_name,
-                    "usages": [{"board": li.board, "variant": li.variant or "(default)",
-                                "refs": li.refs, "qty": li.qty, "dnp": li.dnp}
-                               for li in lines],
-                })
+        usage_index.ensure(db)
+        out = [
+            {"project": p["project_name"], "ref": p["ref"],
+             "usages": [{**u, "variant": u["variant"] or "(default)"} for u in p["usages"]]}
+            for p in usage_index.where_used(db, [comp.id]).get(comp.id, [])
+        ]
         return json.dumps({"component": comp.name, "used_in": out})
     finally:
         db.close()
@@ -0,0 +1,381 @@
+"""Durable background jobs on the `jobs` table.
+
+Snapshot ingests, datasheet fetch runs, the PCM build and the ladder refresh
+used to run on daemon threads of whichever API process was asked: a restart
+dropped queued work, their progress lived in that process's memory, and a
+second replica could not take any of it. Now they are rows:
+
+    enqueue / submit      INSERT a queued row (deduped on `dedupe_key`)
+    worker threads        claim with FOR UPDATE SKIP LOCKED, run, record
+                          done / failed / re-queued with backoff
+
+Workers are threads in every API process (`settings.job_workers`) plus any
+number of `python -m app.worker` processes on the same database and data
+volume; adding workers is how ingest throughput scales. `KINDS` caps how
+many jobs of one kind run at once across ALL of them — the claim takes a
+per-kind advisory lock, counts the running rows and only then picks one, so
+two claimers cannot both see a free slot.
+
+A worker heartbeats its running job; a job whose heartbeat stops (the
+process died mid-run) is put back in the queue by whichever worker notices,
+or failed once it used up its attempts. Heartbeats, progress and the final
+status only land while the row is still `running` under the writer's
+worker id — a worker that stalled past STALE_S and lost its job to another
+one cannot overwrite, re-queue or keep alive the new run. A kind's
+`on_failure` hook runs when one of its jobs ends up `failed` for good. Handlers therefore must be safe to
+run again — they all are: ingest resumes on its snapshot row, fetch and
+refresh runs skip what is already current, the PCM build is content-keyed.
+"""
+from __future__ import annotations
+
+import contextvars
+import importlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .. import models as M
+from ..config import settings
+from ..db import SessionLocal
+from ..models import utcnow
+
+log = logging.getLogger(__name__)
+
+HEARTBEAT_S = 15
+STALE_S = 120  # no heartbeat this long: the worker is gone
+POLL_S = 2.0
+REAP_EVERY_S = 60
+BACKOFF_S = 30  # first retry delay, doubled per attempt
+
+
+@dataclass(frozen=True)
+class Kind:
+    target: str  # "service_module:function", imported on first use; called with the payload
+    concurrency: int  # running at once across every worker
+    # "service_module:function" called with (payload, error) once a job of
+    # this kind is failed for good — to clean up state the handler announced
+    on_failure: str = ""
+
+
+# Handlers are named, not imported: the worker process must not pull every
+# service in at import time, and the services import this module to enqueue.
+KINDS: dict[str, Kind] = {
+    "snapshot_ingest": Kind("project_ingest:run_ingest_job",
+                            settings.job_ingest_concurrency,
+                            on_failure="project_ingest:ingest_job_failed"),
+    "datasheet_fetch_all": Kind("datasheet_store:run_fetch_all_job", 1),
+    "pcm_build": Kind("pcm:run_build_job", 1),
+    "ladder_refresh": Kind("ladder:run_refresh_job", 1),
+}
+
+_current: contextvars.ContextVar[int | None] = contextvars.ContextVar("job_id", default=None)
+_owner: contextvars.ContextVar[str] = contextvars.ContextVar("job_worker", default="")
+
+_started_lock = threading.Lock()
+_stop = threading.Event()
+_threads: list[threading.Thread] = []
+
+
+# ------------------------------------------------------------------ enqueue
+
+def enqueue(db: Session, kind: str, payload: dict | None = None, *, dedupe_key: str = "",
+            priority: int = 0, max_attempts: int = 3, delay_s: float = 0) -> int | None:
+    """Queue a job in the caller's transaction (the caller commits). Returns
+    its id, or None when a job with the same `dedupe_key` is already queued
+    or running — that one will do the work."""
+    if kind not in KINDS:
+        raise ValueError(f"unknown job kind {kind!r}")
+    stmt = insert(M.Job).values(
+        kind=kind, payload=payload or {}, dedupe_key=dedupe_key, priority=priority,
+        max_attempts=max_attempts, run_after=utcnow() + timedelta(seconds=delay_s),
+    )
+    if dedupe_key:
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=[M.Job.dedupe_key],
+            index_where=text("dedupe_key <> '' AND status IN ('queued', 'running')"),
+        )
+    return db.execute(stmt.returning(M.Job.id)).scalar()
+
+
+def submit(kind: str, payload: dict | None = None, **kw) -> int | None:
+    """`enqueue` in its own committed transaction, for callers without a
+    session (timers, startup hooks)."""
+    db = SessionLocal()
+    try:
+        job_id = enqueue(db, kind, payload, **kw)
+        db.commit()
+        return job_id
+    finally:
+        db.close()
+
+
+# ----------------------------------------------------------------- progress
+
+def current_job() -> int | None:
+    """Id of the job this thread is running, if any."""
+    return _current.get()
+
+
+def progress(**fields) -> None:
+    """Merge `fields` into the running job's `progress`. A no-op outside a
+    job, and never raises: progress is for people watching, not for the run."""
+    job_id = _current.get()
+    if job_id is None:
+        return
+    db = SessionLocal()
+    try:
+        db.execute(
+            text("UPDATE jobs SET progress = coalesce(progress, '{}'::jsonb) || CAST(:p AS jsonb), "
+                 "heartbeat_at = now() WHERE id = :id AND status = 'running' AND locked_by = :w"),
+            {"p": json.dumps(fields, default=str), "id": job_id, "w": _owner.get()},
+        )
+        db.commit()
+    except Exception as e:  # noqa: BLE001 — progress is best-effort
+        log.debug(f"job {job_id} progress write failed: {e}")
+    finally:
+        db.close()
+
+
+def running_progress(db: Session, kind: str, **match) -> dict | None:
+    """`progress` of a running `kind` job whose progress carries every
+    `match` field — how a status endpoint finds work another process is doing."""
+    q = db.query(M.Job.progress).filter(M.Job.kind == kind, M.Job.status == "running")
+    for key, value in match.items():
+        q = q.filter(M.Job.progress[key].astext == str(value))
+    row = q.order_by(M.Job.id.desc()).first()
+    return row[0] if row else None
+
+
+def latest(db: Session, kind: str) -> M.Job | None:
+    return db.query(M.Job).filter_by(kind=kind).order_by(M.Job.id.desc()).first()
+
+
+# -------------------------------------------------------------------- claim
+
+def _claim(worker: str) -> tuple[int, str, dict] | None:
+    """Take the next runnable job whose kind has a free slot, or None."""
+    db = SessionLocal()
+    try:
+        ready = db.execute(
+            text("SELECT kind FROM jobs WHERE status = 'queued' AND run_after <= now() "
+                 "GROUP BY kind ORDER BY min(priority), min(id)")
+        ).scalars().all()
+        for kind in ready:
+            spec = KINDS.get(kind)
+            if spec is None:
+                continue  # enqueued by a newer build; its workers will take it
+            # Held to the end of this transaction: claimers of one kind queue
+            # up here, so the running count below cannot go stale before the
+            # claimed row is committed as running.
+            db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:k))"), {"k": f"jobs:{kind}"})
+            running = (db.query(func.count(M.Job.id))
+                       .filter(M.Job.kind == kind, M.Job.status == "running").scalar())
+            job = None
+            if running < spec.concurrency:
+                job = (
+                    db.query(M.Job)
+                    .filter(M.Job.kind == kind, M.Job.status == "queued",
+                            M.Job.run_after <= func.now())
+                    .order_by(M.Job.priority, M.Job.id)
+                    .with_for_update(skip_locked=True)
+                    .first()
+                )
+            if job is None:
+                db.rollback()
+                continue
+            now = utcnow()
+            job.status = "running"
+            job.attempts += 1
+            job.locked_by = worker
+            job.started_at = job.heartbeat_at = now
+            job.finished_at = None
+            db.commit()
+            return job.id, job.kind, dict(job.payload or {})
+        return None
+    finally:
+        db.close()
+
+
+def _reap() -> int:
+    """Re-queue (or fail, when out of attempts) running jobs whose worker
+    stopped heartbeating. Returns how many."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            text("UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+                 "finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE now() END, "
+                 "error = 'worker ' || locked_by || ' stopped heartbeating', locked_by = '' "
+                 "WHERE status = 'running' AND heartbeat_at < now() - make_interval(secs => :s) "
+                 "RETURNING kind, status, payload, error"),
+            {"s": STALE_S},
+        ).all()
+        db.commit()
+        if rows:
+            log.warning(f"jobs: {len(rows)} abandoned job(s) re-queued or failed")
+        for kind, status, payload, error in rows:
+            if status == "failed":
+                _failed(kind, payload or {}, error)
+        return len(rows)
+    finally:
+        db.close()
+
+
+def _beat(job_id: int, worker: str, done: threading.Event) -> None:
+    while not done.wait(HEARTBEAT_S):
+        db = SessionLocal()
+        try:
+            n = db.execute(
+                text("UPDATE jobs SET heartbeat_at = now() "
+                     "WHERE id = :id AND status = 'running' AND locked_by = :w"),
+                {"id": job_id, "w": worker},
+            ).rowcount
+            db.commit()
+            if not n:
+                log.warning(f"job {job_id}: no longer held by {worker}; heartbeat stopped")
+                return
+        except Exception as e:  # noqa: BLE001 — the next beat retries
+            log.debug(f"job {job_id} heartbeat failed: {e}")
+        finally:
+            db.close()
+
+
+def _resolve(target: str):
+    module, _, name = target.partition(":")
+    return getattr(importlib.import_module(f".{module}", __package__), name)
+
+
+def _handler(kind: str):
+    return _resolve(KINDS[kind].target)
+
+
+def _failed(kind: str, payload: dict, error: str) -> None:
+    """Run `kind`'s on_failure hook for a job that is failed for good."""
+    spec = KINDS.get(kind)
+    if spec is None or not spec.on_failure:
+        return
+    try:
+        _resolve(spec.on_failure)(payload, error)
+    except Exception as e:  # noqa: BLE001 — the job is failed either way
+        log.warning(f"jobs: {kind} failure hook raised: {type(e).__name__}: {e}")
+
+
+def _finish(job_id: int, worker: str, kind: str, payload: dict,
+            result: dict | None = None, error: BaseException | None = None) -> None:
+    """Record how the run ended — only if `worker` still holds the job. A
+    row the reaper handed to someone else keeps that run's outcome."""
+    db = SessionLocal()
+    try:
+        if error is None:
+            row = db.execute(
+                text("UPDATE jobs SET status = 'done', result = CAST(:r AS jsonb), error = '', "
+                     "finished_at = now(), locked_by = '' "
+                     "WHERE id = :id AND status = 'running' AND locked_by = :w RETURNING status"),
+                {"r": None if result is None else json.dumps(result, default=str),
+                 "id": job_id, "w": worker},
+            ).first()
+        else:
+            row = db.execute(
+                text("UPDATE jobs SET error = :e, locked_by = '', "
+                     "status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+                     "run_after = CASE WHEN attempts < max_attempts "
+                     "THEN now() + make_interval(secs => :b * power(2, attempts - 1)) ELSE run_after END, "
+                     "finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE now() END "
+                     "WHERE id = :id AND status = 'running' AND locked_by = :w RETURNING status"),
+                {"e": f"{type(error).__name__}: {error}", "b": BACKOFF_S, "id": job_id, "w": worker},
+            ).first()
+        db.commit()
+    finally:
+        db.close()
+    if row is None:
+        log.warning(f"job {job_id} ({kind}): no longer held by {worker}; outcome dropped")
+    elif row[0] == "failed":
+        _failed(kind, payload, f"{type(error).__name__}: {error}")
+
+
+def _run(job_id: int, kind: str, payload: dict, worker: str) -> None:
+    token = _current.set(job_id)
+    owner = _owner.set(worker)
+    done = threading.Event()
+    threading.Thread(target=_beat, args=(job_id, worker, done), daemon=True,
+                     name=f"job-{job_id}-heartbeat").start()
+    started = time.monotonic()
+    try:
+        result = _handler(kind)(payload)
+    except Exception as e:
+        log.exception(f"job {job_id} ({kind}) failed")
+        _finish(job_id, worker, kind, payload, error=e)
+    else:
+        log.info(f"job {job_id} ({kind}) done in {time.monotonic() - started:.1f}s")
+        _finish(job_id, worker, kind, payload, result=result if isinstance(result, dict) else None)
+    finally:
+        done.set()
+        _owner.reset(owner)
+        _current.reset(token)
+
+
+# ------------------------------------------------------------------ workers
+
+def _loop(worker: str, before_job=None) -> None:
+    last_reap = 0.0
+    while not _stop.is_set():
+        claimed = None
+        try:
+            if time.monotonic() - last_reap > REAP_EVERY_S:
+                last_reap = time.monotonic()
+                _reap()
+            claimed = _claim(worker)
+        except Exception as e:  # noqa: BLE001 — a DB blip must not kill the worker
+            log.warning(f"job worker {worker}: {type(e).__name__}: {e}")
+        if claimed is None:
+            _stop.wait(POLL_S)
+            continue
+        if before_job is not None:
+            try:
+                before_job()
+            except Exception as e:  # noqa: BLE001 — run on what we have
+                log.warning(f"job worker {worker}: before_job: {type(e).__name__}: {e}")
+        _run(*claimed, worker)
+
+
+def start_workers(n: int, before_job=None) -> list[threading.Thread]:
+    """Start `n` worker threads in this process. Idempotent. `before_job`
+    is called ahead of every claimed job (the standalone worker reloads
+    stored settings overrides there)."""
+    with _started_lock:
+        if _threads or n <= 0:
+            return _threads
+        base = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(n):
+            t = threading.Thread(target=_loop, args=(f"{base}:{i}", before_job), daemon=True,
+                                 name=f"job-worker-{i}")
+            t.start()
+            _threads.append(t)
+        log.info(f"jobs: {n} worker thread(s) started")
+        return _threads
+
+
+def stop_workers(timeout: float | None = None) -> None:
+    """Ask the workers to stop after their current job and wait for them."""
+    _stop.set()
+    for t in list(_threads):
+        t.join(timeout)
+
+
+def stats(db: Session) -> dict:
+    counts: dict[str, dict[str, int]] = {}
+    for kind, status, n in (db.query(M.Job.kind, M.Job.status, func.count(M.Job.id))
+                            .group_by(M.Job.kind, M.Job.status)):
+        counts.setdefault(kind, {})[status] = n
+    return {
+        "kinds": {k: {"concurrency": spec.concurrency, **counts.get(k, {})} for k, spec in KINDS.items()},
+        "local_workers": len(_threads),
+    }
@@ -16,41 +16,32 @@ touched here.
 from __future__ import annotations
 
 import logging
-import threading
 from datetime import timedelta
 
-import httpx
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session, selectinload
 
 from .. import models as M
 from ..config import settings
 from ..db import SessionLocal
 from ..models import utcnow
+from . import supplier
 
 log = logging.getLogger(__name__)
 
-DETAIL_URL = "https://wmsc.lcsc.com/ftps/wm/product/detail?productCode={}"
-
 # Robot-managed ladder sources, in preference order. Any other source
 # ("Manual", "Mouser", ...) is user-owned and never touched by refreshers.
 AUTO_SOURCES = ("JLCPCB", "LCSC")
 
 
+# Components per refresh_stale batch: details for one batch are fetched
+# concurrently (services/supplier.py), then written one component at a time.
+_REFRESH_BATCH = 200
+
+
 def fetch_detail(lcsc_id: str) -> dict | None:
-    try:
-        resp = httpx.get(
-            DETAIL_URL.format(lcsc_id),
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=15,
-            follow_redirects=True,
-        )
-        resp.raise_for_status()
-        result = resp.json().get("result")
-        return result if isinstance(result, dict) else None
-    except Exception as e:
-        log.debug(f"LCSC detail fetch failed for {lcsc_id}: {e}")
-        return None
+    """One part's LCSC detail; batch callers use `supplier.lcsc_details`."""
+    return supplier.lcsc_details([lcsc_id]).get(lcsc_id)
 
 
 def _int_or_none(v) -> int | None:
@@ -87,7 +78,7 @@ def component_lcsc_map(db: Session) -> dict[int, str]:
     return out
 
 
-_JLC_UNFETCHED = object()  # sentinel: caller did not prefetch a JLC detail row
+_UNFETCHED = object()  # sentinel: caller did not prefetch this detail row
 
 
 def _jlc_rows(codes: list[str]) -> dict[str, dict]:
@@ -168,14 +159,16 @@ def _update_price_summary(db: Session, component_id: int, tiers: list[tuple[int,
     row.updated = now.date().isoformat()
 
 
-def refresh_component(db: Session, component_id: int, lcsc_id: str, jlc_row=_JLC_UNFETCHED) -> bool:
+def refresh_component(db: Session, component_id: int, lcsc_id: str, jlc_row=_UNFETCHED,
+                      detail=_UNFETCHED) -> bool:
     """Replace the robot-managed ladders + supply info for one component:
     JLCPCB assembly ladder (preferred) from the official JLC API and the LCSC
-    retail ladder (fallback). Pass a prefetched `jlc_row` (dict or None) when
-    batching to avoid one API call per component. Returns True when at least
-    one ladder was written."""
-    detail = fetch_detail(lcsc_id)
-    if jlc_row is _JLC_UNFETCHED:
+    retail ladder (fallback). Pass a prefetched `jlc_row` / LCSC `detail`
+    (dict or None) when batching to avoid one API call per component. Returns
+    True when at least one ladder was written."""
+    if detail is _UNFETCHED:
+        detail = fetch_detail(lcsc_id)
+    if jlc_row is _UNFETCHED:
         jlc_row = _jlc_rows([lcsc_id]).get(lcsc_id)
     lcsc_tiers: list[tuple[int, float]] = []
     for t in (detail.get("productPriceList") or []) if detail else []:
@@ -240,6 +233,7 @@ def refresh_stale(max_age_days: int | None = None) -> dict:
         # ladder-fresh ones (only the LCSC detail fetch is per-component).
         jlc_rows = _jlc_rows(list(lcsc_by_comp.values()))
         updated = skipped = failed = 0
+        stale: list[tuple[int, str]] = []
         for comp_id, lcsc in lcsc_by_comp.items():
             ts = newest.get(comp_id)
             if ts is not None and now - ts < max_age:
@@ -258,11 +252,20 @@ def refresh_stale(max_age_days: int | None = None) -> dict:
                         _update_price_summary(db, comp_id, tiers, now, "JLCPCB")
                         record_price_history(db, comp_id)
                 continue
-            if refresh_component(db, comp_id, lcsc, jlc_row=jlc_rows.get(lcsc)):
-                updated += 1
-            else:
-                failed += 1
+            stale.append((comp_id, lcsc))
         db.commit()
+        from . import jobs
+
+        for i in range(0, len(stale), _REFRESH_BATCH):
+            batch = stale[i:i + _REFRESH_BATCH]
+            details = supplier.lcsc_details(lcsc for _, lcsc in batch)
+            for comp_id, lcsc in batch:
+                if refresh_component(db, comp_id, lcsc, jlc_row=jlc_rows.get(lcsc),
+                                     detail=details.get(lcsc)):
+                    updated += 1
+                else:
+                    failed += 1
+            jobs.progress(done=i + len(batch), total=len(stale))
         report = {"updated": updated, "fresh": skipped, "failed": failed, "lcsc_components": len(lcsc_by_comp)}
         log.info(f"price ladder refresh: {report}")
         return report
@@ -274,14 +277,23 @@ _started = False
 
 
 def start_background_refresh(delay_s: float = 20.0) -> None:
-    """Kick a one-shot stale-ladder refresh shortly after startup."""
+    """Queue a one-shot stale-ladder refresh (a `ladder_refresh` job) shortly
+    after startup."""
     global _started
     if _started:
         return
     _started = True
-    t = threading.Timer(delay_s, lambda: refresh_stale())
-    t.daemon = True
-    t.start()
+    from . import jobs
+
+    try:
+        jobs.submit("ladder_refresh", dedupe_key="ladder_refresh", delay_s=delay_s, priority=2)
+    except Exception as e:  # noqa: BLE001 — the next startup queues it again
+        log.warning(f"ladder refresh not queued: {e}")
+
+
+def run_refresh_job(payload: dict) -> dict:
+    """Job handler for kind `ladder_refresh`."""
+    return refresh_stale(payload.get("max_age_days"))
 
 
 # ----------------------------------------------------------- price history
@@ -356,6 +368,26 @@ def record_price_history(db: Session, component_id: int) -> bool:
     return True
 
 
+# One row per component: the latest snapshot with points at-or-before `at`,
+# else the earliest after it. Each side is a LIMIT 1 probe of
+# ix_price_history_asof, so the cost is per component, never per history row,
+# and only the chosen rows' `points` leave the database.
+_ASOF_SQL = text("""
+    SELECT c.cid, h.recorded_at, h.points
+    FROM unnest(CAST(:ids AS integer[])) AS c(cid)
+    CROSS JOIN LATERAL (
+        (SELECT recorded_at, points, 0 AS pref FROM component_price_history
+         WHERE component_id = c.cid AND points <> CAST('[]' AS jsonb) AND recorded_at <= :at
+         ORDER BY recorded_at DESC, id DESC LIMIT 1)
+        UNION ALL
+        (SELECT recorded_at, points, 1 FROM component_price_history
+         WHERE component_id = c.cid AND points <> CAST('[]' AS jsonb) AND recorded_at > :at
+         ORDER BY recorded_at, id LIMIT 1)
+        ORDER BY pref LIMIT 1
+    ) h
+""")
+
+
 def history_points_at(db: Session, component_ids: set[int], at) -> dict[int, list[M.ComponentPricePoint]]:
     """Resolve each component's price points AS OF `at` from history: the
     latest snapshot at-or-before `at`, else the earliest one after it (the
@@ -375,22 +407,8 @@ def history_points_at(db: Session, component_ids: set[int], at) -> dict[int, lis
     out: dict[int, list[M.ComponentPricePoint]] = {}
     if not component_ids:
         return out
-    rows = (
-        db.query(M.ComponentPriceHistory)
-        .filter(M.ComponentPriceHistory.component_id.in_(component_ids))
-        .order_by(M.ComponentPriceHistory.recorded_at, M.ComponentPriceHistory.id)
-        .all()
-    )
-    by_comp: dict[int, list[M.ComponentPriceHistory]] = {}
-    for r in rows:
-        if not r.points:
-            continue
-        by_comp.setdefault(r.component_id, []).append(r)
-    for cid, hist in by_comp.items():
-        chosen = hist[0]
-        for r in hist:
-            if r.recorded_at <= at:
-                chosen = r
+    rows = db.execute(_ASOF_SQL, {"at": at, "ids": sorted(component_ids)})
+    for cid, recorded_at, points in rows:
         out[cid] = [
             M.ComponentPricePoint(
                 component_id=cid,
@@ -398,9 +416,9 @@ def history_points_at(db: Session, component_ids: set[int], at) -> dict[int, lis
                 qty_from=int(p.get("qty_from") or 1),
                 unit_price=float(p.get("unit_price") or 0.0),
                 currency=str(p.get("currency") or "USD"),
-                updated_at=chosen.recorded_at,
+                updated_at=recorded_at,
             )
-            for p in (chosen.points or [])
+            for p in points or []
         ]
     return out
 
@@ -56,7 +56,7 @@ def lot_state(db: Session, as_of: str | None = None) -> dict:
 
     # One rate table per distinct event date — the same shape `pool_state` uses,
     # so a lot's landed cost is derived by exactly the code that values the pool.
-    rate_cache: dict[str, dict[str, float]] = {}
+    rate_cache = run_actuals._rate_tables(db, (e[0] for e in events))
 
     def rates_for(date_iso: str) -> dict[str, float]:
         if date_iso not in rate_cache:
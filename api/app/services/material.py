@@ -48,7 +48,15 @@ import hashlib
 import json
 import re
 
-from ..util.sexpr import _norm, find_node, iter_nodes, parse_sexpr, sanitize_symbol_text, walk_nodes
+from ..util.sexpr import (
+    _norm,
+    find_node,
+    iter_nodes,
+    iter_top_level,
+    parse_sexpr,
+    sanitize_symbol_text,
+    walk_nodes,
+)
 
 # Pad sub-nodes whose single value is copied verbatim. Every one of them
 # changes what the fab or the assembler does with the pad.
@@ -133,13 +141,14 @@ def _sorted_entries(entries: list[dict]) -> list[dict]:
 # ------------------------------------------------------------------ footprint
 def footprint_material(source_text: str) -> dict:
     """The material subset of a `.kicad_mod`."""
-    tree = parse_sexpr(source_text)
-    # The footprint node IS the root of a .kicad_mod, so `find_node` on the
-    # parse result misses it — same fallback parse_cache uses.
-    fp = find_node(tree, "footprint") or (tree[0] if tree and isinstance(tree[0], list) else tree)
+    # Only the nodes compared below are materialized; text, properties and
+    # the 3D model block of the footprint are skipped by the scanner.
+    nodes: dict[str, list] = {}
+    for node in iter_top_level(source_text, {"pad", "attr", *_GRAPHIC_TAGS}):
+        nodes.setdefault(_norm(node[0]), []).append(node)
 
     pads: list[dict] = []
-    for pad in walk_nodes(fp, "pad"):
+    for pad in nodes.get("pad", []):
         entry: dict = {
             "number": _norm(pad[1]) if len(pad) > 1 else "",
             "type": _norm(pad[2]) if len(pad) > 2 else "",
@@ -165,7 +174,7 @@ def footprint_material(source_text: str) -> dict:
 
     courtyard: list[list] = []
     for tag in _GRAPHIC_TAGS:
-        for node in walk_nodes(fp, tag):
+        for node in nodes.get(tag, []):
             layer = find_node(node, "layer")
             if layer is None or len(layer) < 2:
                 continue
@@ -174,7 +183,7 @@ def footprint_material(source_text: str) -> dict:
             courtyard.append(_canonical_list(node))
 
     attrs: list[str] = []
-    for node in iter_nodes(fp, "attr"):
+    for node in nodes.get("attr", []):
         attrs.extend(sorted(_norm(a) for a in node[1:]))
 
     return {
@@ -11,27 +11,39 @@ Rebuilt from the DB after import and after every publish; disposable by design.
 """
 from __future__ import annotations
 
+import fcntl
 import hashlib
 import json
+import logging
+import multiprocessing
+import os
 import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from pathlib import Path
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
 from .. import models as M
 from ..config import Settings
+from . import catalog, model_blobs, search_index
 from .generator import (
-    BaseSymbolProvider,
-    build_component_symbol,
     build_library_text,
+    build_symbol_blocks,
     footprint_display_names,
     footprint_name_props,
     injected_props,
+    library_text_from_blocks,
     load_symbol_lib_from_text,
     property_row_to_dict,
 )
 
+log = logging.getLogger(__name__)
+
 
 def top_level_of(category: M.Category) -> M.Category:
     node = category
@@ -41,14 +53,45 @@ def top_level_of(category: M.Category) -> M.Category:
 
 
 # --- incremental-rebuild caches -------------------------------------------
-# Both exist because the mirror is refreshed after EVERY approval, while
-# almost nothing in it actually changed. They are in-process only: a restart
-# just costs one full rebuild, and correctness never depends on them (each is
-# guarded by a check against the real filesystem/DB state).
-
-# mirror-relative path -> (mtime_ns, size, sha256). Lets write_manifest skip
-# re-hashing the ~1.4 GB of 3D models on every component approval.
+# These exist because the mirror is refreshed after EVERY approval, while
+# almost nothing in it actually changed. They are in-process only — except
+# the manifest hashes, see below — so a restart just costs one full rebuild,
+# and correctness never depends on them (each is guarded by a check against
+# the real filesystem/DB state, or keyed on the full content of what it
+# caches).
+
+# mirror-relative path -> (mtime_ns, size, sha256): exactly what manifest.json
+# lists. Mirror writers record the hash of the bytes they write (_put), so a
+# manifest refresh after an edit reads nothing back from disk. The index is
+# persisted to DATA_DIR/manifest-hashes.json: after a restart the first
+# refresh stats the tree once and re-hashes only files whose (mtime, size)
+# moved, instead of the whole ~1.4 GB of 3D models. Another process sharing
+# the data volume updates the same file; a change in it sends the entries it
+# disagrees on back through a stat (_MANIFEST_PENDING).
 _MANIFEST_HASHES: dict[str, tuple[int, int, str]] = {}
+_MANIFEST_PENDING: set[str] = set()
+# "scanned": this process has checked the whole tree against the index once;
+# "sidecar": stat stamp of the persisted index as last read or written here
+_MANIFEST_STATE: dict = {"scanned": False, "sidecar": None}
+_MANIFEST_LOCK = threading.Lock()  # the dicts above
+_MANIFEST_WRITE_LOCK = threading.Lock()  # one write_manifest at a time
+MANIFEST_INDEX = "manifest-hashes.json"
+# ...and across processes: the API and the job workers both write the mirror
+MANIFEST_INDEX_LOCK = "manifest-hashes.lock"
+
+# Generated component symbols, content-addressed: sha256 of everything the
+# generator consumes for one component (template key = base symbol version,
+# name, the final property list — which carries the footprint display name and
+# the datasheet injections — and removed properties) -> (serialized library
+# block, warnings generation produced). An approval regenerates the one
+# component whose inputs moved and concatenates the rest of its library.
+_SYMBOL_BLOCKS: dict[str, tuple[str, list[str]]] = {}
+# Top-level library -> the block digests its last written file was built from;
+# the union is what _SYMBOL_BLOCKS is pruned back to after every write.
+_TOP_DIGESTS: dict[str, set[str]] = {}
+# Approvals publish from concurrent request threads. One writer at a time, so
+# one call's prune cannot drop a block another call is about to assemble.
+_SYMBOLS_LOCK = threading.Lock()
 
 # Fingerprint of the base-symbol set the last written 7Sigma_Base.kicad_sym
 # was built from, plus how many symbols went into it.
@@ -65,9 +108,95 @@ def _base_symbol_fingerprint(db: Session) -> str:
     return hashlib.sha256(repr(rows).encode()).hexdigest()
 
 
+def _worker_count(settings: Settings, jobs: int) -> int:
+    n = settings.mirror_workers or os.cpu_count() or 1
+    return max(1, min(n, jobs))
+
+
+def _run_block_jobs(settings: Settings, jobs: list[tuple]) -> list[list[tuple[str | None, list[str]]]]:
+    """build_symbol_blocks over `jobs`, results in job order.
+
+    Generation (deepcopy + apply_properties + prettify) is CPU-bound pure
+    Python, so threads would just queue on the GIL; several libraries' worth
+    fan out to processes instead. `spawn`, not fork: the API process runs
+    threads (background refreshers, the request pool) and a forked child can
+    inherit a lock one of them held. Output is identical either way — every
+    job is self-contained and `map` keeps the order."""
+    workers = _worker_count(settings, len(jobs))
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                return list(pool.map(build_symbol_blocks, *zip(*jobs)))
+        except (OSError, BrokenProcessPool) as e:
+            log.warning(f"mirror: worker pool failed, generating in-process: {type(e).__name__}: {e}")
+    return [build_symbol_blocks(*job) for job in jobs]
+
+
+def _block_digest(key: str, name: str, props: list[dict], removed: list) -> str:
+    payload = json.dumps([key, name, props, removed], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _put(settings: Settings, path: Path, data: str | bytes) -> None:
+    """Write one mirror file and record its manifest entry from the bytes
+    just written, so the next manifest refresh has nothing to read back."""
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    path.write_bytes(raw)
+    st = path.stat()
+    entry = (st.st_mtime_ns, st.st_size, hashlib.sha256(raw).hexdigest())
+    rel = path.relative_to(settings.mirror_dir).as_posix()
+    with _MANIFEST_LOCK:
+        _MANIFEST_HASHES[rel] = entry
+
+
+def remove_file(settings: Settings, path: Path) -> bool:
+    """Delete one mirror file and its manifest entry. True if it existed."""
+    rel = path.relative_to(settings.mirror_dir).as_posix()
+    with _MANIFEST_LOCK:
+        _MANIFEST_HASHES.pop(rel, None)
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _write_files(settings: Settings, items) -> int:
+    """Write an iterable of (path, bytes | str) from a thread pool. Plain file
+    I/O releases the GIL, so this overlaps the writes without a process pool
+    — and without pickling ~1.4 GB of 3D models across to one. At most two
+    writes per worker are in flight, so a streamed source stays streamed."""
+    workers = _worker_count(settings, 1 << 16)
+
+    def write(path: Path, data) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _put(settings, path, data)
+
+    count = 0
+    with ThreadPoolExecutor(workers, thread_name_prefix="mirror-write") as pool:
+        pending: set = set()
+        for path, data in items:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when="FIRST_COMPLETED")
+                for f in done:
+                    f.result()
+            pending.add(pool.submit(write, path, data))
+            count += 1
+        for f in wait(pending).done:
+            f.result()
+    return count
+
+
 def write_symbol_libs(db: Session, settings: Settings, only_tops: set[str] | None = None) -> dict:
     """Generate Symbols/<TopCategory>.kicad_sym files. When `only_tops` is
-    given, only those libraries are rewritten (incremental update on edit)."""
+    given, only those libraries are rewritten (incremental update on edit).
+    Components whose generator inputs did not change reuse their cached
+    serialized block (_SYMBOL_BLOCKS)."""
+    with _SYMBOLS_LOCK:
+        return _write_symbol_libs(db, settings, only_tops)
+
+
+def _write_symbol_libs(db: Session, settings: Settings, only_tops: set[str] | None) -> dict:
     warnings: list[str] = []
     symbol_lib_count = 0
     component_count = 0
@@ -77,7 +206,6 @@ def write_symbol_libs(db: Session, settings: Settings, only_tops: set[str] | Non
         return {"symbol_libs": 0, "components_in_libs": 0, "warnings": warnings}
 
     meta_lib = load_symbol_lib_from_text(sample_sv.source_text)
-    provider = BaseSymbolProvider()
 
     sheets: dict[int, list] = {}
     for ds in db.execute(
@@ -108,38 +236,77 @@ def write_symbol_libs(db: Session, settings: Settings, only_tops: set[str] | Non
     if only_tops is not None:
         by_top = {k: v for k, v in by_top.items() if k in only_tops}
 
+    # Everything generation needs is read out of the session here, as plain
+    # data, so a symbol can be built without it (build_symbol_blocks) — and
+    # so its digest can be taken before deciding whether to build it at all.
     fp_display = footprint_display_names(db)
-    symbols_dir = settings.mirror_dir / "Symbols"
-    symbols_dir.mkdir(parents=True, exist_ok=True)
-    for top_name in sorted(by_top):
-        syms = []
+    top_names = sorted(by_top)
+    plans: dict[str, list[tuple[str, str | None]]] = {}
+    jobs: list[tuple] = []
+    job_digests: list[list[str]] = []
+    for top_name in top_names:
+        plan = plans[top_name] = []
+        entries = []
+        digests: list[str] = []
+        templates: dict[str, tuple[str, str]] = {}
         for comp, cv in sorted(by_top[top_name], key=lambda t: t[0].name):
             sv = cv.symbol_version
             if sv is None:
-                warnings.append(f"{comp.name}: no pinned symbol version — skipped in mirror")
+                plan.append((comp.name, None))
                 continue
-            try:
-                template = provider.get(
-                    cv.base_component, sv.source_text, cache_key=f"{cv.base_component}@{sv.id}"
-                )
-                own = [property_row_to_dict(p) for p in cv.properties]
-                fp_ref = next((p.value for p in cv.properties if p.key == "Footprint"), "")
-                # Footprint_Name first — see footprint_name_props() on why order matters.
-                props = (
-                    footprint_name_props(fp_ref, fp_display)
-                    + own
-                    + injected_props(sheets.get(comp.id))
-                )
-                syms.append(
-                    build_component_symbol(template, comp.name, props, cv.removed_properties, warnings)
-                )
-                component_count += 1
-            except Exception as e:
-                warnings.append(f"{comp.name}: generation failed — {e}")
-        (symbols_dir / f"{top_name}.kicad_sym").write_text(
-            build_library_text(meta_lib, syms), encoding="utf-8"
-        )
+            key = f"{cv.base_component}@{sv.id}"
+            own = [property_row_to_dict(p) for p in cv.properties]
+            fp_ref = next((p.value for p in cv.properties if p.key == "Footprint"), "")
+            # Footprint_Name first — see footprint_name_props() on why order matters.
+            props = (
+                footprint_name_props(fp_ref, fp_display)
+                + own
+                + injected_props(sheets.get(comp.id))
+            )
+            removed = list(cv.removed_properties or [])
+            digest = _block_digest(key, comp.name, props, removed)
+            plan.append((comp.name, digest))
+            if digest not in _SYMBOL_BLOCKS and digest not in digests:
+                templates.setdefault(key, (cv.base_component, sv.source_text))
+                entries.append((comp.name, key, props, removed))
+                digests.append(digest)
+        if entries:
+            jobs.append((entries, templates))
+            job_digests.append(digests)
+
+    # Failures are not cached: they are rare, and cheap to retry next time.
+    failed: dict[str, list[str]] = {}
+    for digests, results in zip(job_digests, _run_block_jobs(settings, jobs)):
+        for digest, (block, block_warnings) in zip(digests, results):
+            if block is None:
+                failed[digest] = block_warnings
+            else:
+                _SYMBOL_BLOCKS[digest] = (block, block_warnings)
+
+    symbols_dir = settings.mirror_dir / "Symbols"
+    symbols_dir.mkdir(parents=True, exist_ok=True)
+    for top_name in top_names:
+        blocks = []
+        for name, digest in plans[top_name]:
+            if digest is None:
+                warnings.append(f"{name}: no pinned symbol version — skipped in mirror")
+            elif digest in failed:
+                warnings.extend(failed[digest])
+            else:
+                block, block_warnings = _SYMBOL_BLOCKS[digest]
+                warnings.extend(block_warnings)
+                blocks.append(block)
+        _put(settings, symbols_dir / f"{top_name}.kicad_sym", library_text_from_blocks(meta_lib, blocks))
+        _TOP_DIGESTS[top_name] = {d for _, d in plans[top_name] if d is not None}
+        component_count += len(blocks)
         symbol_lib_count += 1
+    if only_tops is None:
+        # a full build knows every library — forget ones that no longer exist
+        for gone in _TOP_DIGESTS.keys() - set(top_names):
+            del _TOP_DIGESTS[gone]
+    live = set().union(*_TOP_DIGESTS.values())
+    for stale in _SYMBOL_BLOCKS.keys() - live:
+        del _SYMBOL_BLOCKS[stale]
 
     # Deduplicated base-symbol library: the ~50 unique graphical templates
     # every component derives from. This is what the PCM library package
@@ -170,7 +337,7 @@ def write_symbol_libs(db: Session, settings: Settings, only_tops: set[str] | Non
                     base_syms.append(entry)
             except Exception as e:
                 warnings.append(f"base symbol {sym.name}: mirror generation failed — {e}")
-        base_lib_path.write_text(build_library_text(meta_lib, base_syms), encoding="utf-8")
+        _put(settings, base_lib_path, build_library_text(meta_lib, base_syms))
         base_symbol_count = len(base_syms)
         # Only trust the fingerprint once the file is safely on disk.
         _BASE_LIB_STATE = (fingerprint, base_symbol_count)
@@ -179,46 +346,161 @@ def write_symbol_libs(db: Session, settings: Settings, only_tops: set[str] | Non
             "base_symbols": base_symbol_count, "warnings": warnings}
 
 
-def write_manifest(settings: Settings) -> int:
+def _hash_file(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _load_manifest_index(settings: Settings) -> None:
+    """Adopt the persisted index: all of it before this process's first scan
+    (the scan verifies every entry), afterwards — when another process wrote
+    it — only as a list of paths to re-stat."""
+    path = settings.data_dir / MANIFEST_INDEX
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return
+    stamp = (st.st_mtime_ns, st.st_size)
+    if stamp == _MANIFEST_STATE["sidecar"]:
+        return
+    try:
+        stored = {rel: tuple(e) for rel, e in json.loads(path.read_bytes())["files"].items()}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log.warning(f"manifest hash index unreadable, ignoring it: {e}")
+        return
+    with _MANIFEST_LOCK:
+        if _MANIFEST_STATE["scanned"]:
+            _MANIFEST_PENDING.update(rel for rel in stored.keys() | _MANIFEST_HASHES.keys()
+                                     if stored.get(rel) != _MANIFEST_HASHES.get(rel))
+        else:
+            for rel, entry in stored.items():
+                _MANIFEST_HASHES.setdefault(rel, entry)
+    _MANIFEST_STATE["sidecar"] = stamp
+
+
+def _save_manifest_index(settings: Settings) -> None:
+    path = settings.data_dir / MANIFEST_INDEX
+    with _MANIFEST_LOCK:
+        body = json.dumps({"files": _MANIFEST_HASHES}, separators=(",", ":"))
+    try:
+        tmp = path.with_suffix(".part")
+        tmp.write_text(body, encoding="utf-8")
+        tmp.replace(path)
+        st = path.stat()
+    except OSError as e:
+        log.warning(f"manifest hash index not saved: {e}")
+        return
+    _MANIFEST_STATE["sidecar"] = (st.st_mtime_ns, st.st_size)
+
+
+def _refresh_hashes(settings: Settings, only: set[str] | None) -> None:
+    """Stat the mirror — all of it, or just `only` — and re-hash, on a thread
+    pool, every file whose (mtime, size) does not match its entry. Entries
+    `_put` replaced meanwhile are left alone: they are newer than the stat."""
+    mirror = settings.mirror_dir
+    if only is None:
+        paths = (p for p in mirror.rglob("*")
+                 if p.is_file() and p.name != "manifest.json" and not p.name.endswith(".part"))
+    else:
+        paths = (mirror / rel for rel in only)
+    found: dict[str, tuple[Path, int, int]] = {}
+    for path in paths:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        found[path.relative_to(mirror).as_posix()] = (path, st.st_mtime_ns, st.st_size)
+    with _MANIFEST_LOCK:
+        known = dict(_MANIFEST_HASHES) if only is None else {r: _MANIFEST_HASHES.get(r) for r in only}
+    misses = [(rel, *f) for rel, f in found.items() if (known.get(rel) or ())[:2] != f[1:]]
+    digests: list[str | None] = []
+    if misses:
+        # hashlib and file reads release the GIL, so threads really overlap
+        with ThreadPoolExecutor(_worker_count(settings, len(misses)), thread_name_prefix="manifest-hash") as pool:
+            digests = list(pool.map(lambda m: _try_hash(m[1]), misses))
+    with _MANIFEST_LOCK:
+        for rel in known.keys() - found.keys():
+            if _MANIFEST_HASHES.get(rel) == known[rel]:
+                _MANIFEST_HASHES.pop(rel, None)
+        for (rel, _, mtime, size), digest in zip(misses, digests):
+            if digest is not None and _MANIFEST_HASHES.get(rel) == known.get(rel):
+                _MANIFEST_HASHES[rel] = (mtime, size, digest)
+    if misses:
+        log.info(f"manifest: {len(misses)} of {len(found)} files hashed")
+
+
+def _try_hash(path: Path) -> str | None:
+    try:
+        return _hash_file(path)
+    except FileNotFoundError:
+        return None  # removed since the stat
+
+
+@contextmanager
+def _manifest_file_lock(settings: Settings):
+    """Exclusive flock on DATA_DIR/manifest-hashes.lock for one manifest write.
+
+    Another process's index must not change between this one reading it and
+    publishing manifest.json: an entry it saved in between would be
+    overwritten here with the stale one, and sync clients would skip that
+    file until the other process writes again."""
+    settings.data_dir.mkdir(parents=True, exist_ok=True)
+    with open(settings.data_dir / MANIFEST_INDEX_LOCK, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_manifest(settings: Settings, full: bool = False) -> int:
     """Rewrite manifest.json — the hash index the PCM builder and sync clients
-    key off. Hashing is memoised on (mtime_ns, size): a component approval
-    changes a couple of .kicad_sym files, but the tree also holds ~1.4 GB of
-    3D models that would otherwise be re-hashed every single time. The stat()
-    still happens per file, so any content change is picked up; only the
-    read+SHA-256 is skipped. The manifest's own format is unchanged."""
+    key off — from _MANIFEST_HASHES.
+
+    The first call in a process (or `full`) stats the whole tree and hashes
+    only what the persisted index does not already vouch for. After that the
+    index is kept current by the writers themselves, so a refresh after an
+    edit costs the serialization plus a stat of whatever another process
+    reported changing. The manifest's own format is unchanged.
+
+    Loading the index, writing manifest.json and saving the index happen
+    under one lock, in-process and across processes sharing the volume."""
     mirror = settings.mirror_dir
-    files = []
-    seen: set[str] = set()
-    for path in sorted(p for p in mirror.rglob("*") if p.is_file() and p.name != "manifest.json"):
-        rel = path.relative_to(mirror).as_posix()
-        st = path.stat()
-        stamp = (st.st_mtime_ns, st.st_size)
-        cached = _MANIFEST_HASHES.get(rel)
-        if cached is not None and cached[:2] == stamp:
-            digest = cached[2]
+    with _MANIFEST_WRITE_LOCK, _manifest_file_lock(settings):
+        _load_manifest_index(settings)
+        if full or not _MANIFEST_STATE["scanned"]:
+            _refresh_hashes(settings, None)
+            _MANIFEST_STATE["scanned"] = True
+            with _MANIFEST_LOCK:
+                _MANIFEST_PENDING.clear()
         else:
-            digest = hashlib.sha256(path.read_bytes()).hexdigest()
-            _MANIFEST_HASHES[rel] = (*stamp, digest)
-        seen.add(rel)
-        files.append({"path": rel, "sha256": digest, "size": st.st_size})
-    # Drop cache entries for files that no longer exist, so the dict tracks the
-    # mirror rather than growing forever across rebuilds.
-    for stale in _MANIFEST_HASHES.keys() - seen:
-        del _MANIFEST_HASHES[stale]
-    manifest = {
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "file_count": len(files),
-        "files": files,
-    }
-    (mirror / "manifest.json").write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+            with _MANIFEST_LOCK:
+                pending = set(_MANIFEST_PENDING)
+                _MANIFEST_PENDING.clear()
+            if pending:
+                _refresh_hashes(settings, pending)
+        with _MANIFEST_LOCK:
+            # Path order (component-wise), as the rglob walk produced it
+            entries = sorted(_MANIFEST_HASHES.items(), key=lambda kv: kv[0].split("/"))
+        files = [{"path": rel, "sha256": digest, "size": size} for rel, (_, size, digest) in entries]
+        manifest = {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "file_count": len(files),
+            "files": files,
+        }
+        (mirror / "manifest.json").write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+        _save_manifest_index(settings)
     return len(files)
 
 
 def update_mirror_symbols(db: Session, settings: Settings, top_names: set[str]) -> dict:
     """Incremental mirror update after a component edit: rewrite only the
-    affected top-level symbol libraries, then refresh the manifest."""
+    affected top-level symbol libraries, then refresh the manifest and the
+    KiCad HTTP catalog snapshot (every caller of this is a publish)."""
     result = write_symbol_libs(db, settings, only_tops=top_names)
     result["manifest_files"] = write_manifest(settings)
+    catalog.rebuild(db)
+    search_index.refresh()
     return result
 
 
@@ -235,25 +517,93 @@ def update_mirror_footprint(db: Session, settings: Settings, name: str) -> dict:
                 "warnings": [f"footprint {name}: no published version — mirror unchanged"]}
     pretty = settings.mirror_dir / "Footprints" / "7Sigma.pretty"
     pretty.mkdir(parents=True, exist_ok=True)
-    (pretty / f"{fp.name}.kicad_mod").write_text(fv.source_text, encoding="utf-8")
+    _put(settings, pretty / f"{fp.name}.kicad_mod", fv.source_text)
+    # Catalog parts carry the footprint's display name as Footprint_Name.
+    catalog.rebuild(db)
+    search_index.refresh()
     return {"footprints": 1, "manifest_files": write_manifest(settings), "warnings": []}
 
 
-def update_mirror_model3d(settings: Settings, m: M.Model3D) -> dict:
+def _model_current(settings: Settings, path: Path, sha256: str) -> bool:
+    """Whether the mirror file already holds the content hashed `sha256`. The
+    manifest index answers for files whose (mtime, size) it knows; anything
+    else is read back once and recorded — still far cheaper than pulling the
+    blob out of Postgres to compare."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return False
+    rel = path.relative_to(settings.mirror_dir).as_posix()
+    with _MANIFEST_LOCK:
+        entry = _MANIFEST_HASHES.get(rel)
+    if entry is None or entry[:2] != (st.st_mtime_ns, st.st_size):
+        entry = (st.st_mtime_ns, st.st_size, _hash_file(path))
+        with _MANIFEST_LOCK:
+            _MANIFEST_HASHES[rel] = entry
+    return entry[2] == sha256
+
+
+def _write_model(db: Session, settings: Settings, model_id: int, rel_path: str, sha256: str) -> None:
+    path = settings.mirror_dir / "3DModels" / rel_path
+    size, digest = model_blobs.copy_to(db, model_id, path)
+    if digest != sha256:
+        log.warning(f"3D model {rel_path}: stored bytes hash to {digest[:12]}, row says {sha256[:12]}")
+    st = path.stat()
+    with _MANIFEST_LOCK:
+        _MANIFEST_HASHES[path.relative_to(settings.mirror_dir).as_posix()] = (st.st_mtime_ns, size, digest)
+
+
+def sync_models3d(db: Session, settings: Settings) -> dict:
+    """Bring 3DModels/ in line with the `models3d` table: stream out the
+    models whose file is missing or differs, delete files no row names, and
+    leave everything else untouched. Reads row metadata only — the bytes of a
+    changed model arrive chunk by chunk (model_blobs), so memory stays flat
+    however large the library is."""
+    _load_manifest_index(settings)
+    models_dir = settings.mirror_dir / "3DModels"
+    rows = db.execute(select(M.Model3D.id, M.Model3D.rel_path, M.Model3D.sha256)).all()
+    wanted = {r.rel_path for r in rows}
+    removed = 0
+    if models_dir.is_dir():
+        for path in models_dir.rglob("*"):
+            if path.is_file() and path.relative_to(models_dir).as_posix() not in wanted:
+                remove_file(settings, path)
+                removed += 1
+    written = 0
+    for r in rows:
+        if _model_current(settings, models_dir / r.rel_path, r.sha256):
+            continue
+        _write_model(db, settings, r.id, r.rel_path, r.sha256)
+        written += 1
+    if written or removed:
+        log.info(f"mirror: {written} 3D models written, {removed} removed, {len(rows) - written} unchanged")
+    return {"models3d": len(rows), "written": written, "removed": removed}
+
+
+def update_mirror_model3d(db: Session, settings: Settings, m: M.Model3D) -> dict:
     """Incremental mirror update after a 3D model upload: write the one file
     (models3d carries no version/draft gate, so a successful upload is live
-    immediately), then refresh the manifest."""
+    immediately) unless it already holds these bytes, then refresh the
+    manifest."""
     target = settings.mirror_dir / "3DModels" / m.rel_path
-    target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_bytes(m.data)
+    if not _model_current(settings, target, m.sha256):
+        _write_model(db, settings, m.id, m.rel_path, m.sha256)
     return {"models3d": 1, "manifest_files": write_manifest(settings)}
 
 
 def rebuild_mirror(db: Session, settings: Settings) -> dict:
     settings.ensure_dirs()
     mirror = settings.mirror_dir
+    # 3D models survive the wipe: sync_models3d below rewrites only those
+    # that differ from their row, instead of ~1.4 GB every time.
     for child in mirror.iterdir():
+        if child.name == "3DModels":
+            continue
         shutil.rmtree(child) if child.is_dir() else child.unlink()
+    with _MANIFEST_LOCK:
+        # the writes below record every other entry again
+        for rel in [r for r in _MANIFEST_HASHES if not r.startswith("3DModels/")]:
+            del _MANIFEST_HASHES[rel]
 
     # --- symbols: one .kicad_sym per top-level category --------------------
     sym_result = write_symbol_libs(db, settings)
@@ -264,25 +614,23 @@ def rebuild_mirror(db: Session, settings: Settings) -> dict:
     # --- footprints ---------------------------------------------------------
     pretty = mirror / "Footprints" / "7Sigma.pretty"
     pretty.mkdir(parents=True, exist_ok=True)
-    footprint_count = 0
-    for fp in db.execute(select(M.Footprint)).scalars():
-        fv = next((v for v in fp.versions if v.id == fp.current_version_id), None)
-        if fv is None or fv.status != "published":
-            continue
-        (pretty / f"{fp.name}.kicad_mod").write_text(fv.source_text, encoding="utf-8")
-        footprint_count += 1
+
+    def footprint_files():
+        for fp in db.execute(select(M.Footprint)).scalars():
+            fv = next((v for v in fp.versions if v.id == fp.current_version_id), None)
+            if fv is None or fv.status != "published":
+                continue
+            yield pretty / f"{fp.name}.kicad_mod", fv.source_text
+
+    footprint_count = _write_files(settings, footprint_files())
 
     # --- 3D models ----------------------------------------------------------
-    models_dir = mirror / "3DModels"
-    model_count = 0
-    for m in db.execute(select(M.Model3D).execution_options(yield_per=20)).scalars():
-        target = models_dir / m.rel_path
-        target.parent.mkdir(parents=True, exist_ok=True)
-        target.write_bytes(m.data)
-        model_count += 1
+    model_count = sync_models3d(db, settings)["models3d"]
 
     # --- manifest ------------------------------------------------------------
-    write_manifest(settings)
+    write_manifest(settings, full=True)
+    catalog.rebuild(db)
+    search_index.refresh()
 
     return {
         "symbol_libs": symbol_lib_count,
@@ -0,0 +1,58 @@
+"""Chunked reads of 3D model content (`models3d.data`).
+
+A model row is content-addressed (`sha256`, `size_bytes`) and its bytes can
+be 15 MB of STEP; the library holds ~1.4 GB of them. Loading `data` through
+the ORM materializes the whole value — so the column is deferred on the
+model, and everything that needs the bytes goes through here instead:
+`substring()` slices of CHUNK bytes, one round trip each, so memory stays
+at one chunk whatever the file size.
+
+`copy_to` is the mirror's writer: stream into a `.part` file, hashing on
+the way, and swap it in whole.
+"""
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterator
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import models as M
+
+CHUNK = 4 << 20
+
+
+def iter_chunks(db: Session, model_id: int, chunk: int = CHUNK) -> Iterator[bytes]:
+    """The model's bytes, `chunk` at a time."""
+    offset = 0
+    while True:
+        piece = db.execute(
+            select(func.substring(M.Model3D.data, offset + 1, chunk)).where(M.Model3D.id == model_id)
+        ).scalar_one()
+        if not piece:
+            return
+        yield bytes(piece)
+        if len(piece) < chunk:
+            return
+        offset += len(piece)
+
+
+def copy_to(db: Session, model_id: int, path: Path) -> tuple[int, str]:
+    """Stream one model into `path` (atomically). Returns (size, sha256) of
+    what was written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".part")
+    h = hashlib.sha256()
+    size = 0
+    try:
+        with tmp.open("wb") as f:
+            for piece in iter_chunks(db, model_id):
+                h.update(piece)
+                f.write(piece)
+                size += len(piece)
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return size, h.hexdigest()
@@ -28,6 +28,7 @@ import httpx
 from sqlalchemy.orm import Session
 
 from .. import models as M
+from . import fx
 
 BASE = "https://api.nbp.pl/api/exchangerates/rates/a"
 MAX_BACKTRACK = 10  # working-day gaps: long weekends, Christmas, Easter
@@ -113,9 +114,11 @@ def record_history(db: Session, currency: str, rate: float, on: str) -> bool:
     if existing is not None:
         if abs((existing.rate_usd or 0) - rate) > 1e-9:
             existing.rate_usd = rate
+            fx.invalidate_timeline()
             return True
         return False
     db.add(M.ExchangeRateHistory(currency=cur, rate_usd=rate, recorded_at=at))
+    fx.invalidate_timeline()
     return True
 
 
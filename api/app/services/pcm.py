@@ -40,10 +40,19 @@ its sha256.
 from __future__ import annotations
 
 import hashlib
+import io
 import json
 import logging
+import multiprocessing
+import os
+import shutil
+import struct
+import tempfile
 import threading
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
 
@@ -157,27 +166,291 @@ def _build_library_zip(path: Path) -> int:
     return size
 
 
-def _build_models_zip(path: Path) -> int:
-    """3dmodels/ — the mirror's 3DModels tree verbatim. Level-1 deflate:
-    STEP is text and compresses fine; the tree is 1.4 GB so speed matters."""
+# --- models package: precompressed members --------------------------------
+# Deflating the whole 1.4 GB tree on every model change took many minutes of
+# one core. A member's deflate stream depends only on its bytes (level 6, raw
+# window, one stream per member — exactly what `writestr(..., compresslevel=6)`
+# produces), so each is compressed once, by content hash, under
+# DATA_DIR/pcm-members:
+#
+#     <sha256>.d6     CRC-32 (4 B LE) + size (8 B LE) + the raw deflate stream
+#
+# and a package is assembled by copying those streams behind the same headers
+# zipfile would write. The result is byte-identical to the writestr build —
+# `_raw_members_ok` proves it against this interpreter's zipfile before the
+# fast path is trusted — so package hashes do not move. Outside DATA_DIR/pcm
+# on purpose: `ensure_built` prunes every file there it did not just publish.
+MEMBER_LEVEL = 6
+_MEMBER_HEAD = struct.Struct("<IQ")
+_raw_ok: bool | None = None
+
+
+def _member_dir() -> Path:
+    d = settings.data_dir / "pcm-members"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def _deflate_member(src: str, out_dir: str) -> str:
+    """Compress one file into the member cache; returns its content sha256.
+    Top-level and str-typed: it runs in a spawned worker process."""
+    h = hashlib.sha256()
+    crc = 0
     size = 0
+    co = zlib.compressobj(MEMBER_LEVEL, zlib.DEFLATED, -15)
+    tmp = Path(out_dir) / f"{os.getpid()}-{threading.get_ident()}.part"
+    with open(src, "rb") as fin, open(tmp, "wb") as fout:
+        fout.write(_MEMBER_HEAD.pack(0, 0))
+        for chunk in iter(lambda: fin.read(1 << 20), b""):
+            h.update(chunk)
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            fout.write(co.compress(chunk))
+        fout.write(co.flush())
+        fout.seek(0)
+        fout.write(_MEMBER_HEAD.pack(crc, size))
+    digest = h.hexdigest()
+    tmp.replace(Path(out_dir) / f"{digest}.d{MEMBER_LEVEL}")
+    return digest
+
+
+def _compress_all(fn, srcs: list[str], out_dir: Path) -> list[str]:
+    """`fn(src, out_dir)` over `srcs` on a process pool (MIRROR_WORKERS),
+    results in order. Compression is CPU-bound, so threads would queue on the
+    GIL for the Python side of every chunk."""
+    workers = max(1, min(settings.mirror_workers or os.cpu_count() or 1, len(srcs)))
+    if workers > 1:
+        try:
+            # spawn, not fork: see mirror._run_block_jobs
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                return list(pool.map(fn, srcs, [str(out_dir)] * len(srcs)))
+        except (OSError, BrokenProcessPool) as e:
+            log.warning(f"PCM: compression pool failed, compressing in-process: {type(e).__name__}: {e}")
+    return [fn(src, str(out_dir)) for src in srcs]
+
+
+def _zip_add_member(zf: zipfile.ZipFile, arcname: str, member: Path) -> int:
+    """Append a precompressed member: the local header writestr would end up
+    with (sizes and CRC known up front, so no rewrite), then the stored
+    stream. Returns the uncompressed size."""
+    zi = _zip_entry(arcname)
+    with member.open("rb") as src:
+        zi.CRC, zi.file_size = _MEMBER_HEAD.unpack(src.read(_MEMBER_HEAD.size))
+        zi.compress_size = member.stat().st_size - _MEMBER_HEAD.size
+        zip64 = zi.file_size * 1.05 > zipfile.ZIP64_LIMIT
+        zf.fp.seek(zf.start_dir)
+        zi.header_offset = zf.fp.tell()
+        zf.fp.write(zi.FileHeader(zip64))
+        shutil.copyfileobj(src, zf.fp, 1 << 20)
+    zf.start_dir = zf.fp.tell()
+    zf.filelist.append(zi)
+    zf.NameToInfo[arcname] = zi
+    return zi.file_size
+
+
+def _raw_members_ok() -> bool:
+    """Whether assembling from members reproduces writestr byte for byte on
+    this Python. Checked once per process on a throwaway sample."""
+    global _raw_ok
+    if _raw_ok is None:
+        sample = [("3dmodels/a.step", b"ISO-10303-21;\n" * 500), ("3dmodels/sub/empty.wrl", b"")]
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            ref, fast = io.BytesIO(), io.BytesIO()
+            with zipfile.ZipFile(ref, "w", zipfile.ZIP_DEFLATED, compresslevel=MEMBER_LEVEL) as zf:
+                for arcname, data in sample:
+                    zf.writestr(_zip_entry(arcname), data, compresslevel=MEMBER_LEVEL)
+            with zipfile.ZipFile(fast, "w", zipfile.ZIP_DEFLATED, compresslevel=MEMBER_LEVEL) as zf:
+                for i, (arcname, data) in enumerate(sample):
+                    src = root / str(i)
+                    src.write_bytes(data)
+                    digest = _deflate_member(str(src), tmp)
+                    _zip_add_member(zf, arcname, root / f"{digest}.d{MEMBER_LEVEL}")
+            _raw_ok = ref.getvalue() == fast.getvalue()
+        if not _raw_ok:
+            log.warning("PCM: precompressed members do not reproduce zipfile output here — "
+                        "building the models package the slow way")
+    return _raw_ok
+
+
+def _build_models_zip(path: Path, entries: list[dict]) -> int:
+    """3dmodels/ — the mirror's 3DModels tree verbatim, level-6 deflate
+    (~10-15% smaller than level 1 on STEP text). Members come from the
+    content-addressed cache; only models it does not hold yet are compressed,
+    on a process pool. Returns the uncompressed size."""
     root = settings.mirror_dir / "3DModels"
-    # level 6: ~10-15% smaller than level 1 on STEP text; the build is
-    # cached per content hash, so the extra CPU is paid once per change
-    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
-        for f in sorted(root.rglob("*")):
-            if not f.is_file():
-                continue
-            rel = f.relative_to(root).as_posix()
+    files = [(f.relative_to(root).as_posix(), f) for f in sorted(root.rglob("*"))
+             if f.is_file() and not f.name.endswith(".part")]
+    if not _raw_members_ok():
+        return _build_models_zip_slow(path, files)
+
+    members = _member_dir()
+    known = {e["path"][len("3DModels/"):]: e["sha256"] for e in entries
+             if e["path"].startswith("3DModels/")}
+    digests: dict[str, str] = {}
+    todo: list[tuple[str, Path]] = []
+    for rel, f in files:
+        sha = known.get(rel)
+        if sha and (members / f"{sha}.d{MEMBER_LEVEL}").exists():
+            digests[rel] = sha
+        else:
+            todo.append((rel, f))
+    if todo:
+        done = _compress_all(_deflate_member, [str(f) for _, f in todo], members)
+        digests.update((rel, d) for (rel, _), d in zip(todo, done))
+        log.info(f"PCM: compressed {len(todo)} of {len(files)} models")
+
+    size = 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=MEMBER_LEVEL) as zf:
+        for rel, _ in files:
+            size += _zip_add_member(zf, f"3dmodels/{rel}", members / f"{digests[rel]}.d{MEMBER_LEVEL}")
+    # keep exactly the members this package uses; delta members of models
+    # that left the mirror go too
+    used = {f"{d}.d{MEMBER_LEVEL}" for d in digests.values()}
+    for f in members.iterdir():
+        if f.name not in used:
+            f.unlink(missing_ok=True)
+    live = set(known.values())
+    for f in _delta_dir().iterdir():
+        if f.name.split(".", 1)[0] not in live and not f.name.endswith(".part"):
+            f.unlink(missing_ok=True)
+    return size
+
+
+def _build_models_zip_slow(path: Path, files: list[tuple[str, Path]]) -> int:
+    size = 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=MEMBER_LEVEL) as zf:
+        for rel, f in files:
             # NOT zf.write(f, ...): that stamps each member with the source
             # file's mtime, which a mirror regeneration changes even when the
             # model bytes do not — see ZIP_EPOCH. Largest model is ~15 MB, so
             # reading one at a time is fine.
-            zf.writestr(_zip_entry(f"3dmodels/{rel}"), f.read_bytes(), compresslevel=6)
+            zf.writestr(_zip_entry(f"3dmodels/{rel}"), f.read_bytes(), compresslevel=MEMBER_LEVEL)
             size += f.stat().st_size
     return size
 
 
+# --- sync-plugin deltas: LZMA members ---------------------------------------
+# POST /api/kicad/pcm/models-delta answers with a zip of just the models a
+# plugin is missing, LZMA-compressed (~2x smaller than deflate on STEP text).
+# Every client asks for the same few changed files after a publish, so each
+# member is compressed once, keyed by content hash, under DATA_DIR/pcm-delta
+# (same layout as the deflate members, `.xz`), and a response is a zip
+# streamed straight from those files: no per-request compression, memory of
+# one chunk. Pruned alongside the package members.
+_DELTA_CHUNK = 1 << 20
+
+
+def _delta_dir() -> Path:
+    d = settings.data_dir / "pcm-delta"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def _lzma_member(src: str, out_dir: str) -> str:
+    """`_deflate_member` for the delta cache: the stream zipfile's own LZMA
+    compressor writes (properties header included). Returns the sha256."""
+    h = hashlib.sha256()
+    crc = 0
+    size = 0
+    co = zipfile.LZMACompressor()
+    tmp = Path(out_dir) / f"{os.getpid()}-{threading.get_ident()}.part"
+    with open(src, "rb") as fin, open(tmp, "wb") as fout:
+        fout.write(_MEMBER_HEAD.pack(0, 0))
+        for chunk in iter(lambda: fin.read(_DELTA_CHUNK), b""):
+            h.update(chunk)
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            fout.write(co.compress(chunk))
+        fout.write(co.flush())
+        fout.seek(0)
+        fout.write(_MEMBER_HEAD.pack(crc, size))
+    digest = h.hexdigest()
+    tmp.replace(Path(out_dir) / f"{digest}.xz")
+    return digest
+
+
+def delta_members(files: list[tuple[str, Path]]) -> list[tuple[str, Path]]:
+    """(arcname, cached LZMA member) per (arcname, mirror file), compressing
+    the ones the cache does not hold yet. Keyed by the manifest's hash while
+    the file still has the manifest's size and is no newer than
+    manifest.json, else by hashing the file — either is far cheaper than
+    LZMA. The mtime check matters: a same-size replacement served between
+    its write and the manifest refresh would otherwise ship the old member."""
+    out = _delta_dir()
+    try:
+        # stat before reading: a manifest rewritten in between only makes
+        # the cutoff more conservative
+        cutoff = (settings.mirror_dir / "manifest.json").stat().st_mtime_ns
+    except OSError:
+        cutoff = -1
+    state = _mirror_state()
+    listed = {e["path"]: (e["sha256"], e.get("size")) for e in state[2]} if state else {}
+    members: dict[str, Path] = {}
+    todo: list[tuple[str, Path]] = []
+    for arcname, f in files:
+        sha, size = listed.get(arcname, (None, None))
+        st = f.stat()
+        if sha is None or size != st.st_size or st.st_mtime_ns > cutoff:
+            sha = _sha256_file(f)
+        member = out / f"{sha}.xz"
+        if member.exists():
+            members[arcname] = member
+        else:
+            todo.append((arcname, f))
+    if todo:
+        done = _compress_all(_lzma_member, [str(f) for _, f in todo], out)
+        members.update((arcname, out / f"{d}.xz") for (arcname, _), d in zip(todo, done))
+        log.info(f"PCM delta: compressed {len(todo)} of {len(files)} models")
+    return [(arcname, members[arcname]) for arcname, _ in files]
+
+
+class _Sink:
+    """Write-only, unseekable target for ZipFile: collects what it is given
+    until the stream generator drains it."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def stream_zip(members: list[tuple[str, Path]], compress_type: int = zipfile.ZIP_LZMA):
+    """Yield a zip of precompressed `members` chunk by chunk. The zip goes to
+    an unseekable sink, so zipfile keeps the offsets itself; sizes and CRC are
+    known from the member headers, so no data descriptors are needed."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compress_type) as zf:
+        for arcname, member in members:
+            zi = _zip_entry(arcname)
+            zi.compress_type = compress_type
+            if compress_type == zipfile.ZIP_LZMA:
+                zi.flag_bits |= 0x02  # end-of-stream marker present, as zipfile sets it
+            with member.open("rb") as src:
+                zi.CRC, zi.file_size = _MEMBER_HEAD.unpack(src.read(_MEMBER_HEAD.size))
+                zi.compress_size = member.stat().st_size - _MEMBER_HEAD.size
+                zi.header_offset = zf.fp.tell()
+                zf.fp.write(zi.FileHeader(zi.file_size * 1.05 > zipfile.ZIP64_LIMIT))
+                yield sink.drain()
+                for chunk in iter(lambda: src.read(_DELTA_CHUNK), b""):
+                    zf.fp.write(chunk)
+                    yield sink.drain()
+            zf.start_dir = zf.fp.tell()
+            zf.filelist.append(zi)
+            zf.NameToInfo[arcname] = zi
+    yield sink.drain()
+
+
 def _plugin_files(token: str = "") -> list[tuple[str, bytes]]:
     """The sync plugin's zip members: templates get the platform URL and the
     caller's API token baked in; icons ship verbatim. plugin.json must sit at
@@ -423,7 +696,7 @@ def ensure_built() -> dict | None:
             "models": _resolve_package(
                 out, prev, "models",
                 _subtree_hash(entries, ("3DModels/",)),
-                version, "models3d", _build_models_zip,
+                version, "models3d", lambda tmp: _build_models_zip(tmp, entries),
             ),
             "plugin": _resolve_package(
                 out, prev, "plugin", plugin_hash, PLUGIN_VERSION, "sync", _build_plugin_zip,
@@ -513,18 +786,20 @@ _warmed = False
 
 def start_background_build(delay_s: float = 30.0) -> None:
     """Warm the PCM artifacts shortly after startup so the first PCM
-    request doesn't wait for the 1.4 GB models zip."""
+    request doesn't wait for the 1.4 GB models zip. A `pcm_build` job: one
+    build however many replicas start at once."""
     global _warmed
     if _warmed:
         return
     _warmed = True
+    from . import jobs
+
+    try:
+        jobs.submit("pcm_build", dedupe_key="pcm_build", delay_s=delay_s, priority=2)
+    except Exception as e:  # noqa: BLE001 — the first PCM request builds anyway
+        log.warning(f"PCM warm build not queued: {e}")
 
-    def build():
-        try:
-            ensure_built()
-        except Exception as e:
-            log.warning(f"PCM warm build failed: {e}")
 
-    t = threading.Timer(delay_s, build)
-    t.daemon = True
-    t.start()
+def run_build_job(payload: dict) -> dict:
+    """Job handler for kind `pcm_build`."""
+    return {"built": ensure_built() is not None}
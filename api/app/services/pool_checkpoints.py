@@ -0,0 +1,166 @@
+"""Persisted checkpoints of the `run_actuals.pool_state` replay.
+
+The pool is a moving average, so its state on any date is a pure function of
+every event up to that date — and `pool_state` used to recompute it from the
+first invoice on every call. Historical BOM pricing calls it once per priced
+BOM, the register and shortage checks again, each replaying years of history
+to change nothing but the last few weeks.
+
+A checkpoint is the full per-part state at the END of one event date, stored
+under DATA_DIR/pool-checkpoints:
+
+    <date>_<digest>.json      {"date": ..., "count": n, "pool": {key: {...}}}
+
+`digest` hashes one line per event up to and including that date (see
+`run_actuals._event_lines` — every input the replay reads, down to the FX rate
+each purchase resolved). Validity is checked against the events as they are
+NOW, so a backdated invoice, an edited quantity, a voided draw or a corrected
+rate all change the digest of every checkpoint at or after its date and those
+are dropped; nothing that writes an event has to remember to invalidate.
+Checkpoints before the change still match and the replay resumes from the
+latest of them.
+
+The replay's floats come back from JSON exactly (repr round-trips), so a
+resumed replay produces the same bytes as a full one, identities included.
+Bump VERSION whenever the replay rules in `pool_state` change.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from bisect import bisect_right
+from pathlib import Path
+
+from ..config import settings
+
+log = logging.getLogger(__name__)
+
+VERSION = 1
+
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_NAME = re.compile(r"(\d{4}-\d{2}-\d{2})_([0-9a-f]{32})\.json")
+
+_lock = threading.Lock()
+# file name -> parsed pool, the few most recently used
+_bodies: dict[str, dict] = {}
+_MAX_BODIES = 4
+
+
+def _dir() -> Path:
+    return settings.data_dir / "pool-checkpoints"
+
+
+def _listing() -> list[tuple[str, str, Path]]:
+    """(date, digest, path), oldest first."""
+    root = _dir()
+    if not root.is_dir():
+        return []
+    found = []
+    for f in root.iterdir():
+        m = _NAME.fullmatch(f.name)
+        if m:
+            found.append((m.group(1), m.group(2), f))
+    found.sort()
+    return found
+
+
+def _load(path: Path) -> dict | None:
+    with _lock:
+        pool = _bodies.get(path.name)
+    if pool is None:
+        try:
+            pool = json.loads(path.read_bytes())["pool"]
+        except (OSError, ValueError, KeyError) as e:
+            log.warning(f"pool checkpoint {path.name} unreadable, dropped: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        with _lock:
+            _bodies[path.name] = pool
+            while len(_bodies) > _MAX_BODIES:
+                _bodies.pop(next(iter(_bodies)))
+    # the replay mutates its state in place; the cached copy must stay pristine
+    return {k: dict(v) for k, v in pool.items()}
+
+
+class Replay:
+    """Checkpoint bookkeeping for one `pool_state` call.
+
+    `keys` are the events' sort dates (`date or "9999"`, non-decreasing) and
+    `lines` their signatures. `resume()` says where to start; `after(i, pool)`
+    is called once the event at index i has been applied.
+    """
+
+    def __init__(self, keys: list[str], lines: list[str], as_of: str | None):
+        self.keys = keys
+        self.lines = lines
+        self.as_of = as_of
+        self.every = settings.pool_checkpoint_events
+        self._h = hashlib.blake2b(f"pool v{VERSION}\n".encode(), digest_size=16)
+        self._pos = 0
+        self._last = 0
+
+    def _digest_at(self, n: int) -> str:
+        if n > self._pos:
+            self._h.update("".join(self.lines[self._pos:n]).encode())
+            self._pos = n
+        return self._h.hexdigest()
+
+    def resume(self) -> tuple[int, dict | None]:
+        """(events already covered, their pool state) from the latest valid
+        checkpoint, or (0, None). Stale checkpoints are deleted on the way."""
+        listing = _listing()
+        best, best_h = 0, self._h.copy()
+        best_path = None
+        for idx, (date, digest, path) in enumerate(listing):
+            if self.as_of and date > self.as_of:
+                break  # beyond this replay's horizon: cannot be checked here
+            n = bisect_right(self.keys, date)
+            if self._digest_at(n) != digest:
+                # every later checkpoint's prefix contains this one's change
+                stale = listing[idx:]
+                for _, _, p in stale:
+                    p.unlink(missing_ok=True)
+                log.info(f"pool checkpoints: {len(stale)} stale from {date}, replaying from event {best}")
+                break
+            best, best_h, best_path = n, self._h.copy(), path
+        self._h, self._pos, self._last = best_h, best, best
+        if best_path is None:
+            return 0, None
+        pool = _load(best_path)
+        if pool is None:
+            self._h = hashlib.blake2b(f"pool v{VERSION}\n".encode(), digest_size=16)
+            self._pos = self._last = 0
+            return 0, None
+        return best, pool
+
+    def after(self, i: int, pool: dict) -> None:
+        n = i + 1
+        if n - self._last < self.every:
+            return
+        date = self.keys[i]
+        if n < len(self.keys) and self.keys[n] == date:
+            return  # only at the end of a date
+        if not _DATE.fullmatch(date):
+            return  # undated events sort last and never get a checkpoint
+        self._last = n
+        digest = self._digest_at(n)
+        snapshot = {k: dict(v) for k, v in pool.items()}
+        body = json.dumps({"version": VERSION, "date": date, "count": n, "pool": snapshot},
+                          separators=(",", ":"))
+        root = _dir()
+        path = root / f"{date}_{digest}.json"
+        try:
+            root.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".part")
+            tmp.write_text(body, encoding="utf-8")
+            tmp.replace(path)
+        except OSError as e:
+            log.warning(f"pool checkpoint write failed: {e}")
+            return
+        with _lock:
+            _bodies[path.name] = snapshot
+            while len(_bodies) > _MAX_BODIES:
+                _bodies.pop(next(iter(_bodies)))
@@ -9,13 +9,15 @@ layered on top by line key — so run economics stay reproducible forever.
 from __future__ import annotations
 
 import math
+from bisect import bisect_right
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
 from sqlalchemy.orm import Session
 
 from .. import models as M
 from ..config import settings
-from . import cost_state, fx, ladder
+from . import cost_state, fx, ladder, supplier
 
 
 def display_currency(project: M.Project | None, override: str | None = None) -> str:
@@ -33,15 +35,50 @@ def _order_qty(needed: int, moq: int | None, multiple: int | None) -> int:
     return q
 
 
+class _Ladder:
+    """One component's effective ladder compiled for repeated lookups: tier
+    starts ascending for `bisect`, each tier's price converted to the display
+    currency once. Resolves exactly like `ladder.price_at`, which is what a
+    cost curve otherwise re-ran per line per volume."""
+
+    __slots__ = ("starts", "tiers", "below")
+
+    def __init__(self, points: list[M.ComponentPricePoint], currency: str, rates: dict[str, float]):
+        # same order as price_at: on equal qty_from the user-owned point is
+        # the later one, and the later one wins
+        ranked = sorted(ladder.effective_points(points),
+                        key=lambda p: (p.qty_from, 0 if p.source in ladder.AUTO_SOURCES else 1))
+        self.below = self._tier(ranked[0], currency, rates)  # qty under the whole ladder
+        self.starts: list[int] = []
+        self.tiers: list[tuple] = []
+        for p in ranked:
+            if self.starts and self.starts[-1] == p.qty_from:
+                self.tiers[-1] = self._tier(p, currency, rates)
+            else:
+                self.starts.append(p.qty_from)
+                self.tiers.append(self._tier(p, currency, rates))
+
+    @staticmethod
+    def _tier(p: M.ComponentPricePoint, currency: str, rates: dict[str, float]) -> tuple:
+        return (p, *fx.convert(p.unit_price, p.currency, currency, rates))
+
+    def at(self, qty: int) -> tuple[M.ComponentPricePoint, float, bool]:
+        """(point, unit price in the display currency, rate known)."""
+        i = bisect_right(self.starts, qty)
+        return self.tiers[i - 1] if i else self.below
+
+
+def _ladders(points: dict[int, list[M.ComponentPricePoint]], currency: str,
+             rates: dict[str, float]) -> dict[int, _Ladder]:
+    return {cid: _Ladder(pts, currency, rates) for cid, pts in points.items() if pts}
+
+
 def _price_line(
-    points: list[M.ComponentPricePoint],
+    lad: _Ladder | None,
     supply: M.ComponentSupply | None,
     qty_total: int,
-    currency: str,
-    rates: dict[str, float],
 ) -> dict:
-    """Ladder pricing for one line at qty_total, converted to `currency`."""
-    pt = ladder.price_at(points, max(qty_total, 1))
+    """Ladder pricing for one line at qty_total, in the ladder's currency."""
     out: dict = {
         "unit_price": None, "unit_price_src": None, "price_currency": None,
         "price_qty_from": None, "price_source": None, "price_updated": None,
@@ -51,9 +88,9 @@ def _price_line(
         "jlc_stock": supply.jlc_stock if supply else None,
         "order_qty": qty_total, "order_excess": 0, "order_total": None,
     }
-    if pt is None:
+    if lad is None:
         return out
-    unit_disp, known = fx.convert(pt.unit_price, pt.currency, currency, rates)
+    pt, unit_disp, known = lad.at(max(qty_total, 1))
     out.update(
         unit_price=_round(unit_disp),
         unit_price_src=pt.unit_price,
@@ -65,8 +102,7 @@ def _price_line(
         rate_known=known,
     )
     order_qty = _order_qty(qty_total, out["moq"], supply.order_multiple if supply else None)
-    order_pt = ladder.price_at(points, max(order_qty, 1)) or pt
-    order_disp, _ = fx.convert(order_pt.unit_price, order_pt.currency, currency, rates)
+    _, order_disp, _ = lad.at(max(order_qty, 1))
     out.update(
         order_qty=order_qty,
         order_excess=order_qty - qty_total,
@@ -177,10 +213,32 @@ def priced_bom(
 ) -> dict:
     """Priced BOM at a production volume. `at` prices it AS OF that instant
     (historical points + FX); None = current prices."""
+    return _priced(_bom_inputs(db, project, snapshot, board, variant, currency, at), volume)
+
+
+@dataclass
+class _BomInputs:
+    """Everything a priced BOM reads from the database, for any volume."""
+
+    snapshot: M.ProjectSnapshot
+    board: str
+    variant: str
+    currency: str
+    rates: dict[str, float]
+    lines: list[M.SnapshotBomLine]
+    extras: list
+    costs: list
+    cost_rev: object
+    ladders: dict[int, _Ladder]
+    supply: dict[int, M.ComponentSupply]
+    names: dict[int, str]
+    virtual: set[int]
+
+
+def _bom_inputs(db: Session, project: M.Project, snapshot: M.ProjectSnapshot, board: str,
+                variant: str, currency: str | None = None, at: datetime | None = None) -> _BomInputs:
     cur = display_currency(project, currency)
-    volume = max(int(volume), 1)
     rates = fx.rates_at(db, at) if at is not None else fx.get_rates(db)
-
     lines = (
         db.query(M.SnapshotBomLine)
         .filter_by(snapshot_id=snapshot.id, board=board, variant=variant)
@@ -192,14 +250,21 @@ def priced_bom(
     extras, costs, cost_rev = cost_state.items_for(db, project.id, snapshot)
     comp_ids |= {x.component_id for x in extras if x.component_id}
     points, supply, names, virtual = _component_data(db, comp_ids, at=at)
+    return _BomInputs(snapshot, board, variant, cur, rates, lines, extras, costs, cost_rev,
+                      _ladders(points, cur, rates), supply, names, virtual)
 
+
+def _priced(inp: _BomInputs, volume: int) -> dict:
+    """`priced_bom` at one volume, from inputs loaded once."""
+    cur, rates, names, virtual = inp.currency, inp.rates, inp.names, inp.virtual
+    volume = max(int(volume), 1)
     out_lines = []
     bom_per_device = 0.0
     order_total_sum = 0.0
     unpriced = 0
     unknown_rates: set[str] = set()
 
-    for li in lines:
+    for li in inp.lines:
         # Virtual parts (test point, logo, fiducial, mounting hole) are on the
         # board but never bought — same treatment as DNP / no-BOM lines.
         not_purchasable = li.component_id in virtual
@@ -225,9 +290,9 @@ def priced_bom(
             "excluded": excluded,
         }
         priced = _price_line(
-            points.get(li.component_id or -1, []),
-            supply.get(li.component_id or -1),
-            qty_total, cur, rates,
+            inp.ladders.get(li.component_id or -1),
+            inp.supply.get(li.component_id or -1),
+            qty_total,
         )
         row.update(priced)
         if not priced["rate_known"] and priced["price_currency"]:
@@ -242,7 +307,7 @@ def priced_bom(
 
     out_extra = []
     extra_per_device = 0.0
-    for x in extras:
+    for x in inp.extras:
         qty_total = int(math.ceil(x.qty * volume))
         row = {
             "key": f"x{x.id}",
@@ -256,8 +321,8 @@ def priced_bom(
             "mpn": x.mpn,
             "notes": x.notes,
         }
-        if x.component_id and points.get(x.component_id):
-            priced = _price_line(points[x.component_id], supply.get(x.component_id), qty_total, cur, rates)
+        if x.component_id and x.component_id in inp.ladders:
+            priced = _price_line(inp.ladders[x.component_id], inp.supply.get(x.component_id), qty_total)
             row.update(priced)
         else:
             unit_disp, known = (None, True)
@@ -285,7 +350,7 @@ def priced_bom(
     out_costs = []
     cost_per_device = 0.0
     per_run_fixed = 0.0
-    for c in costs:
+    for c in inp.costs:
         src_price = _cost_price_at(c, volume)
         price_disp, known = fx.convert(src_price, c.currency, cur, rates)
         if not known:
@@ -315,17 +380,17 @@ def priced_bom(
 
     device_total = bom_per_device + extra_per_device + cost_per_device
     return {
-        "snapshot_id": snapshot.id,
-        "sha": snapshot.sha,
-        "board": board,
-        "variant": variant,
+        "snapshot_id": inp.snapshot.id,
+        "sha": inp.snapshot.sha,
+        "board": inp.board,
+        "variant": inp.variant,
         "volume": volume,
         "currency": cur,
         "rates": rates,
         "lines": out_lines,
         "extra": out_extra,
         "costs": out_costs,
-        "cost_revision": cost_state.revision_json(cost_rev),
+        "cost_revision": cost_state.revision_json(inp.cost_rev),
         "totals": {
             "bom_per_device": _round(bom_per_device),
             "extra_per_device": _round(extra_per_device),
@@ -340,12 +405,68 @@ def priced_bom(
     }
 
 
+def _tier_breaks(inp: _BomInputs) -> list[int]:
+    """Volumes at which some price steps down: a line's quantity reaching a
+    ladder tier or its MOQ, or a cost item's step. Between two of these the
+    per-device cost can only be flat."""
+    out: set[int] = set()
+
+    def add(per_device: float, starts) -> None:
+        if per_device > 0:
+            out.update(max(1, math.ceil(s / per_device)) for s in starts if s > 1)
+
+    for li in inp.lines:
+        if li.dnp or li.exclude_from_bom or li.component_id in inp.virtual:
+            continue
+        lad = inp.ladders.get(li.component_id or -1)
+        if lad is not None:
+            add(li.qty, lad.starts)
+        sup = inp.supply.get(li.component_id or -1)
+        if sup is not None and sup.moq:
+            add(li.qty, (sup.moq,))
+    for x in inp.extras:
+        if x.component_id in inp.ladders:
+            add(x.qty, inp.ladders[x.component_id].starts)
+    for c in inp.costs:
+        out.update(int(st.get("qty_from", 0)) for st in c.steps or [] if int(st.get("qty_from", 0)) > 1)
+    return sorted(out)
+
+
 def cost_curve(db: Session, project, snapshot, board: str, variant: str,
                volumes: list[int], currency: str | None = None) -> list[dict]:
+    """Totals per volume, from ONE load of the BOM, ladders, supply and
+    rates. Each point also names `better_volume`: the largest volume up to
+    twice this one whose whole order costs no more — a tier break or MOQ that
+    makes building more the cheaper order.
+
+    "Whole order" is `order_total`: the parts as actually bought (MOQ and
+    order-multiple excess included, `order_parts_total`) plus the cost items
+    for the run. `run_total` prices parts at the ladder unit price for the
+    exact quantity, so an MOQ can never show up in it."""
+    inp = _bom_inputs(db, project, snapshot, board, variant, currency)
+    totals: dict[int, dict] = {}
+
+    def at(v: int) -> dict:
+        if v not in totals:
+            t = _priced(inp, v)["totals"]
+            spend = None
+            if t["order_parts_total"] is not None and t["cost_per_device"] is not None:
+                spend = _round(t["order_parts_total"] + t["cost_per_device"] * v)
+            totals[v] = {**t, "order_total": spend}
+        return totals[v]
+
+    breaks = _tier_breaks(inp)
     out = []
     for v in volumes:
-        bom = priced_bom(db, project, snapshot, board, variant, v, currency)
-        t = bom["totals"]
+        t = at(v)
+        better = None
+        if t["order_total"] is not None:
+            for b in breaks[bisect_right(breaks, v):]:
+                if b > 2 * v:
+                    break
+                spend = at(b)["order_total"]
+                if spend is not None and spend <= t["order_total"]:
+                    better = b
         out.append(
             {
                 "volume": v,
@@ -354,7 +475,11 @@ def cost_curve(db: Session, project, snapshot, board: str, variant: str,
                 "extra_per_device": t["extra_per_device"],
                 "cost_per_device": t["cost_per_device"],
                 "run_total": t["run_total"],
+                "order_parts_total": t["order_parts_total"],
+                "order_total": t["order_total"],
                 "unpriced_lines": t["unpriced_lines"],
+                "better_volume": better,
+                "better_order_total": at(better)["order_total"] if better else None,
             }
         )
     return out
@@ -416,7 +541,8 @@ def stock_check(db: Session, snapshot: M.ProjectSnapshot, board: str, variant: s
     remainder: LCSC retail stock and JLCPCB assembly stock (separate pools —
     either one covering the order counts as procurable). DNP, no-BOM and
     non-purchasable (virtual) lines are skipped. refresh=True refetches live
-    LCSC data per distinct part (JLC data in one batch)."""
+    LCSC data for every distinct part concurrently, bypassing the supplier
+    response cache (JLC data in one batch)."""
     from . import jlc
 
     lines = (
@@ -431,8 +557,11 @@ def stock_check(db: Session, snapshot: M.ProjectSnapshot, board: str, variant: s
         li for li in lines
         if not (li.dnp or li.exclude_from_bom or li.component_id in virtual)
     ]
-    jlc_rows = ladder._jlc_rows(sorted({li.lcsc for li in active if li.lcsc})) if refresh else {}
-    live: dict[str, dict | None] = {}
+    codes = sorted({li.lcsc for li in active if li.lcsc})
+    jlc_rows = ladder._jlc_rows(codes) if refresh else {}
+    # every distinct part's LCSC detail at once, concurrently (services/supplier.py);
+    # past the response cache — a refresh is asked for to see stock right now
+    live = supplier.lcsc_details(codes, use_cache=False) if refresh else {}
     results = []
     shortages = 0
     covered_private = 0
@@ -440,15 +569,14 @@ def stock_check(db: Session, snapshot: M.ProjectSnapshot, board: str, variant: s
         needed = li.qty * max(volume, 1)
         stock = moq = jlc_stock = None
         if li.component_id and refresh and li.lcsc:
-            ladder.refresh_component(db, li.component_id, li.lcsc, jlc_row=jlc_rows.get(li.lcsc))
+            ladder.refresh_component(db, li.component_id, li.lcsc, jlc_row=jlc_rows.get(li.lcsc),
+                                     detail=live.get(li.lcsc))
         if li.component_id:
             s = db.query(M.ComponentSupply).filter_by(component_id=li.component_id).first()
             if s:
                 stock, moq, jlc_stock = s.stock, s.moq, s.jlc_stock
         elif li.lcsc:
-            if li.lcsc not in live:
-                live[li.lcsc] = ladder.fetch_detail(li.lcsc) if refresh else None
-            detail = live[li.lcsc]
+            detail = live.get(li.lcsc)
             if detail:
                 stock = detail.get("stockNumber")
                 moq = detail.get("minBuyNumber")
@@ -513,6 +641,7 @@ def priced_bom_costs_only(db: Session, project: M.Project, volume: int,
     extras, costs, cost_rev = cost_state.items_for(db, project.id, None)
     comp_ids |= {x.component_id for x in extras if x.component_id}
     points, supply, names, _virtual = _component_data(db, comp_ids, at=at)
+    ladders = _ladders(points, cur, rates)
     out_extra = []
     extra_per_device = 0.0
     for x in extras:
@@ -521,8 +650,8 @@ def priced_bom_costs_only(db: Session, project: M.Project, volume: int,
                "qty_total": qty_total, "component_id": x.component_id,
                "component_name": names.get(x.component_id or -1),
                "manufacturer": x.manufacturer, "mpn": x.mpn, "notes": x.notes}
-        if x.component_id and points.get(x.component_id):
-            row.update(_price_line(points[x.component_id], supply.get(x.component_id), qty_total, cur, rates))
+        if x.component_id and x.component_id in ladders:
+            row.update(_price_line(ladders[x.component_id], supply.get(x.component_id), qty_total))
         elif x.unit_price is not None:
             unit_disp, known = fx.convert(x.unit_price, x.currency, cur, rates)
             row.update(unit_price=_round(unit_disp), price_currency=x.currency,
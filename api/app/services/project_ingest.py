@@ -17,23 +17,28 @@ import csv
 import io
 import json
 import logging
-import re
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from .. import models as M
+from ..config import settings
 from ..db import SessionLocal
-from . import gitrepo, project_render, storage
+from ..util.sexpr import _norm, iter_top_level
+from . import gitrepo, jobs, project_render, storage, usage_index
 
 log = logging.getLogger(__name__)
 
 # (ordinal "Name" type ["User Name"]) rows inside the board's (layers ...) block
-_LAYER_RE = re.compile(r'^\s*\(\d+\s+"([^"]+)"\s+(signal|power|mixed|jumper|user)(?:\s+"([^"]+)")?\s*\)')
+_LAYER_TYPES = {"signal", "power", "mixed", "jumper", "user"}
 
-# Ingest status shared with the router (per snapshot id)
+# Ingest status shared with the router (per snapshot id). Ingests run as jobs
+# (services/jobs.py), possibly in another process, so each stage is also
+# written to the job's progress — `active_stages` reads both.
 _active: dict[int, str] = {}
 _active_lock = threading.Lock()
 
@@ -43,12 +48,25 @@ def active_stage(snapshot_id: int) -> str | None:
         return _active.get(snapshot_id)
 
 
+def active_stages(db) -> dict[int, str]:
+    """snapshot id -> stage for every ingest running anywhere."""
+    stages = {}
+    for (progress,) in db.query(M.Job.progress).filter(M.Job.kind == "snapshot_ingest",
+                                                       M.Job.status == "running"):
+        if progress and progress.get("snapshot_id") and progress.get("stage"):
+            stages[int(progress["snapshot_id"])] = progress["stage"]
+    with _active_lock:
+        stages.update(_active)
+    return stages
+
+
 def _set_stage(snapshot_id: int, stage: str | None) -> None:
     with _active_lock:
         if stage is None:
             _active.pop(snapshot_id, None)
         else:
             _active[snapshot_id] = stage
+    jobs.progress(snapshot_id=snapshot_id, stage=stage)
 
 
 def parse_variants(pro_text: str) -> list[dict]:
@@ -97,18 +115,19 @@ def parse_variants(pro_text: str) -> list[dict]:
 def parse_layers(pcb_text: str) -> list[dict]:
     """Layer stack from the .kicad_pcb header: [{name, user_name, type}]."""
     layers = []
-    in_block = False
-    for line in pcb_text.splitlines():
-        stripped = line.strip()
-        if not in_block:
-            if stripped.startswith("(layers"):
-                in_block = True
-            continue
-        m = _LAYER_RE.match(line)
-        if m:
-            layers.append({"name": m.group(1), "type": m.group(2), "user_name": m.group(3) or ""})
-        elif stripped.startswith(")") or (stripped.startswith("(") and not m):
-            break
+    # The header block comes first, so the scan stops there without touching
+    # the rest of the board.
+    for block in iter_top_level(pcb_text, {"layers"}):
+        for entry in block[1:]:
+            # (0 "F.Cu" signal) / (44 "Edge.Cuts" user "Edge Cuts")
+            if not isinstance(entry, list) or len(entry) < 3 or _norm(entry[2]) not in _LAYER_TYPES:
+                continue
+            layers.append({
+                "name": _norm(entry[1]),
+                "type": _norm(entry[2]),
+                "user_name": _norm(entry[3]) if len(entry) > 3 and not isinstance(entry[3], list) else "",
+            })
+        break
     return layers
 
 
@@ -258,7 +277,8 @@ def ingest(project_id: int, ref: str, ref_name: str = "", is_tag: bool = False,
                 variant_names = [""] + [v["name"] for v in b.get("variants", [])]
                 for variant in variant_names:
                     try:
-                        data, _ = project_render.run_project_op("bom_csv", rel_sch, variant=variant)
+                        data, _ = project_render.run_project_op(
+                            "bom_csv", rel_sch, variant=variant, priority=project_render.INGEST)
                     except Exception as e:
                         warnings.append(f"{b['name']} variant '{variant or 'default'}': BOM export failed — {e}")
                         continue
@@ -286,6 +306,7 @@ def ingest(project_id: int, ref: str, ref_name: str = "", is_tag: bool = False,
             }
             snap.status = "ready"
             db.commit()
+            usage_index.refresh_project(project_id)
         except Exception as e:
             db.rollback()
             snap = db.get(M.ProjectSnapshot, snapshot_id)
@@ -299,8 +320,11 @@ def ingest(project_id: int, ref: str, ref_name: str = "", is_tag: bool = False,
         if prerender:
             _set_stage(snapshot_id, "prerender")
             try:
-                prerender_snapshot(project_id, sha, snap.boards or [])
+                timings = prerender_snapshot(project_id, sha, snap.boards or [])
+                snap.report = {**(snap.report or {}), "prerender": timings}
+                db.commit()
             except Exception as e:
+                db.rollback()
                 log.warning(f"prerender failed for {project_id}@{sha[:10]}: {e}")
         return snapshot_id
     finally:
@@ -308,55 +332,117 @@ def ingest(project_id: int, ref: str, ref_name: str = "", is_tag: bool = False,
         db.close()
 
 
-def prerender_snapshot(project_id: int, sha: str, boards: list[dict]) -> None:
+def prerender_snapshot(project_id: int, sha: str, boards: list[dict]) -> dict:
     """Warm the MinIO render cache: board GLB + all layer SVGs + schematic
-    SVGs (default variant) + ERC/DRC. Sequential — one kicad-cli at a time."""
+    SVGs (default variant) + ERC/DRC.
+
+    The ops are independent, so they are all submitted at once and run as
+    render slots free up — at PREWARM priority, behind anyone looking at a
+    viewer (project_render's gate). Returns per-op timings for the report.
+    """
+    ops: list[tuple[str, str, object]] = []  # (board, label, fn) in submit order
+    P = project_render.PREWARM
     for b in boards:
         name = b["name"]
         if b.get("pcb"):
             rel_pcb = project_render.rel_checkout(project_id, sha, b["pcb"])
-            key = project_render.render_key(project_id, sha, name, "board.glb")
-            _warm(key, "board_glb", rel_pcb)
+            ops.append((name, "board_glb", lambda n=name, r=rel_pcb: project_render.cached_op(
+                project_render.render_key(project_id, sha, n, "board.glb"), "board_glb", r, priority=P)))
             for layer in b.get("layers") or []:
-                _try(lambda n=name, r=rel_pcb, ly=layer["name"]:
-                     project_render.board_layer(project_id, sha, n, r, ly),
-                     f"layer {layer['name']}")
-            _warm(project_render.render_key(project_id, sha, name, "drc.json"), "drc", rel_pcb)
+                ops.append((name, f"layer {layer['name']}",
+                            lambda n=name, r=rel_pcb, ly=layer["name"]:
+                            project_render.board_layer(project_id, sha, n, r, ly, priority=P)))
+            ops.append((name, "drc", lambda n=name, r=rel_pcb: project_render.cached_op(
+                project_render.render_key(project_id, sha, n, "drc.json"), "drc", r, priority=P)))
         if b.get("sch"):
             rel_sch = project_render.rel_checkout(project_id, sha, b["sch"])
-            _try(lambda n=name, r=rel_sch: project_render.sch_pages_zip(project_id, sha, n, r, ""),
-                 "schematic")
-            _warm(project_render.render_key(project_id, sha, name, "erc.json"), "erc", rel_sch)
-
-
-def _try(fn, what: str) -> None:
+            ops.append((name, "schematic", lambda n=name, r=rel_sch:
+                        project_render.sch_pages_zip(project_id, sha, n, r, "", priority=P)))
+            ops.append((name, "erc", lambda n=name, r=rel_sch: project_render.cached_op(
+                project_render.render_key(project_id, sha, n, "erc.json"), "erc", r, priority=P)))
+
+    started = time.monotonic()
+    # As many as the gate admits: the ops beyond that wait in the gate at
+    # PREWARM, where any viewer request that arrives overtakes them.
+    workers = max(settings.project_render_concurrency, 1)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prerender") as pool:
+        timings = list(pool.map(lambda op: _timed(*op), ops))
+    return {
+        "seconds": round(time.monotonic() - started, 2),
+        "failed": sum(1 for t in timings if not t["ok"]),
+        "ops": timings,
+    }
+
+
+def _timed(board: str, label: str, fn) -> dict:
+    t0 = time.monotonic()
+    ok = True
     try:
         fn()
     except Exception as e:
-        log.warning(f"prerender {what}: {e}")
+        ok = False
+        log.warning(f"prerender {board} {label}: {e}")
+    return {"board": board, "op": label, "seconds": round(time.monotonic() - t0, 2), "ok": ok}
 
 
-def _warm(key: str, op: str, rel_src: str, **kw) -> None:
+def run_ingest_job(payload: dict) -> dict:
+    """Job handler for kind `snapshot_ingest` (services/jobs.py). `ingest`
+    records its own failures once it owns the snapshot; one that raises
+    before that (rev-parse, commit info, the first commit) would leave the
+    `pending` row start_ingest made, which auto-ingest then never queues
+    again — so it is marked `error` here before the job system retries."""
     try:
-        project_render.cached_op(key, op, rel_src, **kw)
+        snapshot_id = ingest(payload["project_id"], payload["sha"], ref_name=payload.get("ref_name", ""),
+                             is_tag=payload.get("is_tag", False), prerender=payload.get("prerender", False))
     except Exception as e:
-        log.warning(f"prerender {op} {key}: {e}")
+        ingest_job_failed(payload, f"{type(e).__name__}: {e}")
+        raise
+    return {"snapshot_id": snapshot_id}
+
+
+def ingest_job_failed(payload: dict, error: str) -> None:
+    """Mark the job's snapshot `error` if it is still `pending`/`ingesting`.
+    Also the `snapshot_ingest` on_failure hook: a job the reaper fails (its
+    worker died) never got to run the except above."""
+    db = SessionLocal()
+    try:
+        snap = (db.query(M.ProjectSnapshot)
+                .filter_by(project_id=payload["project_id"], sha=payload["sha"])
+                .filter(M.ProjectSnapshot.status.in_(("pending", "ingesting")))
+                .first())
+        if snap is not None:
+            snap.status = "error"
+            snap.error = error
+            db.commit()
+    finally:
+        db.close()
 
 
-def start_ingest(project_id: int, ref: str, ref_name: str = "", is_tag: bool = False,
-                 prerender: bool = False) -> threading.Thread:
-    t = threading.Thread(
-        target=ingest, args=(project_id, ref, ref_name, is_tag, prerender), daemon=True
+def start_ingest(db, project_id: int, sha: str, ref_name: str = "", is_tag: bool = False,
+                 prerender: bool = False, priority: int = 0) -> int | None:
+    """Queue the ingest of one commit in the caller's transaction and mark its
+    snapshot `pending`, so it shows up before a worker picks it up. Returns
+    the job id, or None when that commit is already queued or ingesting."""
+    snap = db.query(M.ProjectSnapshot).filter_by(project_id=project_id, sha=sha).first()
+    if snap is None:
+        snap = M.ProjectSnapshot(project_id=project_id, sha=sha, ref_name=ref_name or sha,
+                                 is_tag=is_tag, status="pending")
+        db.add(snap)
+    elif snap.status == "error":
+        snap.status = "pending"
+    return jobs.enqueue(
+        db, "snapshot_ingest",
+        {"project_id": project_id, "sha": sha, "ref_name": ref_name, "is_tag": is_tag,
+         "prerender": prerender},
+        dedupe_key=f"ingest:{project_id}:{sha}", priority=priority,
     )
-    t.start()
-    return t
 
 
 def fetch_and_autoingest(project_id: int, git_url: str, token: str | None,
                          default_branch: str) -> dict:
-    """Fetch the mirror, then ingest (with prerender) every tag and the
-    default-branch head that has no ready snapshot yet. Runs synchronously
-    for the fetch; ingests happen in one background worker."""
+    """Fetch the mirror, then queue an ingest (with prerender) of every tag
+    and the default-branch head that has no ready snapshot yet. Runs
+    synchronously for the fetch; the ingests are jobs, behind manual ones."""
     gitrepo.fetch_mirror(project_id, git_url, token)
     db = SessionLocal()
     try:
@@ -367,28 +453,23 @@ def fetch_and_autoingest(project_id: int, git_url: str, token: str | None,
             .filter(M.ProjectSnapshot.status.in_(("ready", "ingesting", "pending")))
             .all()
         }
-    finally:
-        db.close()
 
-    todo: list[tuple[str, str, bool]] = []
-    for tag in gitrepo.tags(project_id):
-        if tag["sha"] not in have:
-            todo.append((tag["sha"], tag["name"], True))
-    branch = default_branch or "HEAD"
-    try:
-        head_sha = gitrepo.rev_parse(project_id, branch)
-        if head_sha not in have and head_sha not in [t[0] for t in todo]:
-            todo.append((head_sha, branch, False))
-    except gitrepo.GitError:
-        pass
+        todo: list[tuple[str, str, bool]] = []
+        for tag in gitrepo.tags(project_id):
+            if tag["sha"] not in have:
+                todo.append((tag["sha"], tag["name"], True))
+        branch = default_branch or "HEAD"
+        try:
+            head_sha = gitrepo.rev_parse(project_id, branch)
+            if head_sha not in have and head_sha not in [t[0] for t in todo]:
+                todo.append((head_sha, branch, False))
+        except gitrepo.GitError:
+            pass
 
-    def worker():
         for sha, ref_name, is_tag in todo:
-            try:
-                ingest(project_id, sha, ref_name=ref_name, is_tag=is_tag, prerender=True)
-            except Exception as e:
-                log.warning(f"auto-ingest {ref_name} failed: {e}")
-
-    if todo:
-        threading.Thread(target=worker, daemon=True).start()
+            start_ingest(db, project_id, sha, ref_name=ref_name, is_tag=is_tag, prerender=True,
+                         priority=1)
+        db.commit()
+    finally:
+        db.close()
     return {"fetched": True, "queued": [{"sha": t[0], "ref": t[1], "tag": t[2]} for t in todo]}
@@ -21,7 +21,7 @@ from pathlib import Path, PurePosixPath
 from sqlalchemy.orm import Session
 
 from .. import models as M
-from ..util.sexpr import find_node, iter_nodes, node_value, parse_sexpr, walk_nodes
+from ..util.sexpr import _norm, find_node, iter_nodes, iter_top_level, node_value, parse_sexpr, walk_nodes
 from . import gitrepo, project_render, storage
 
 log = logging.getLogger(__name__)
@@ -226,17 +226,31 @@ _EDGE_TAGS = ("gr_line", "gr_rect", "gr_arc", "gr_circle", "gr_poly",
               "fp_line", "fp_rect", "fp_arc", "fp_circle", "fp_poly")
 
 
+def _add_edges(edges: _BBox, node) -> None:
+    """Grow `edges` by every Edge.Cuts graphic in `node` — one walk for all the
+    edge tags, a footprint's pads are visited once instead of once per tag."""
+    if _norm(node[0]) in _EDGE_TAGS:
+        if node_value(node, "layer", "") == "Edge.Cuts":
+            for x, y in _shape_points(node):
+                edges.add(x, y)
+        return
+    for child in node:
+        if isinstance(child, list) and child:
+            _add_edges(edges, child)
+
+
 def parse_board(text: str) -> dict:
-    root = parse_sexpr(text)
+    # Only footprints and board graphics are materialized — tracks, vias and
+    # zones (most of a routed board) are skipped by the scanner unparsed.
     edges = _BBox()
-    for tag in _EDGE_TAGS:
-        for shape in walk_nodes(root, tag):
-            if node_value(shape, "layer", "") != "Edge.Cuts":
-                continue
-            for x, y in _shape_points(shape):
-                edges.add(x, y)
     footprints = []
-    for fp in iter_nodes(root, "footprint"):
+    for node in iter_top_level(text, {"footprint", *_EDGE_TAGS}):
+        # Edge.Cuts graphics can live inside a footprint too (mounting holes,
+        # board-outline footprints), so footprints are searched as well.
+        _add_edges(edges, node)
+        if _norm(node[0]) != "footprint":
+            continue
+        fp = node
         ref = _property(fp, "Reference")
         if not ref:
             continue
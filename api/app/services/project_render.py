@@ -6,12 +6,27 @@ RENDER_MODE=local runs kicad-cli directly (dev on the Mac).
 
 Everything is cached in MinIO keyed by commit sha — immutable, rendered at
 most once. Per-key locks stop a double render when two requests race.
+
+Every kicad-cli run goes through one priority gate: at most
+PROJECT_RENDER_CONCURRENCY at once per process, and a waiting INTERACTIVE
+request (someone has the viewer open) always starts before INGEST work and
+before PREWARM (tag-push warming). A prewarm already queued for a key that a
+viewer then asks for is promoted, so the viewer never waits behind it.
+
+The gate orders one process's work; it is not a deployment-wide cap. API
+replicas and `python -m app.worker` processes each have their own, so up to
+processes × PROJECT_RENDER_CONCURRENCY requests can be in flight. With
+RENDER_MODE=http the render container bounds the kicad-cli processes
+themselves (RENDER_WORKERS slots in render/server.py); RENDER_MODE=local
+has no such bound beyond the per-process gate.
 """
 from __future__ import annotations
 
+import itertools
 import os
 import tempfile
 import threading
+from contextlib import contextmanager
 
 import httpx
 
@@ -28,9 +43,73 @@ def _lock_for(key: str) -> threading.Lock:
         return _locks.setdefault(key, threading.Lock())
 
 
+# Gate priorities, lowest first.
+INTERACTIVE, INGEST, PREWARM = 0, 1, 2
+
+_gate = threading.Condition()
+_running = 0
+# seq -> [priority, cache key]; the next to run is the min (priority, seq).
+# A handful of waiters at most, so a scan beats keeping a heap re-sortable.
+_waiting: dict[int, list] = {}
+# key -> priority asked for by a caller blocked on that key before its holder
+# reached the gate; applied when the holder's ticket is created.
+_boosts: dict[str, int] = {}
+_seq = itertools.count()
+
+
+def _next_waiter() -> int:
+    return min(_waiting, key=lambda seq: (_waiting[seq][0], seq))
+
+
+@contextmanager
+def _slot(priority: int, key: str = ""):
+    global _running
+    with _gate:
+        seq = next(_seq)
+        if key in _boosts:
+            priority = min(priority, _boosts[key])
+        _waiting[seq] = [priority, key]
+        while _running >= max(settings.project_render_concurrency, 1) or _next_waiter() != seq:
+            _gate.wait()
+        del _waiting[seq]
+        _running += 1
+        _gate.notify_all()  # a free slot may remain for the next in line
+    try:
+        yield
+    finally:
+        with _gate:
+            _running -= 1
+            _gate.notify_all()
+
+
+def _promote(key: str, priority: int) -> None:
+    with _gate:
+        _boosts[key] = min(priority, _boosts.get(key, priority))
+        for ticket in _waiting.values():
+            if ticket[1] == key and ticket[0] > priority:
+                ticket[0] = priority
+        _gate.notify_all()
+
+
+def gate_stats() -> dict:
+    with _gate:
+        queued = [t[0] for t in _waiting.values()]
+        return {"running": _running, "limit": settings.project_render_concurrency,
+                "queued": {name: queued.count(p) for name, p in
+                           (("interactive", INTERACTIVE), ("ingest", INGEST), ("prewarm", PREWARM))}}
+
+
 def run_project_op(op: str, rel_src: str, *, variant: str = "", layer: str = "", theme: str = "",
-                   files: list | None = None) -> tuple[bytes, str]:
-    """rel_src is relative to DATA_DIR (== /data in the containers)."""
+                   files: list | None = None, priority: int = INTERACTIVE,
+                   key: str = "") -> tuple[bytes, str]:
+    """rel_src is relative to DATA_DIR (== /data in the containers). Waits for
+    a render slot at `priority`; `key` names the cache entry for promotion."""
+    with _slot(priority, key):
+        return _run_project_op(op, rel_src, variant=variant, layer=layer, theme=theme, files=files)
+
+
+def _run_project_op(op: str, rel_src: str, *, variant: str, layer: str, theme: str,
+                    files: list | None) -> tuple[bytes, str]:
     if settings.render_mode == "local":
         with tempfile.TemporaryDirectory() as td:
             env = {**os.environ, "SEVENSIGMA_DIR": str(settings.mirror_dir.resolve())}
@@ -55,18 +134,30 @@ def run_project_op(op: str, rel_src: str, *, variant: str = "", layer: str = "",
 
 
 def cached_op(cache_key: str, op: str, rel_src: str, *, variant: str = "", layer: str = "",
-              theme: str = "", files: list | None = None) -> tuple[bytes, str]:
+              theme: str = "", files: list | None = None,
+              priority: int = INTERACTIVE) -> tuple[bytes, str]:
     """MinIO-backed cache around run_project_op."""
     data = storage.get_bytes(cache_key)
     if data is not None:
         return data, MEDIA.get(op, "application/octet-stream")
-    with _lock_for(cache_key):
+    lock = _lock_for(cache_key)
+    if not lock.acquire(blocking=False):
+        # Someone is already on this key — possibly a prewarm still queued
+        # behind other work. Lift it to our priority, then wait for its result.
+        _promote(cache_key, priority)
+        lock.acquire()
+    try:
         data = storage.get_bytes(cache_key)
         if data is not None:
             return data, MEDIA.get(op, "application/octet-stream")
-        data, media = run_project_op(op, rel_src, variant=variant, layer=layer, theme=theme, files=files)
+        data, media = run_project_op(op, rel_src, variant=variant, layer=layer, theme=theme,
+                                     files=files, priority=priority, key=cache_key)
         storage.put_bytes(cache_key, data, media)
         return data, media
+    finally:
+        with _gate:
+            _boosts.pop(cache_key, None)
+        lock.release()
 
 
 def rel_checkout(project_id: int, sha: str, file_rel: str) -> str:
@@ -84,16 +175,18 @@ def render_key(project_id: int, sha: str, board: str, artifact: str) -> str:
 # is part of the cache key: changing a theme re-renders instead of serving
 # stale colors.
 
-def board_layer(project_id: int, sha: str, board: str, rel_pcb: str, layer: str) -> tuple[bytes, str]:
+def board_layer(project_id: int, sha: str, board: str, rel_pcb: str, layer: str,
+                priority: int = INTERACTIVE) -> tuple[bytes, str]:
     theme = settings.footprint_theme
     safe = layer.replace("/", "_")
     key = render_key(project_id, sha, board, f"layers/{theme or 'default'}/{safe}.svg")
-    return cached_op(key, "board_layer_svg", rel_pcb, layer=layer, theme=theme)
+    return cached_op(key, "board_layer_svg", rel_pcb, layer=layer, theme=theme, priority=priority)
 
 
-def sch_pages_zip(project_id: int, sha: str, board: str, rel_sch: str, variant: str) -> bytes:
+def sch_pages_zip(project_id: int, sha: str, board: str, rel_sch: str, variant: str,
+                  priority: int = INTERACTIVE) -> bytes:
     theme = settings.symbol_theme
     vdir = variant or "_default"
     key = render_key(project_id, sha, board, f"sch/{vdir}/{theme or 'default'}/pages.zip")
-    data, _media = cached_op(key, "sch_svg", rel_sch, variant=variant, theme=theme)
+    data, _media = cached_op(key, "sch_svg", rel_sch, variant=variant, theme=theme, priority=priority)
     return data
@@ -3,45 +3,189 @@
 Two modes (config RENDER_MODE):
   http   — POST to the render container (compose default)
   local  — invoke kicad-cli directly (dev on the Mac, KICAD_CLI path)
-Results are cached on disk keyed by content hash.
+Results are cached keyed by content hash — memory, disk, then MinIO
+(services/render_cache.py).
+
+`render_many` is the bulk path (a page full of previews): cache hits are
+answered directly, the misses go to the render container as /render-batch
+calls — one kicad-cli launch per batch — several in flight at once. A render
+already running for the same content, from either path, is joined rather than
+started twice.
 """
 from __future__ import annotations
 
 import hashlib
+import logging
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 import httpx
 
 from ..config import settings
+from . import render_cache
 
+log = logging.getLogger(__name__)
 
-def render_svg(kind: str, name: str, source_text: str) -> bytes:
-    """kind: symbol | footprint (SVG) | footprint3d (binary GLB board view)."""
+_BATCH_KINDS = ("symbol", "footprint")
+
+# cache digest -> Future of the render producing it
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _cache_target(kind: str, name: str, source_text: str) -> tuple[str, str, str]:
+    """(digest, extension, theme) for one preview."""
     assert kind in ("symbol", "footprint", "footprint3d")
     theme = settings.symbol_theme if kind == "symbol" else settings.footprint_theme
     ext = "glb" if kind == "footprint3d" else "svg"
     digest = hashlib.sha256(f"{kind}\x00{name}\x00{theme}\x00{source_text}".encode()).hexdigest()
-    cache_file = settings.render_cache_dir / f"{digest}.{ext}"
-    if cache_file.exists():
-        return cache_file.read_bytes()
+    return digest, ext, theme
+
 
+def _claim(digest: str) -> tuple[Future, bool]:
+    """The in-flight render for `digest`, and whether this caller owns it
+    (must produce the result) or only waits on someone else's."""
+    with _inflight_lock:
+        fut = _inflight.get(digest)
+        if fut is not None:
+            return fut, False
+        fut = _inflight[digest] = Future()
+        return fut, True
+
+
+def _settle(digest: str, ext: str, fut: Future, data: bytes | None, error: Exception | None) -> None:
+    if error is None:
+        render_cache.put(digest, ext, data)
+    with _inflight_lock:
+        _inflight.pop(digest, None)
+    if error is None:
+        fut.set_result(data)
+    else:
+        fut.set_exception(error)
+
+
+def _render_one(kind: str, name: str, source_text: str, theme: str) -> bytes:
     if settings.render_mode == "local":
-        data = render_local(kind, name, source_text, settings.kicad_cli, theme,
+        return render_local(kind, name, source_text, settings.kicad_cli, theme,
                             models_root=str(settings.mirror_dir))
-    else:
-        resp = httpx.post(
-            f"{settings.render_url}/render",
-            json={"kind": kind, "name": name, "source_text": source_text, "theme": theme},
-            timeout=180,
-        )
-        resp.raise_for_status()
-        data = resp.content
-
-    settings.render_cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_file.write_bytes(data)
-    return data
+    resp = httpx.post(
+        f"{settings.render_url}/render",
+        json={"kind": kind, "name": name, "source_text": source_text, "theme": theme},
+        timeout=180,
+    )
+    resp.raise_for_status()
+    return resp.content
+
+
+def render_svg(kind: str, name: str, source_text: str) -> bytes:
+    """kind: symbol | footprint (SVG) | footprint3d (binary GLB board view)."""
+    digest, ext, theme = _cache_target(kind, name, source_text)
+    cached = render_cache.get(digest, ext)
+    if cached is not None:
+        return cached
+    fut, owner = _claim(digest)
+    if owner:
+        try:
+            data = _render_one(kind, name, source_text, theme)
+        except Exception as e:  # noqa: BLE001 — handed to every waiter, re-raised below
+            _settle(digest, ext, fut, None, e)
+        else:
+            _settle(digest, ext, fut, data, None)
+    return fut.result()
+
+
+def _render_batch(kind: str, theme: str, items: list[tuple[str, str]]) -> list[bytes | Exception]:
+    """One /render-batch call. A render container without the endpoint (an
+    older image) gets the items one /render at a time instead."""
+    resp = httpx.post(
+        f"{settings.render_url}/render-batch",
+        json={"kind": kind, "theme": theme,
+              "items": [{"name": n, "source_text": t} for n, t in items]},
+        timeout=600,
+    )
+    if resp.status_code == 404:
+        out: list[bytes | Exception] = []
+        for name, text in items:
+            try:
+                out.append(_render_one(kind, name, text, theme))
+            except Exception as e:  # noqa: BLE001 — per-item result
+                out.append(e)
+        return out
+    resp.raise_for_status()
+    return [
+        r["svg"].encode("utf-8") if "svg" in r else RuntimeError(f"kicad-cli render failed: {r.get('error')}")
+        for r in resp.json()["results"]
+    ]
+
+
+def render_many(items: list[tuple[str, str, str]]) -> list[bytes | Exception]:
+    """`render_svg` for many (kind, name, source_text) at once, results in
+    order; a failed item's slot holds its exception instead of raising."""
+    results: list[bytes | Exception | None] = [None] * len(items)
+    waiting: list[tuple[int, Future]] = []
+    # (kind, theme) -> [(digest, ext, future, name, text)]
+    todo: dict[tuple[str, str], list[tuple]] = {}
+    for i, (kind, name, text) in enumerate(items):
+        digest, ext, theme = _cache_target(kind, name, text)
+        cached = render_cache.get(digest, ext)
+        if cached is not None:
+            results[i] = cached
+            continue
+        fut, owner = _claim(digest)
+        waiting.append((i, fut))
+        if owner:
+            todo.setdefault((kind, theme), []).append((digest, ext, fut, name, text))
+
+    def run(kind: str, theme: str, chunk: list[tuple]) -> None:
+        try:
+            if settings.render_mode == "http" and kind in _BATCH_KINDS:
+                datas = _render_batch(kind, theme, [(name, text) for *_, name, text in chunk])
+            else:
+                datas = []
+                for *_, name, text in chunk:
+                    try:
+                        datas.append(_render_one(kind, name, text, theme))
+                    except Exception as e:  # noqa: BLE001 — per-item result
+                        datas.append(e)
+        except Exception as e:  # noqa: BLE001 — the whole call failed: every item gets it
+            datas = [e] * len(chunk)
+        for (digest, ext, fut, _, _), data in zip(chunk, datas):
+            if isinstance(data, Exception):
+                _settle(digest, ext, fut, None, data)
+            else:
+                _settle(digest, ext, fut, data, None)
+
+    size = max(1, settings.render_batch_size)
+    with ThreadPoolExecutor(max(1, settings.render_concurrency), thread_name_prefix="render") as pool:
+        for (kind, theme), entries in todo.items():
+            # local mode and GLB views render one item per call anyway
+            step = size if settings.render_mode == "http" and kind in _BATCH_KINDS else 1
+            for start in range(0, len(entries), step):
+                pool.submit(run, kind, theme, entries[start : start + step])
+
+    for i, fut in waiting:
+        try:
+            results[i] = fut.result()
+        except Exception as e:  # noqa: BLE001 — per-item result
+            results[i] = e
+    return results
+
+
+def prewarm(items: list[tuple[str, str, str]]) -> None:
+    """render_many in the background: a page about to request these previews
+    one by one then finds them cached (or joins the batch already running)."""
+    if not items:
+        return
+
+    def work():
+        failed = sum(isinstance(r, Exception) for r in render_many(items))
+        if failed:
+            log.info(f"render prewarm: {failed}/{len(items)} previews failed")
+
+    threading.Thread(target=work, name="render-prewarm", daemon=True).start()
 
 
 def render_local(kind: str, name: str, source_text: str, kicad_cli: str, theme: str = "",
@@ -0,0 +1,205 @@
+"""Tiered cache for component previews (`services/render.py`).
+
+A preview is a pure function of its content digest, so every tier is
+content-addressed and nothing is ever invalidated — only evicted:
+
+    memory  LRU of hot bodies in this process        RENDER_CACHE_MEMORY_MB
+    disk    render_cache_dir/<digest>.<ext>, LRU     RENDER_CACHE_DISK_MB
+    MinIO   renders/components/<digest>.<ext>        shared by every replica
+
+A lookup walks down the tiers and copies a hit back up into the faster ones;
+a fresh render is written to all three. The disk tier orders by mtime (a hit
+touches the file), so the LRU order survives a restart. MinIO is a cache
+like the others: when it is unreachable previews still render, just without
+the shared tier, and `minio_errors` says so.
+
+`stats()` (GET /api/health/render-cache) has the counters to size the
+budgets against real traffic.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from ..config import settings
+from . import storage
+
+log = logging.getLogger(__name__)
+
+PREFIX = "renders/components/"
+
+_MEDIA = {"svg": "image/svg+xml", "glb": "model/gltf-binary"}
+
+_lock = threading.Lock()
+_memory: OrderedDict[str, bytes] = OrderedDict()
+_memory_bytes = 0
+# file name -> size, oldest first; None until the directory is first scanned
+_disk: OrderedDict[str, int] | None = None
+_disk_bytes = 0
+_stats = {
+    "memory_hits": 0, "disk_hits": 0, "minio_hits": 0, "misses": 0,
+    "memory_evictions": 0, "disk_evictions": 0, "writes": 0, "minio_errors": 0,
+}
+
+
+def _count(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+
+def _memory_put(name: str, data: bytes) -> None:
+    global _memory_bytes
+    budget = settings.render_cache_memory_mb << 20
+    # One oversized body (a big GLB board view) must not flush every SVG.
+    if len(data) > budget // 8:
+        return
+    with _lock:
+        old = _memory.pop(name, None)
+        if old is not None:
+            _memory_bytes -= len(old)
+        _memory[name] = data
+        _memory_bytes += len(data)
+        while _memory_bytes > budget and _memory:
+            _, evicted = _memory.popitem(last=False)
+            _memory_bytes -= len(evicted)
+            _stats["memory_evictions"] += 1
+
+
+def _disk_index() -> OrderedDict[str, int]:
+    """The disk tier's LRU order, scanned once per process (under _lock)."""
+    global _disk, _disk_bytes
+    if _disk is None:
+        root = settings.render_cache_dir
+        entries = []
+        if root.is_dir():
+            for f in root.iterdir():
+                try:
+                    st = f.stat()
+                except FileNotFoundError:
+                    continue
+                if f.is_file() and not f.name.endswith(".part"):
+                    entries.append((st.st_mtime_ns, f.name, st.st_size))
+        entries.sort()
+        _disk = OrderedDict((name, size) for _, name, size in entries)
+        _disk_bytes = sum(_disk.values())
+    return _disk
+
+
+def _disk_get(name: str) -> bytes | None:
+    global _disk_bytes
+    path = settings.render_cache_dir / name
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)  # LRU order for the next scan
+    except OSError:
+        pass
+    with _lock:
+        index = _disk_index()
+        if name in index:
+            index.move_to_end(name)
+        else:  # written by another process sharing the directory
+            index[name] = len(data)
+            _disk_bytes += len(data)
+    return data
+
+
+def _disk_put(name: str, data: bytes) -> None:
+    global _disk_bytes
+    root = settings.render_cache_dir
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = root / f"{name}.part"
+    tmp.write_bytes(data)
+    tmp.replace(root / name)
+    budget = settings.render_cache_disk_mb << 20
+    doomed = []
+    with _lock:
+        index = _disk_index()
+        old = index.pop(name, None)
+        if old is not None:
+            _disk_bytes -= old
+        index[name] = len(data)
+        _disk_bytes += len(data)
+        while _disk_bytes > budget and len(index) > 1:
+            victim, size = index.popitem(last=False)
+            _disk_bytes -= size
+            _stats["disk_evictions"] += 1
+            doomed.append(victim)
+    for victim in doomed:
+        (root / victim).unlink(missing_ok=True)
+
+
+def _minio_get(name: str) -> bytes | None:
+    try:
+        return storage.get_bytes(PREFIX + name)
+    except Exception as e:  # noqa: BLE001 — the shared tier is optional
+        _count("minio_errors")
+        log.debug(f"render cache: MinIO read failed: {e}")
+        return None
+
+
+def _minio_put(name: str, data: bytes, ext: str) -> None:
+    try:
+        storage.put_bytes(PREFIX + name, data, _MEDIA.get(ext, "application/octet-stream"))
+    except Exception as e:  # noqa: BLE001 — the shared tier is optional
+        _count("minio_errors")
+        log.debug(f"render cache: MinIO write failed: {e}")
+
+
+def get(digest: str, ext: str) -> bytes | None:
+    name = f"{digest}.{ext}"
+    with _lock:
+        data = _memory.get(name)
+        if data is not None:
+            _memory.move_to_end(name)
+            _stats["memory_hits"] += 1
+            return data
+    data = _disk_get(name)
+    if data is not None:
+        _count("disk_hits")
+        _memory_put(name, data)
+        return data
+    data = _minio_get(name)
+    if data is not None:
+        _count("minio_hits")
+        try:
+            _disk_put(name, data)
+        except OSError as e:
+            log.warning(f"render cache write failed: {e}")
+        _memory_put(name, data)
+        return data
+    _count("misses")
+    return None
+
+
+def put(digest: str, ext: str, data: bytes) -> None:
+    """Store a fresh render in every tier. Never raises: a render that could
+    not be cached is still a good render."""
+    name = f"{digest}.{ext}"
+    _count("writes")
+    _memory_put(name, data)
+    try:
+        _disk_put(name, data)
+    except OSError as e:
+        log.warning(f"render cache write failed: {e}")
+    _minio_put(name, data, ext)
+
+
+def stats() -> dict:
+    with _lock:
+        _disk_index()
+        lookups = _stats["memory_hits"] + _stats["disk_hits"] + _stats["minio_hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_rate": round(1 - _stats["misses"] / lookups, 4) if lookups else None,
+            "memory_entries": len(_memory),
+            "memory_bytes": _memory_bytes,
+            "memory_budget_bytes": settings.render_cache_memory_mb << 20,
+            "disk_entries": len(_disk),
+            "disk_bytes": _disk_bytes,
+            "disk_budget_bytes": settings.render_cache_disk_mb << 20,
+        }
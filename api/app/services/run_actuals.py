@@ -34,7 +34,8 @@ from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from .. import models as M
-from . import cost_steps, fx
+from ..config import settings
+from . import cost_steps, fx, pool_checkpoints
 from .project_bom import display_currency, run_pricing_date
 
 # Kinds that are component purchases feeding the pool; everything else is a
@@ -566,9 +567,22 @@ def pool_state(db: Session, project_id: int | None = None, as_of: str | None = N
         # retro-price a 2024 batch, because the replay would run to the end.
         events = [e for e in events if (e[0] or "9999") <= as_of]
 
+    # The replay resumes from the latest persisted checkpoint whose events
+    # still hash the same (services/pool_checkpoints.py), so only the tail
+    # since then is replayed — a backdated row drops the checkpoints after it.
+    replay = None
+    start = 0
+    saved = None
+    if settings.pool_checkpoint_events > 0 and events:
+        replay = pool_checkpoints.Replay([e[0] or "9999" for e in events],
+                                         _event_lines(db, events, doc_by_id, surcharge),
+                                         as_of)
+        start, saved = replay.resume()
+
     # One rate table per distinct event date keeps the replay honest without a
-    # query per row. A document's own pinned rate wins when present.
-    rate_cache: dict[str, dict[str, float]] = {}
+    # query per row — all resolved up front in one batch (`fx.rates_at_many`).
+    # A document's own pinned rate wins when present.
+    rate_cache = _rate_tables(db, (e[0] for e in events[start:]))
 
     def rates_for(date_iso: str) -> dict[str, float]:
         if date_iso not in rate_cache:
@@ -596,7 +610,10 @@ def pool_state(db: Session, project_id: int | None = None, as_of: str | None = N
                  "min_qty": 0.0, "first_short": None,
                  "unknown_rate": False}
     )
-    for date_iso, kind, row in events:
+    if saved:
+        pool.update(saved)
+    for i in range(start, len(events)):
+        date_iso, kind, row = events[i]
         k = _key(row)
         p = pool[k]
         p["mpn"] = p["mpn"] or getattr(row, "mpn", "") or ""
@@ -656,9 +673,39 @@ def pool_state(db: Session, project_id: int | None = None, as_of: str | None = N
             p["min_qty"] = p["qty"]
             if p["qty"] < -0.0001 and p["first_short"] is None:
                 p["first_short"] = date_iso
+        if replay is not None:
+            replay.after(i, pool)
     return dict(pool)
 
 
+def _event_lines(db: Session, events: list, doc_by_id: dict, surcharge: dict) -> list[str]:
+    """One line per pool event naming every input `pool_state` reads for it —
+    including the rate a purchase converts at — so a checkpoint's digest
+    changes whenever anything its replay depended on does."""
+    rate = fx.rate_lookup(db)
+    stamps: dict[str, object] = {}
+    lines = []
+    for date_iso, kind, row in events:
+        ident = (_key(row), getattr(row, "mpn", "") or "", getattr(row, "lcsc", "") or "",
+                 getattr(row, "component_id", None))
+        if kind == "buy":
+            doc = doc_by_id[row.document_id]
+            cur = row.currency or doc.currency or "USD"
+            at_rate = None
+            if not (doc.fx_rate_usd and cur.upper() != "USD"):
+                if date_iso not in stamps:
+                    stamps[date_iso] = _as_dt(date_iso)
+                at_rate = rate(cur, stamps[date_iso])
+            sig = (row.qty, row.unit_price, cur, doc.fx_rate_usd,
+                   surcharge.get(row.id, 0.0), at_rate)
+        elif kind == "use":
+            sig = (row.qty, row.unit_cost_usd)
+        else:
+            sig = (row.qty_delta, row.unit_cost_usd)
+        lines.append(f"{date_iso!r} {kind} {row.id} {ident!r} {sig!r}\n")
+    return lines
+
+
 def component_ledger(db: Session, component_id: int | None = None,
                      mpn: str = "", lcsc: str = "") -> dict:
     """One part's complete event history with the running balance after every
@@ -673,7 +720,7 @@ def component_ledger(db: Session, component_id: int | None = None,
     events, doc_by_id, surcharge = _pool_events(db)
     runs = {r.id: r for r in db.query(M.ProductionRun).all()}
 
-    rate_cache: dict[str, dict[str, float]] = {}
+    rate_cache = _rate_tables(db, (e[0] for e in events))
 
     def rates_for(date_iso: str) -> dict[str, float]:
         if date_iso not in rate_cache:
@@ -823,6 +870,12 @@ def _as_dt(date_iso: str):
         return datetime.now(timezone.utc)
 
 
+def _rate_tables(db: Session, keys) -> dict[str, dict[str, float]]:
+    """`fx.rates_at` for every distinct ISO date in `keys`, as one batch."""
+    keys = list(dict.fromkeys(keys))
+    return dict(zip(keys, fx.rates_at_many(db, [_as_dt(k) for k in keys])))
+
+
 # ------------------------------------------------------------ run actuals
 
 def run_actuals(db: Session, run: M.ProductionRun) -> dict:
@@ -1305,7 +1358,9 @@ def invoice_register(db: Session) -> dict:
         .order_by(M.RunCostDocument.doc_date.desc(), M.RunCostDocument.id.desc())
         .all()
     )
-    rate_cache: dict[str, dict[str, float]] = {}
+    rate_cache = _rate_tables(db, (d.doc_date or "" for d in docs
+                                   if (d.currency or "USD").upper() != "USD"
+                                   and not d.fx_rate_usd))
     unknown: set[str] = set()
 
     def to_usd(amount: float, doc: M.RunCostDocument) -> float:
@@ -0,0 +1,182 @@
+"""Component search index — the `component_search` table behind
+GET /api/components?q= and Jaravis's `search_components`.
+
+Both used to load every component with every version and property and match
+in Python, which is a full library walk per keystroke. The index holds one
+flat row per component, built from its CURRENT version exactly the way the
+browse list prints it (`props_dict`, `resolved_value`, `category_path`), so a
+search is one SQL query: trigram-indexed substring match on `haystack` — the
+same "needle in any value" rule as before — OR a word match on the tsvector,
+plus the category filter, ordering and paging.
+
+The rows are derived, never authoritative. `sync` diffs the table against
+(current version, category path, footprint display name) per component and
+rewrites only what moved; publish paths and category edits call `refresh()`
+next to the catalog rebuild, and readers call `ensure(db)`, which re-syncs
+whenever the components' version stamp changed since the last sync in this
+process — so a publish path that forgot to refresh still shows up on the
+next search instead of never.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload
+
+from .. import models as M
+from ..db import SessionLocal
+
+log = logging.getLogger(__name__)
+
+_CHUNK = 500
+
+_lock = threading.Lock()
+# components stamp the index was last synced against, in this process
+_synced: tuple | None = None
+
+
+def like_pattern(text: str) -> str:
+    """`%text%` with LIKE's own wildcards escaped (use with escape="\\")."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def text_filter(q: str):
+    """The WHERE clause for a free-text query: substring anywhere in the
+    haystack (what the Python scan did), or every word of it as a word."""
+    S = M.ComponentSearch
+    needle = q.strip().lower()
+    return or_(
+        S.haystack.like(like_pattern(needle), escape="\\"),
+        S.search_vector.op("@@")(func.websearch_to_tsquery("simple", needle)),
+    )
+
+
+def _stamp(db: Session) -> tuple:
+    # A publish repoints current_version_id at a NEW (higher) id, so the sum
+    # moves; a deletion moves the count.
+    C = M.Component
+    return tuple(db.query(func.count(C.id), func.sum(C.current_version_id),
+                          func.max(C.current_version_id)).one())
+
+
+def _row(comp: M.Component, cv: M.ComponentVersion, path: str, fp_display: str) -> dict:
+    from ..routers.util import props_dict, resolved_value
+
+    props = props_dict(cv)
+    hay = [comp.name, *((v or "") for v in props.values()), path]
+    return {
+        "component_id": comp.id,
+        "component_version_id": cv.id,
+        "version_no": cv.version_no,
+        "status": cv.status,
+        "category_id": cv.category_id,
+        "category_path": path,
+        "name": comp.name,
+        "base_component": cv.base_component or "",
+        "mfg_pn": props.get("Manufacturer Part Number 1") or "",
+        "manufacturer": props.get("Manufacturer 1") or "",
+        "value": props.get("Value") or "",
+        "description": resolved_value(props.get("ki_description"), props),
+        "footprint": props.get("Footprint") or "",
+        "lcsc": props.get("LCSC Part") or "",
+        "fp_display": fp_display,
+        # newline-joined so a needle cannot match across two values
+        "haystack": "\n".join(hay).lower(),
+    }
+
+
+def sync(db: Session) -> int:
+    """Bring `component_search` up to date and commit. Returns rows changed."""
+    global _synced
+    from ..routers.util import category_path
+
+    S, C, CV = M.ComponentSearch, M.Component, M.ComponentVersion
+    stamp = _stamp(db)
+    paths = {c.id: category_path(c) for c in db.query(M.Category).all()}
+    current = (
+        db.query(C.id, C.current_version_id, CV.category_id, M.Footprint.display_name)
+        .join(CV, CV.id == C.current_version_id)
+        .outerjoin(M.FootprintVersion, M.FootprintVersion.id == CV.footprint_version_id)
+        .outerjoin(M.Footprint, M.Footprint.id == M.FootprintVersion.footprint_id)
+        .all()
+    )
+    indexed = {
+        r.component_id: (r.component_version_id, r.category_path, r.fp_display)
+        for r in db.query(S.component_id, S.component_version_id, S.category_path, S.fp_display)
+    }
+    want = {cid: (cvid, paths.get(cat_id, ""), disp or "") for cid, cvid, cat_id, disp in current}
+    stale = [cid for cid, key in want.items() if indexed.get(cid) != key]
+    gone = [cid for cid in indexed if cid not in want]
+
+    if gone:
+        db.query(S).filter(S.component_id.in_(gone)).delete(synchronize_session=False)
+    for i in range(0, len(stale), _CHUNK):
+        ids = stale[i:i + _CHUNK]
+        comps = {c.id: c for c in db.query(C).filter(C.id.in_(ids))}
+        versions = (
+            db.query(CV)
+            .options(
+                selectinload(CV.properties),
+                selectinload(CV.footprint_version).selectinload(M.FootprintVersion.footprint),
+            )
+            .filter(CV.id.in_([want[cid][0] for cid in ids]))
+            .all()
+        )
+        rows = [_row(comps[cv.component_id], cv, want[cv.component_id][1], want[cv.component_id][2])
+                for cv in versions]
+        if not rows:
+            continue
+        stmt = insert(S).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[S.component_id],
+            set_={k: stmt.excluded[k] for k in rows[0] if k != "component_id"},
+        )
+        db.execute(stmt)
+    db.commit()
+    _synced = stamp
+    if stale or gone:
+        log.info(f"search index: {len(stale)} rows written, {len(gone)} removed")
+    return len(stale) + len(gone)
+
+
+def ensure(db: Session) -> None:
+    """Re-sync before a search if any component was published or removed since
+    this process last synced. One aggregate query when nothing changed."""
+    if _stamp(db) == _synced:
+        return
+    with _lock:
+        if _stamp(db) == _synced:
+            return
+        session = SessionLocal()
+        try:
+            sync(session)
+        finally:
+            session.close()
+
+
+def refresh() -> None:
+    """`sync` for the publish paths, in its own session — never raises: the
+    next search re-syncs anyway, and a derived index must not fail a publish."""
+    try:
+        with _lock:
+            session = SessionLocal()
+            try:
+                sync(session)
+            finally:
+                session.close()
+    except Exception as e:  # noqa: BLE001 — a derived index must never fail a publish
+        log.warning(f"search index refresh failed, next search retries: {type(e).__name__}: {e}")
+        invalidate()
+
+
+def invalidate() -> None:
+    """Force the next search in THIS process to re-sync. Other replicas keep
+    their stamp, so a change the component stamp does not see (category
+    renames and moves, footprint display names) must `refresh()` the shared
+    table instead."""
+    global _synced
+    _synced = None
@@ -10,14 +10,24 @@ Key layout (single bucket, settings.minio_bucket):
     projects/{project_id}/renders/{sha}/{board}/erc.json | drc.json
     projects/{project_id}/renders/{sha}/{board}/fab.zip
     projects/{project_id}/runs/{run_id}/{uuid}-{filename}
+    renders/components/{digest}.svg | .glb   (component previews, render_cache.py)
 
 Renders are keyed by commit sha — immutable, so cached objects never need
 invalidation. Deleting a project/run deletes its prefix.
+
+Downloads that can be large (firmware images, fab bundles, run attachments)
+go through `stat` + `stream` rather than `get_bytes`: the API then holds one
+chunk per response instead of the whole object, and can answer a `Range`
+with an offset read. `presigned_url` hands the transfer to MinIO entirely
+when `minio_public_endpoint` makes it reachable by clients.
 """
 from __future__ import annotations
 
 import io
 import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import timedelta
 
 from minio import Minio
 from minio.deleteobjects import DeleteObject
@@ -26,8 +36,11 @@ from minio.error import S3Error
 from ..config import settings
 
 _client: Minio | None = None
+_public: Minio | None = None
 _lock = threading.Lock()
 
+CHUNK = 1 << 20
+
 
 def client() -> Minio:
     global _client
@@ -64,6 +77,62 @@ def get_bytes(key: str) -> bytes | None:
         raise
 
 
+@dataclass(frozen=True)
+class ObjectInfo:
+    size: int
+    etag: str  # MinIO's, unquoted
+    content_type: str
+
+
+def stat(key: str) -> ObjectInfo | None:
+    try:
+        o = client().stat_object(settings.minio_bucket, key)
+    except S3Error as e:
+        if e.code in ("NoSuchKey", "NoSuchBucket"):
+            return None
+        raise
+    return ObjectInfo(size=o.size or 0, etag=(o.etag or "").strip('"'),
+                      content_type=o.content_type or "application/octet-stream")
+
+
+def stream(key: str, offset: int = 0, length: int | None = None,
+           chunk: int = CHUNK) -> Iterator[bytes]:
+    """The object's bytes from `offset` (`length` of them, or to the end),
+    `chunk` at a time. Nothing is requested until the first chunk is taken,
+    so `stat` the key first if a missing object must become an error
+    response rather than a truncated one."""
+    resp = client().get_object(settings.minio_bucket, key, offset=offset, length=length or 0)
+    try:
+        yield from resp.stream(chunk)
+    finally:
+        resp.close()
+        resp.release_conn()
+
+
+def presigned_url(key: str, expires_s: int, response_headers: dict[str, str] | None = None) -> str | None:
+    """A time-limited GET URL for `key` on `minio_public_endpoint`, or None
+    when no public endpoint is configured. The signature covers the host, so
+    it is signed by a client for that endpoint, not the internal one; the
+    region is given so signing needs no round trip to MinIO."""
+    global _public
+    if not settings.minio_public_endpoint:
+        return None
+    with _lock:
+        if _public is None:
+            secure, _, host = settings.minio_public_endpoint.rpartition("://")
+            _public = Minio(
+                host,
+                access_key=settings.minio_access_key,
+                secret_key=settings.minio_secret_key,
+                secure=secure == "https" if secure else settings.minio_secure,
+                region=settings.minio_region,
+            )
+    return _public.presigned_get_object(
+        settings.minio_bucket, key, expires=timedelta(seconds=expires_s),
+        response_headers=response_headers,
+    )
+
+
 def exists(key: str) -> bool:
     try:
         client().stat_object(settings.minio_bucket, key)
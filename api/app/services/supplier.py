@@ -0,0 +1,209 @@
+"""Supplier HTTP: one pooled client, per-host rate limits, retries and a
+shared response cache — for the LCSC detail fetches behind ladder refreshes
+(`ladder.refresh_stale`) and stock checks (`project_bom.stock_check`).
+
+Both used to fetch one part at a time with a fresh connection each, so a
+full-library refresh took as many sequential round trips as there are
+LCSC-linked components, and a stock check made its caller wait for every
+distinct part in turn. `lcsc_details` takes the whole list:
+
+    cache        fresh `supplier_responses` rows answer without a request
+    fan-out      the rest run `supplier_concurrency` at a time on threads
+                 sharing one keep-alive pool
+    limiter      a token bucket per host paces the fan-out at
+                 `supplier_rate_per_s` (burst of one second's worth), so
+                 concurrency buys latency hiding, not a higher request rate
+    retry        timeouts, 429 and 5xx back off exponentially with jitter,
+                 honouring Retry-After; other 4xx answers are final
+
+A failed fetch is None and is not cached — the next caller tries again.
+tools/supplier_fake_lcsc.py checks all of the above against a fake LCSC.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy.dialects.postgresql import insert
+
+from .. import models as M
+from ..config import settings
+from ..db import SessionLocal
+from ..models import utcnow
+
+log = logging.getLogger(__name__)
+
+LCSC_DETAIL_URL = "https://wmsc.lcsc.com/ftps/wm/product/detail?productCode={}"
+
+RETRIES = 3
+BACKOFF_S = 1.0  # first retry delay, doubled per attempt, ±50 % jitter
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_buckets: dict[str, "_Bucket"] = {}
+
+
+class _Retryable(Exception):
+    def __init__(self, msg: str, retry_after: float | None = None):
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+
+class _Bucket:
+    """Token bucket: `rate` tokens a second, holding at most `rate`. A taker
+    that finds it empty reserves the next token and sleeps until it is due,
+    so waiters are served in arrival order without busy-looping."""
+
+    def __init__(self, rate: float):
+        self.rate = max(rate, 0.1)
+        self.tokens = self.rate
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+def _bucket(host: str) -> _Bucket:
+    with _client_lock:
+        b = _buckets.get(host)
+        if b is None:
+            b = _buckets[host] = _Bucket(settings.supplier_rate_per_s)
+        return b
+
+
+def client() -> httpx.Client:
+    global _client
+    with _client_lock:
+        if _client is None:
+            n = max(settings.supplier_concurrency, 1)
+            _client = httpx.Client(
+                headers={"User-Agent": "Mozilla/5.0"},
+                timeout=15,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=n, max_keepalive_connections=n),
+            )
+        return _client
+
+
+def _retry_after(resp: httpx.Response) -> float | None:
+    try:
+        return float(resp.headers.get("retry-after", ""))
+    except ValueError:
+        return None  # an HTTP-date: fall back to our own backoff
+
+
+def get_json(url: str):
+    """GET `url` through the limiter with retries. The decoded JSON, or None
+    when the supplier refused for good or every attempt failed."""
+    bucket = _bucket(urlsplit(url).hostname or "")
+    for attempt in range(RETRIES + 1):
+        bucket.take()
+        try:
+            resp = client().get(url)
+            if resp.status_code in _RETRY_STATUS:
+                raise _Retryable(f"HTTP {resp.status_code}", _retry_after(resp))
+            resp.raise_for_status()
+            return resp.json()
+        except (_Retryable, httpx.TransportError) as e:
+            if attempt == RETRIES:
+                log.debug(f"supplier GET {url} gave up after {attempt + 1} attempts: {e}")
+                return None
+            delay = BACKOFF_S * 2 ** attempt * random.uniform(0.5, 1.5)
+            if isinstance(e, _Retryable) and e.retry_after is not None:
+                delay = max(delay, min(e.retry_after, 60.0))
+            time.sleep(delay)
+        except (httpx.HTTPError, ValueError) as e:
+            log.debug(f"supplier GET {url} failed: {e}")
+            return None
+    return None
+
+
+# -------------------------------------------------------------- response cache
+
+def _cached(keys: list[str]) -> dict[str, dict | None]:
+    if not keys or settings.supplier_cache_minutes <= 0:
+        return {}
+    since = utcnow() - timedelta(minutes=settings.supplier_cache_minutes)
+    db = SessionLocal()
+    try:
+        R = M.SupplierResponse
+        return {
+            k: body
+            for k, body in db.query(R.key, R.body).filter(R.key.in_(keys), R.fetched_at >= since)
+        }
+    except Exception as e:  # noqa: BLE001 — a cache outage costs requests, not answers
+        log.debug(f"supplier cache read failed: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+def _store(answers: dict[str, dict | None]) -> None:
+    if not answers or settings.supplier_cache_minutes <= 0:
+        return
+    R = M.SupplierResponse
+    now = utcnow()
+    db = SessionLocal()
+    try:
+        rows = [{"key": k, "body": v, "fetched_at": now} for k, v in answers.items()]
+        stmt = insert(R).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[R.key], set_={"body": stmt.excluded.body, "fetched_at": stmt.excluded.fetched_at}))
+        db.query(R).filter(R.fetched_at < now - timedelta(minutes=settings.supplier_cache_minutes)).delete(
+            synchronize_session=False)
+        db.commit()
+    except Exception as e:  # noqa: BLE001 — a cache outage costs requests, not answers
+        log.debug(f"supplier cache write failed: {e}")
+    finally:
+        db.close()
+
+
+# ----------------------------------------------------------------------- LCSC
+
+def _lcsc_detail(code: str) -> tuple[bool, dict | None]:
+    """(answered, product) for one part. `answered` False = the fetch failed."""
+    data = get_json(LCSC_DETAIL_URL.format(code))
+    if not isinstance(data, dict):
+        return False, None
+    result = data.get("result")
+    return True, result if isinstance(result, dict) else None
+
+
+def lcsc_details(codes, use_cache: bool = True) -> dict[str, dict | None]:
+    """LCSC product detail per code (the raw `result` object), None where the
+    part is unknown or could not be fetched. Duplicates are fetched once."""
+    codes = sorted({c for c in codes if c})
+    keys = {c: f"lcsc:detail:{c}" for c in codes}
+    hits = _cached(list(keys.values())) if use_cache else {}
+    out = {c: hits[keys[c]] for c in codes if keys[c] in hits}
+    todo = [c for c in codes if c not in out]
+    if not todo:
+        return out
+    workers = min(max(settings.supplier_concurrency, 1), len(todo))
+    if workers == 1:
+        fetched = [_lcsc_detail(c) for c in todo]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="supplier") as pool:
+            fetched = list(pool.map(_lcsc_detail, todo))
+    answered: dict[str, dict | None] = {}
+    for code, (ok, detail) in zip(todo, fetched):
+        out[code] = detail
+        if ok:
+            answered[keys[code]] = detail
+    _store(answered)
+    return out
@@ -0,0 +1,169 @@
+"""Where-used index — the `component_usage` table behind
+GET /api/components/{id}/where-used, Jaravis's `component_where_used` and the
+affected-projects count in a geometry approval's material diff.
+
+Where-used used to walk every project: find its latest ready snapshot, then
+query that snapshot's BOM lines for the component — two round trips per
+project, per question. The index holds the matched BOM lines of each
+project's latest ready snapshot, so the question is one indexed read however
+many projects there are.
+
+Same contract as the search index (services/search_index.py): the rows are
+derived, never authoritative. `sync` compares each project's latest ready
+snapshot with the one its rows were copied from and rewrites only projects
+that moved; ingest completion calls `refresh_project` (which also covers
+re-ingesting the same snapshot, where the id does not move), and readers
+call `ensure(db)`, which re-syncs whenever the set of ready snapshots
+changed since this process last synced — a snapshot deleted through any
+path still drops out on the next read.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from .. import models as M
+from ..db import SessionLocal
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# ready-snapshot stamp the index was last synced against, in this process
+_synced: tuple | None = None
+
+_COLUMNS = ("component_id", "project_id", "snapshot_id", "board", "variant", "refs", "qty", "dnp")
+
+
+def _stamp(db: Session) -> tuple:
+    # A new ready snapshot raises the max id, a deleted one moves the count.
+    S = M.ProjectSnapshot
+    return tuple(db.query(func.count(S.id), func.sum(S.id), func.max(S.id))
+                 .filter(S.status == "ready").one())
+
+
+def _latest_ready(db: Session, project_ids=None) -> dict[int, int]:
+    """project_id -> id of its latest ready snapshot."""
+    S = M.ProjectSnapshot
+    q = (
+        db.query(S.project_id, S.id)
+        .filter(S.status == "ready")
+        .distinct(S.project_id)
+        .order_by(S.project_id, S.created_at.desc(), S.id.desc())
+    )
+    if project_ids is not None:
+        q = q.filter(S.project_id.in_(project_ids))
+    return dict(q.all())
+
+
+def _write(db: Session, project_ids: list[int], snapshot_ids: list[int]) -> None:
+    """Replace the rows of `project_ids` with the matched lines of
+    `snapshot_ids` — one DELETE and one INSERT … SELECT.
+
+    `_lock` only covers this process, and ingest jobs rewrite projects from
+    worker processes while API replicas sync. Two concurrent DELETE + INSERT
+    runs for one project under READ COMMITTED would both insert, doubling
+    its usages — so each project is held under a transaction-scoped advisory
+    lock (taken in id order, so two multi-project syncs cannot deadlock);
+    the second writer's DELETE then sees the first one's rows."""
+    U, L, S = M.ComponentUsage, M.SnapshotBomLine, M.ProjectSnapshot
+    for pid in sorted(set(project_ids)):
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext('usage:' || :p))"), {"p": str(pid)})
+    db.query(U).filter(U.project_id.in_(project_ids)).delete(synchronize_session=False)
+    if not snapshot_ids:
+        return
+    src = (
+        select(L.component_id, S.project_id, S.id, L.board, L.variant, L.refs, L.qty, L.dnp)
+        .join(S, S.id == L.snapshot_id)
+        .where(L.snapshot_id.in_(snapshot_ids), L.component_id.is_not(None))
+    )
+    db.execute(insert(U).from_select(_COLUMNS, src))
+
+
+def sync(db: Session) -> int:
+    """Bring `component_usage` up to date and commit. Returns projects rewritten."""
+    global _synced
+    U = M.ComponentUsage
+    stamp = _stamp(db)
+    want = _latest_ready(db)
+    indexed = dict(db.query(U.project_id, U.snapshot_id).distinct().all())
+    # A latest snapshot with no matched lines has no rows, so it always reads
+    # as stale here; rewriting it is an empty INSERT … SELECT.
+    stale = [pid for pid, sid in want.items() if indexed.get(pid) != sid]
+    gone = [pid for pid in indexed if pid not in want]
+    if stale or gone:
+        _write(db, stale + gone, [want[pid] for pid in stale])
+    db.commit()
+    _synced = stamp
+    return len(stale) + len(gone)
+
+
+def ensure(db: Session) -> None:
+    """Re-sync before a read if any snapshot became ready or was removed since
+    this process last synced. One aggregate query when nothing changed."""
+    if _stamp(db) == _synced:
+        return
+    with _lock:
+        if _stamp(db) == _synced:
+            return
+        session = SessionLocal()
+        try:
+            sync(session)
+        finally:
+            session.close()
+
+
+def refresh_project(project_id: int) -> None:
+    """Rewrite one project's rows from its latest ready snapshot, in its own
+    session — for ingest completion. Never raises: a derived index must not
+    fail an ingest, and the next read re-syncs anyway."""
+    global _synced
+    try:
+        with _lock:
+            session = SessionLocal()
+            try:
+                latest = _latest_ready(session, [project_id]).get(project_id)
+                _write(session, [project_id], [latest] if latest else [])
+                session.commit()
+            finally:
+                session.close()
+    except Exception as e:  # noqa: BLE001 — a derived index must never fail an ingest
+        log.warning(f"usage index refresh of project {project_id} failed, next read retries: "
+                    f"{type(e).__name__}: {e}")
+        _synced = None
+
+
+def where_used(db: Session, component_ids) -> dict[int, list[dict]]:
+    """component_id -> the projects using it, by project name, each with its
+    latest ready snapshot and the matched lines (board, variant, refs, qty,
+    dnp). Components no project uses are absent. Call `ensure` first."""
+    U, P, S = M.ComponentUsage, M.Project, M.ProjectSnapshot
+    ids = list(component_ids)
+    out: dict[int, list[dict]] = {}
+    if not ids:
+        return out
+    rows = (
+        db.query(U, P.name, S.ref_name, S.sha)
+        .join(P, P.id == U.project_id)
+        .join(S, S.id == U.snapshot_id)
+        .filter(U.component_id.in_(ids))
+        .order_by(P.name, U.project_id, U.board, U.variant, U.id)
+        .all()
+    )
+    for u, name, ref, sha in rows:
+        projects = out.setdefault(u.component_id, [])
+        if not projects or projects[-1]["project_id"] != u.project_id:
+            projects.append({
+                "project_id": u.project_id,
+                "project_name": name,
+                "snapshot_id": u.snapshot_id,
+                "ref": ref,
+                "sha": sha,
+                "usages": [],
+            })
+        projects[-1]["usages"].append(
+            {"board": u.board, "variant": u.variant, "refs": u.refs, "qty": u.qty, "dnp": u.dnp}
+        )
+    return out
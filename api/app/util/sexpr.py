@@ -34,6 +34,69 @@ def parse_sexpr(text: str):
     return sexpr.parse_sexp(text)
 
 
+_HEAD = re.compile(r'\(\s*([^\s()"]+)')
+
+
+def _mask_strings(text: str, chunk: int = 1 << 20) -> str:
+    """`text` with every paren inside a quoted string replaced, same length, so
+    what is left of `(`/`)` is structure. A quote preceded by a backslash does
+    not end a string — the same rule kiutils' tokenizer applies.
+
+    Done a chunk at a time (cut at a newline, which an escaped quote never
+    spans) so the split lists stay small; only the masked copy is kept.
+    """
+    out = []
+    in_string = False
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start + chunk)
+        end = len(text) if end < 0 else end + 1
+        parts = text[start:end].replace('\\"', "\x00\x00").split('"')
+        for i in range(1 if not in_string else 0, len(parts), 2):
+            part = parts[i]
+            if "(" in part or ")" in part:
+                parts[i] = part.replace("(", "\x01").replace(")", "\x01")
+        if len(parts) % 2 == 0:
+            in_string = not in_string
+        out.append('"'.join(parts))
+        start = end
+    return "".join(out)
+
+
+def iter_top_level(text: str, tags):
+    """Yield the parsed children of the root node whose tag is in `tags`, in
+    file order.
+
+    A board is mostly tracks, vias and zones nobody here looks at, and
+    `parse_sexpr` turns every one of them into nested lists — a 10 MB board is
+    a couple of hundred MB of them. This skips over children by counting
+    parens (`str.find`/`str.count`, no tokenizing) and only hands the wanted
+    subtrees to the parser, one at a time, so the rest of the file is never
+    materialized and the caller can stop early (`break`) once it has what it
+    needs. Each yielded node is exactly what `parse_sexpr` on the whole file
+    would have put at that position.
+    """
+    wanted = set(tags)
+    masked = _mask_strings(text)
+    find, count = masked.find, masked.count
+    pos = find("(") + 1  # just inside the root node
+    while True:
+        start = find("(", pos)
+        close = find(")", pos)
+        if start < 0 or close < start:
+            return  # root closed (or the text ended)
+        depth, pos = 1, start + 1
+        while depth:
+            close = find(")", pos)
+            if close < 0:
+                return  # truncated file: the unterminated child is dropped
+            depth += count("(", pos, close) - 1
+            pos = close + 1
+        head = _HEAD.match(masked, start)
+        if head and _norm(head.group(1)) in wanted:
+            yield parse_sexpr(text[start:pos])
+
+
 def _norm(atom) -> str:
     """Normalize a parsed atom to a plain string (strip quotes defensively)."""
     s = str(atom)
@@ -0,0 +1,55 @@
+"""Dedicated job worker process: `python -m app.worker [THREADS]`.
+
+Runs the same worker loop the API processes run in their background
+threads (services/jobs.py), without serving HTTP — scale snapshot ingests
+by running more of these against the same database and data volume. The
+schema is the API's job; start at least one API process first.
+
+Settings overrides stored from the Setup page (services/appconfig.py) are
+applied at start and re-read before every job, so a change made through an
+API process reaches jobs here without a restart — mirror writes use the
+same public URL and library nicknames, renders the same mode and themes.
+
+SIGTERM / Ctrl-C stops claiming new work and waits for the running jobs.
+"""
+from __future__ import annotations
+
+import logging
+import signal
+import sys
+import threading
+
+from .config import settings
+from .db import SessionLocal
+from .services import appconfig, jobs
+
+log = logging.getLogger(__name__)
+
+
+def _reload_overrides() -> None:
+    db = SessionLocal()
+    try:
+        appconfig.reload_overrides(db)
+    finally:
+        db.close()
+
+
+def main(argv: list[str]) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        _reload_overrides()
+    except Exception as e:  # noqa: BLE001 — no settings table yet: env only
+        log.warning(f"settings overrides not applied: {type(e).__name__}: {e}")
+    settings.ensure_dirs()
+    threads = int(argv[0]) if argv else max(settings.job_workers, 1)
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    jobs.start_workers(threads, before_job=_reload_overrides)
+    stop.wait()
+    log.info("stopping: waiting for running jobs")
+    jobs.stop_workers()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
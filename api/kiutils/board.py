@@ -231,10 +231,23 @@ class Board:
             raise Exception("Given path is not a file!")
 
         with open(filepath, "r", encoding=encoding) as infile:
-            item = cls.from_sexpr(parse_sexp(infile.read()))
+            item = cls.from_text(infile.read())
             item.filePath = filepath
             return item
 
+    @classmethod
+    def from_text(cls, text: str) -> Board:
+        """Load a board from the content of a KiCad board file (`.kicad_pcb`), without touching
+        the file system. ``self.filePath`` is left unset.
+
+        Args:
+            - text (str): Content of the file
+
+        Returns:
+            - Board: Object of the Board class initialized with the given content
+        """
+        return cls.from_sexpr(parse_sexp(text))
+
     @classmethod
     def create_new(cls) -> Board:
         """Creates a new empty board with its attributes set as KiCad would create it
@@ -322,8 +335,15 @@ class Board:
             filepath = self.filePath
 
         with open(filepath, "w", encoding=encoding) as outfile:
-            pre_formatted_sexpr = self.to_sexpr()
-            outfile.write(prettify(pre_formatted_sexpr))
+            outfile.write(self.to_text())
+
+    def to_text(self) -> str:
+        """Generate the file content ``self.to_file()`` writes, without touching the file system
+
+        Returns:
+            - str: Prettified S-Expression of this object
+        """
+        return prettify(self.to_sexpr())
 
     def to_sexpr(self, indent=0, newline=True) -> str:
         """Generate the S-Expression representing this object
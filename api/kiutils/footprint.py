@@ -1105,10 +1105,20 @@ class Footprint:
             raise Exception("Given path is not a file!")
 
         with open(filepath, "r", encoding=encoding) as infile:
-            rawFootprint = infile.read()
+            return cls.from_text(infile.read())
 
-            fpData = parse_sexp(rawFootprint)
-            return cls.from_sexpr(fpData)
+    @classmethod
+    def from_text(cls, text: str) -> Footprint:
+        """Load a footprint from the content of a KiCad footprint file (`.kicad_mod`), without touching
+        the file system.
+
+        Args:
+            - text (str): Content of the file
+
+        Returns:
+            - Footprint: Object of the Footprint class initialized with the given content
+        """
+        return cls.from_sexpr(parse_sexp(text))
 
     @classmethod
     def create_new(
@@ -1189,8 +1199,15 @@ class Footprint:
             filepath = self.filePath
 
         with open(filepath, "w", encoding=encoding) as outfile:
-            pre_formatted_sexpr = self.to_sexpr()
-            outfile.write(prettify(pre_formatted_sexpr))
+            outfile.write(self.to_text())
+
+    def to_text(self) -> str:
+        """Generate the file content ``self.to_file()`` writes, without touching the file system
+
+        Returns:
+            - str: Prettified S-Expression of this object
+        """
+        return prettify(self.to_sexpr())
 
     def to_sexpr(self, indent=0, newline=True, layerInFirstLine=False) -> str:
         """Generate the S-Expression representing this object
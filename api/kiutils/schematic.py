@@ -256,10 +256,23 @@ class Schematic:
             raise Exception(f"Given path ('{filepath}') is not a file!")
 
         with open(filepath, "r", encoding=encoding) as infile:
-            item = cls.from_sexpr(parse_sexp(infile.read()))
+            item = cls.from_text(infile.read())
             item.filePath = filepath
             return item
 
+    @classmethod
+    def from_text(cls, text: str) -> Schematic:
+        """Load a schematic from the content of a KiCad schematic file (`.kicad_sch`), without touching
+        the file system. ``self.filePath`` is left unset.
+
+        Args:
+            - text (str): Content of the file
+
+        Returns:
+            - Schematic: Object of the Schematic class initialized with the given content
+        """
+        return cls.from_sexpr(parse_sexp(text))
+
     @classmethod
     def create_new(cls) -> Schematic:
         """Creates a new empty schematic page with its attributes set as KiCad would create it
@@ -295,8 +308,15 @@ class Schematic:
             filepath = self.filePath
 
         with open(filepath, "w", encoding=encoding) as outfile:
-            pre_formatted_sexpr = self.to_sexpr()
-            outfile.write(prettify(pre_formatted_sexpr))
+            outfile.write(self.to_text())
+
+    def to_text(self) -> str:
+        """Generate the file content ``self.to_file()`` writes, without touching the file system
+
+        Returns:
+            - str: Prettified S-Expression of this object
+        """
+        return prettify(self.to_sexpr())
 
     def to_sexpr(self, indent=0, newline=True) -> str:
         """Generate the S-Expression representing this object
@@ -674,10 +674,23 @@ class SymbolLib:
             raise Exception("Given path is not a file!")
 
         with open(filepath, "r", encoding=encoding) as infile:
-            item = cls.from_sexpr(parse_sexp(infile.read()))
+            item = cls.from_text(infile.read())
             item.filePath = filepath
             return item
 
+    @classmethod
+    def from_text(cls, text: str) -> SymbolLib:
+        """Load a symbol library from the content of a KiCad symbol library file (`.kicad_sym`), without touching
+        the file system. ``self.filePath`` is left unset.
+
+        Args:
+            - text (str): Content of the file
+
+        Returns:
+            - SymbolLib: Object of the SymbolLib class initialized with the given content
+        """
+        return cls.from_sexpr(parse_sexp(text))
+
     @classmethod
     def from_sexpr(cls, exp: list) -> SymbolLib:
         """Convert the given S-Expresstion into a SymbolLib object
@@ -744,8 +757,15 @@ class SymbolLib:
             filepath = self.filePath
 
         with open(filepath, "w", encoding=encoding) as outfile:
-            pre_formatted_sexpr = self.to_sexpr()
-            outfile.write(prettify(pre_formatted_sexpr))
+            outfile.write(self.to_text())
+
+    def to_text(self) -> str:
+        """Generate the file content ``self.to_file()`` writes, without touching the file system
+
+        Returns:
+            - str: Prettified S-Expression of this object
+        """
+        return prettify(self.to_sexpr())
 
     def to_sexpr(self, indent: int = 0, newline: bool = True) -> str:
         """Generate the S-Expression representing this object
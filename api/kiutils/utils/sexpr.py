@@ -2,50 +2,150 @@
 # code extracted from: http://rosettacode.org/wiki/S-Expressions
 # Originally taken from: https://gitlab.com/kicad/libraries/kicad-library-utils/-/blob/master/common/sexpr.py
 
+import gc
 import re
 
 from .format_utils import format_float
 
-dbg = False
+# One token of the KiCad s-expression grammar, as the original rosettacode
+# parser defined it. Its quirks are load-bearing and both scanners below keep
+# them exactly:
+#   * a number is `[+-]?d.d` or `-?d` and only when followed by a SPACE or `)`
+#     — "1.0" before a newline, a tab or end of input stays a string;
+#   * a quoted string ends at the first `"` not preceded by a backslash, and
+#     only if whitespace or `)` follows; `\"` inside it becomes `"`;
+#   * a bare `^` outside a string is dropped.
+_TOKEN = re.compile(r"""\s*(?:
+    ([()])
+  | ([+-]?\d+\.\d+(?=[ )])|-?\d+(?=[ )]))
+  | ("(?:[^"]|(?<=\\)")*"(?=[)\s]))
+  | ([^(^)\s]+)
+)""", re.X)
+
+_NUMBER = re.compile(r"[+-]?\d+\.\d+|-?\d+").fullmatch
+
+# Shapes the split scanner leaves to the exact one. Quoted strings must sit
+# between separators: whitespace or `(`/`)` before the opening quote, whitespace
+# or `)` after the closing one (`a"b"` and `"a"b` are single bare tokens to the
+# grammar). And a digit must not end a token right before a terminator other
+# than space, `)` or a line break: `str.split` cannot see which one it was, and
+# before anything else a number is a string.
+_NOT_AFTER_STRING = re.compile(r"[^\s)]").search
+_NOT_BEFORE_STRING = re.compile(r"[^\s()]").search
+_ODD_NUMBER_END = re.compile(r"[0-9](?:[^\S \n\r]|\(|\Z)").search
+
+
+def _scan_tokens(sexp):
+    """Exact scanner: one regex pass, dispatch on the group that matched."""
+    stack = []
+    out = []
+    append = out.append
+    for bracket, number, quoted, symbol in _TOKEN.findall(sexp):
+        if bracket == "(":
+            stack.append(out)
+            out = []
+            append = out.append
+        elif bracket:
+            assert stack, "Trouble with nesting of brackets"
+            done, out = out, stack.pop()
+            out.append(done)
+            append = out.append
+        elif number:
+            append(float(number))
+        elif quoted:
+            append(quoted[1:-1].replace(r"\"", '"'))
+        else:
+            append(symbol)
+    assert not stack, "Trouble with nesting of brackets"
+    return out[0]
 
-term_regex = r"""(?mx)
-    \s*(?:
-        (?P<brackl>\()|
-        (?P<brackr>\))|
-        (?P<num>[+-]?\d+\.\d+(?=[\ \)])|\-?\d+(?=[\ \)]))|
-        (?P<sq>"(?:[^"]|(?<=\\)")*"(?:(?=\))|(?=\s)))|
-        (?P<s>[^(^)\s]+)
-       )"""
 
+def _scan_split(sexp):
+    """Fast scanner for well-formed input, or None when the input needs the
+    exact one. Quoted strings are cut out with one `str.split('"')` and bare
+    tokens with one `str.split()`, both in C, so the Python loop only builds
+    the lists — instead of running a five-way regex per token."""
+    if "\x00" in sexp or "\x01" in sexp or "\x02" in sexp:
+        return None
+    escaped = '\\"' in sexp
+    if escaped:
+        sexp = sexp.replace('\\"', "\x00")
+    parts = sexp.split('"')
+    if not len(parts) % 2:
+        return None  # a string still open at end of input
+    outside_parts = parts[0::2]
+    if len(outside_parts) > 1:
+        after = "".join([p[:1] for p in outside_parts[1:]])
+        before = "".join([p[-1:] for p in outside_parts[1:-1]]) + outside_parts[0][-1:]
+        if (len(after) != len(outside_parts) - 1 or _NOT_AFTER_STRING(after)
+                or _NOT_BEFORE_STRING(before)):
+            return None
+    # Everything outside quotes, each string collapsed to \x01.
+    outside = "\x01".join(outside_parts)
+    if "\x00" in outside or "^" in outside or not outside.isascii() or _ODD_NUMBER_END(outside):
+        return None
+    strings = "\x01".join(parts[1::2])
+    if escaped:
+        strings = strings.replace("\x00", '"')
+    next_string = iter(strings.split("\x01")).__next__
+
+    # A token ending a line is glued to \x02 so the loop can tell "1.0\n"
+    # (a string) from "1.0 " (a number). Lines mostly end in `)`, which needs
+    # no tag, so those are dropped again before splitting.
+    outside = outside.replace("\n", "\x02\n")
+    if "\r" in outside:
+        outside = outside.replace("\r", "\x02\r")
+    tokens = (outside.replace(")\x02", ")").replace("\x01", " \x01 ")
+              .replace("(", " ( ").replace(")", " ) ").split())
 
-def parse_sexp(sexp):
     stack = []
     out = []
-    if dbg:
-        print("%-6s %-14s %-44s %-s" % tuple("term value out stack".split()))
-    for termtypes in re.finditer(term_regex, sexp):
-        term, value = [(t, v) for t, v in termtypes.groupdict().items() if v][0]
-        if dbg:
-            print("%-7s %-14s %-44r %-r" % (term, value, out, stack))
-        if term == "brackl":
+    append = out.append
+    for tok in tokens:
+        if tok == "(":
             stack.append(out)
             out = []
-        elif term == "brackr":
+            append = out.append
+        elif tok == ")":
             assert stack, "Trouble with nesting of brackets"
-            tmpout, out = out, stack.pop(-1)
-            out.append(tmpout)
-        elif term == "num":
-            out.append(float(value))
-        elif term == "sq":
-            out.append(value[1:-1].replace(r"\"", '"'))
-        elif term == "s":
-            out.append(value)
-        else:
-            raise NotImplementedError("Error: (%r, %r)" % (term, value))
+            done, out = out, stack.pop()
+            out.append(done)
+            append = out.append
+        elif tok == "\x01":
+            append(next_string())
+        elif tok[-1] != "\x02":
+            if tok[0] in "+-0123456789" and _NUMBER(tok):
+                append(float(tok))
+            else:
+                append(tok)
+        elif tok != "\x02":
+            append(tok[:-1])
     assert not stack, "Trouble with nesting of brackets"
     return out[0]
 
 
+def parse_sexp(sexp):
+    """Parse s-expression text into nested lists of strings and floats.
+
+    Every KiCad file load goes through here — a 20 MB board is millions of
+    tokens. The split scanner handles everything KiCad writes; the exact
+    scanner takes the rest, with the same output for the same input.
+    tools/sexpr_conformance.py checks that against the original parser and
+    tools/sexpr_bench.py times the two.
+    """
+    # Building millions of small lists makes the cyclic GC run over and over
+    # on a structure that holds no cycles — a third of the parse time. Pause
+    # it for the build; the caller's setting is restored either way.
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        result = _scan_split(sexp)
+        return _scan_tokens(sexp) if result is None else result
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
 def sexp_to_string(expr) -> str:
     """Convert a nested list-based S-expression into a raw string."""
     if isinstance(expr, list):
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Time kiutils' parse_sexp against the original rosettacode parser.
+
+Without arguments it generates a KiCad-shaped board, schematic and symbol
+library (deterministic, a few MB each) and times both parsers on them; pass
+real files to time those instead. Every input is also checked for identical
+output first — tools/sexpr_conformance.py is the thorough check.
+
+Usage, from platform/api:
+    python tools/sexpr_bench.py
+    python tools/sexpr_bench.py --repeat 5 ~/kicad/board.kicad_pcb
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from sexpr_conformance import reference_parse_sexp  # noqa: E402 — after the sys.path lines above
+
+from kiutils.utils import sexpr  # noqa: E402
+
+
+def _uuid(rng: random.Random) -> str:
+    return "%08x-%04x-%04x-%04x-%012x" % tuple(rng.getrandbits(b) for b in (32, 16, 16, 16, 48))
+
+
+def synthetic_board(rng: random.Random, footprints: int = 800, segments: int = 40_000) -> str:
+    out = ['(kicad_pcb\n\t(version 20240108)\n\t(generator "pcbnew")\n\t(generator_version "8.0")\n'
+           '\t(general\n\t\t(thickness 1.6)\n\t\t(legacy_teardrops no)\n\t)\n\t(paper "A4")']
+    for i in range(footprints):
+        layer = rng.choice(["F.Cu", "B.Cu"])
+        pads = "".join(
+            f'\n\t\t(pad "{k}" smd roundrect\n'
+            f'\t\t\t(at {rng.uniform(-3, 3):.4f} {rng.uniform(-3, 3):.4f} {rng.choice([0, 90])})\n'
+            f'\t\t\t(size {rng.uniform(.2, 2):.3f} {rng.uniform(.2, 2):.3f})\n'
+            f'\t\t\t(layers "{layer}" "F.Mask" "F.Paste")\n'
+            f'\t\t\t(roundrect_rratio 0.25)\n'
+            f'\t\t\t(net {k} "Net-(U{i}-Pad{k})")\n'
+            f'\t\t\t(uuid "{_uuid(rng)}")\n\t\t)'
+            for k in range(1, rng.randint(2, 30)))
+        out.append(
+            f'\n\t(footprint "7Sigma:FP_{i}"\n\t\t(layer "{layer}")\n\t\t(uuid "{_uuid(rng)}")\n'
+            f'\t\t(at {rng.uniform(0, 100):.4f} {rng.uniform(0, 80):.4f} {rng.choice([0, 90, 180, 270])})\n'
+            f'\t\t(property "Reference" "U{i}"\n\t\t\t(at 0 -2 0)\n\t\t\t(layer "F.SilkS")\n'
+            f'\t\t\t(effects\n\t\t\t\t(font\n\t\t\t\t\t(size 1 1)\n\t\t\t\t\t(thickness 0.15)\n'
+            f'\t\t\t\t)\n\t\t\t)\n\t\t)\n'
+            f'\t\t(property "Value" "10k \\"0402\\""\n\t\t\t(at 0 2 0)\n\t\t\t(layer "F.Fab")\n\t\t)\n'
+            f'\t\t(fp_line\n\t\t\t(start -1 -1)\n\t\t\t(end 1 -1)\n'
+            f'\t\t\t(stroke\n\t\t\t\t(width 0.05)\n\t\t\t\t(type solid)\n\t\t\t)\n\t\t\t(layer "F.CrtYd")\n\t\t)\n'
+            f'\t\t(attr smd){pads}\n\t)')
+    for i in range(segments):
+        out.append(
+            f'\n\t(segment\n\t\t(start {rng.uniform(0, 100):.4f} {rng.uniform(0, 80):.4f})\n'
+            f'\t\t(end {rng.uniform(0, 100):.4f} {rng.uniform(0, 80):.4f})\n\t\t(width 0.2)\n'
+            f'\t\t(layer "F.Cu")\n\t\t(net {i % 300})\n\t\t(uuid "{_uuid(rng)}")\n\t)')
+    points = "\n".join(f"\t\t\t\t(xy {rng.uniform(0, 100):.3f} {rng.uniform(0, 80):.3f})" for _ in range(20_000))
+    out.append(f'\n\t(zone\n\t\t(net 1)\n\t\t(net_name "GND")\n\t\t(layer "F.Cu")\n'
+               f'\t\t(polygon\n\t\t\t(pts\n{points}\n\t\t\t)\n\t\t)\n\t)\n)\n')
+    return "".join(out)
+
+
+def _pin(rng: random.Random, number: int) -> str:
+    return (f'\t\t\t(pin passive line\n\t\t\t\t(at {rng.choice([-5.08, 5.08])} {number * 2.54:g} 0)\n'
+            f'\t\t\t\t(length 2.54)\n\t\t\t\t(name "P{number}"\n\t\t\t\t\t(effects\n\t\t\t\t\t\t(font\n'
+            f'\t\t\t\t\t\t\t(size 1.27 1.27)\n\t\t\t\t\t\t)\n\t\t\t\t\t)\n\t\t\t\t)\n'
+            f'\t\t\t\t(number "{number}"\n\t\t\t\t\t(effects\n\t\t\t\t\t\t(font\n'
+            f'\t\t\t\t\t\t\t(size 1.27 1.27)\n\t\t\t\t\t\t)\n\t\t\t\t\t)\n\t\t\t\t)\n\t\t\t)\n')
+
+
+def _symbol(rng: random.Random, name: str, indent: str) -> str:
+    props = "".join(
+        f'{indent}\t(property "{key}" "{value}"\n{indent}\t\t(at 0 {rng.uniform(-5, 5):.2f} 0)\n'
+        f'{indent}\t\t(effects\n{indent}\t\t\t(font\n{indent}\t\t\t\t(size 1.27 1.27)\n{indent}\t\t\t)\n'
+        f'{indent}\t\t\t(hide yes)\n{indent}\t\t)\n{indent}\t)\n'
+        for key, value in (("Reference", "U"), ("Value", name), ("Footprint", f"7Sigma:{name}"),
+                           ("Datasheet", f"https://example.com/{name}.pdf"), ("MPN", f"{name}-TR")))
+    pins = "".join(_pin(rng, n) for n in range(1, rng.randint(2, 48)))
+    return (f'{indent}(symbol "{name}"\n{indent}\t(exclude_from_sim no)\n{indent}\t(in_bom yes)\n'
+            f'{indent}\t(on_board yes)\n{props}{indent}\t(symbol "{name}_1_1"\n{pins}{indent}\t)\n{indent})\n')
+
+
+def synthetic_symbol_library(rng: random.Random, symbols: int = 1500) -> str:
+    body = "".join(_symbol(rng, f"PART_{i}", "\t") for i in range(symbols))
+    return f'(kicad_symbol_lib\n\t(version 20231120)\n\t(generator "kicad_symbol_editor")\n{body})\n'
+
+
+def synthetic_schematic(rng: random.Random, symbols: int = 1500, wires: int = 20_000) -> str:
+    lib = "".join(_symbol(rng, f"7Sigma:PART_{i}", "\t\t") for i in range(40))
+    out = [f'(kicad_sch\n\t(version 20231120)\n\t(generator "eeschema")\n\t(uuid "{_uuid(rng)}")\n'
+           f'\t(paper "A3")\n\t(lib_symbols\n{lib}\t)']
+    for i in range(symbols):
+        out.append(
+            f'\n\t(symbol\n\t\t(lib_id "7Sigma:PART_{i % 40}")\n'
+            f'\t\t(at {rng.uniform(0, 400):.2f} {rng.uniform(0, 280):.2f} 0)\n\t\t(unit 1)\n'
+            f'\t\t(uuid "{_uuid(rng)}")\n\t\t(property "Reference" "U{i}"\n\t\t\t(at 0 0 0)\n\t\t)\n'
+            f'\t\t(property "Value" "PART_{i % 40}"\n\t\t\t(at 0 2.54 0)\n\t\t)\n\t)')
+    for _ in range(wires):
+        out.append(
+            f'\n\t(wire\n\t\t(pts\n\t\t\t(xy {rng.uniform(0, 400):.2f} {rng.uniform(0, 280):.2f})'
+            f' (xy {rng.uniform(0, 400):.2f} {rng.uniform(0, 280):.2f})\n\t\t)\n'
+            f'\t\t(stroke\n\t\t\t(width 0)\n\t\t\t(type default)\n\t\t)\n\t\t(uuid "{_uuid(rng)}")\n\t)')
+    out.append("\n)\n")
+    return "".join(out)
+
+
+def _best_of(parse, text: str, repeat: int) -> float:
+    # Time with the GC on, as a real caller has it: parse_sexp pauses it
+    # itself and that is part of what is measured.
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="*", type=Path, help="KiCad files to time (default: synthetic ones)")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs (default 3)")
+    args = parser.parse_args()
+
+    if args.files:
+        inputs = [(p.name, p.read_text(encoding="utf-8")) for p in args.files]
+    else:
+        rng = random.Random(0)
+        inputs = [("synthetic board", synthetic_board(rng)),
+                  ("synthetic schematic", synthetic_schematic(rng)),
+                  ("synthetic symbol library", synthetic_symbol_library(rng))]
+
+    print(f"python {sys.version.split()[0]}")
+    for name, text in inputs:
+        if repr(sexpr.parse_sexp(text)) != repr(reference_parse_sexp(text)):
+            print(f"{name}: OUTPUT DIFFERS from the original parser")
+            return 1
+        gc.collect()
+        old = _best_of(reference_parse_sexp, text, args.repeat)
+        new = _best_of(sexpr.parse_sexp, text, args.repeat)
+        print(f"{name:<28} {len(text) / 1e6:6.1f} MB   original {old:6.2f} s   "
+              f"parse_sexp {new:6.2f} s   {old / new:4.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
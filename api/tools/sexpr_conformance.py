@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Check kiutils' parse_sexp against the original rosettacode parser.
+
+parse_sexp was rewritten for speed with the promise of exactly the old
+output for every input, including the grammar's quirks (numbers only before a
+space or `)`, `\\"` inside strings, dropped `^`, the nesting assertion). This
+script holds the old parser verbatim and compares the two on:
+
+  * a fixed corpus of edge cases,
+  * random s-expressions built from awkward atoms and separators (with the
+    odd character deleted, so malformed input is covered too),
+  * any KiCad files given on the command line.
+
+Two results agree when their reprs are equal (so 1.0 vs "1.0" is a
+difference) or when both raise the same exception type.
+
+Usage, from platform/api:
+    python tools/sexpr_conformance.py
+    python tools/sexpr_conformance.py --cases 200000 --seed 7 ~/kicad/*.kicad_pcb
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kiutils.utils import sexpr  # noqa: E402 — after the sys.path line above
+
+# ---- The parser as it was before the rewrite, unchanged ---------------------
+
+term_regex = r"""(?mx)
+    \s*(?:
+        (?P<brackl>\()|
+        (?P<brackr>\))|
+        (?P<num>[+-]?\d+\.\d+(?=[\ \)])|\-?\d+(?=[\ \)]))|
+        (?P<sq>"(?:[^"]|(?<=\\)")*"(?:(?=\))|(?=\s)))|
+        (?P<s>[^(^)\s]+)
+       )"""
+
+
+def reference_parse_sexp(sexp):
+    stack = []
+    out = []
+    for termtypes in re.finditer(term_regex, sexp):
+        term, value = [(t, v) for t, v in termtypes.groupdict().items() if v][0]
+        if term == "brackl":
+            stack.append(out)
+            out = []
+        elif term == "brackr":
+            assert stack, "Trouble with nesting of brackets"
+            tmpout, out = out, stack.pop(-1)
+            out.append(tmpout)
+        elif term == "num":
+            out.append(float(value))
+        elif term == "sq":
+            out.append(value[1:-1].replace(r"\"", '"'))
+        elif term == "s":
+            out.append(value)
+        else:
+            raise NotImplementedError("Error: (%r, %r)" % (term, value))
+    assert not stack, "Trouble with nesting of brackets"
+    return out[0]
+
+
+# ---- Inputs -----------------------------------------------------------------
+
+CORPUS = [
+    "", " ", "\n", "()", "(a)", "(a b c)", "((a) (b))", "(a", "a)", "(a))", ")(",
+    "(at 1 2)", "(at 1.0 2.5)", "(at 1.0\n2.5)", "(at 1.0\t2.5 )", "(at 1.0)", "(at -0 +1 -2.50)",
+    "(at +1)", "(at 1.)", "(at .5)", "(at 1e5)", "(at 007 00.5)", "(x 1\r\n2\r3 )", "(x 1(y))",
+    '(p "a b")', '(p "")', '(p "q\\"q")', '(p "a\\")', '(p "(x)")', '(p "x"y)', '(p x"y")',
+    '(p "x"\n)', '(p "x""y")', '(p "µΩ")', '(p "\\n")', '(p "^")', "(p ^)", "(p a^b)", "(p ^a)",
+    "(p ٣)", "(p ١٫٥ )", "(p a\\b)", "(p \x00 \x01 \x02)", '(p "\x01")', '("a")', '(p "a)',
+    "(p [a] {b} ,)", "(p\x0b1 )", "(p\x0c1 )", "(p 1\x0b)", "(p\u20281 )", "(p 1\u2028)",
+]
+
+ATOMS = [
+    "1", "-2", "+3", "1.5", "-0.25", "+1.0", "007", "0", "-0", "00.5", "0.5", "1.", ".5", "1e5",
+    "abc", "F.Cu", "-", "+", "a1", "1a", "^", "٣", "a\\b", "[", "]", ",", "{", "null", "true",
+    '"x"', '""', '"a b"', '"q\\"q"', '"(p)"', '"\\\\"', '"\\n"', '"µΩ"', '"^"', '"a\\"',
+    '"\\u0001"', '"\t"',
+]
+SEPARATORS = [" ", " ", " ", "  ", "\n", "\n\t", "\t", "\r\n", "\r"]
+KEYWORDS = ["at", "xy", "pad", "layers", "property"]
+
+
+def _random_node(rng: random.Random, depth: int = 0) -> str:
+    items = [rng.choice(KEYWORDS)]
+    for _ in range(rng.randint(0, 5)):
+        if depth < 4 and rng.random() < 0.3:
+            items.append(_random_node(rng, depth + 1))
+        else:
+            items.append(rng.choice(ATOMS))
+    text = items[0]
+    for item in items[1:]:
+        # Now and then no separator at all, which glues tokens together.
+        text += (rng.choice(SEPARATORS) if rng.random() < 0.97 else "") + item
+    return "(" + text + ")"
+
+
+def random_cases(seed: int, count: int):
+    rng = random.Random(seed)
+    for _ in range(count):
+        text = rng.choice(["", " ", "\n"]) + _random_node(rng) + rng.choice(["", "\n", " (x)", ")", "("])
+        if rng.random() < 0.05:
+            cut = rng.randrange(len(text))
+            text = text[:cut] + text[cut + 1:]
+        yield text
+
+
+# ---- Comparison -------------------------------------------------------------
+
+def _outcome(parse, text: str):
+    try:
+        return "ok", repr(parse(text))
+    except Exception as exc:  # noqa: BLE001 — the exception type is the result
+        return "raised", type(exc).__name__
+
+
+def compare(text: str) -> tuple[tuple[str, str], tuple[str, str]] | None:
+    """Return (old, new) outcomes when they differ, else None."""
+    old = _outcome(reference_parse_sexp, text)
+    new = _outcome(sexpr.parse_sexp, text)
+    return None if old == new else (old, new)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="*", type=Path, help="KiCad files to compare on as well")
+    parser.add_argument("--cases", type=int, default=50_000, help="random cases to generate (default 50000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    checked = differ = fast = 0
+    inputs = [(repr(t), t) for t in CORPUS]
+    inputs += [(f"random #{i}", t) for i, t in enumerate(random_cases(args.seed, args.cases))]
+    inputs += [(str(p), p.read_text(encoding="utf-8")) for p in args.files]
+    for label, text in inputs:
+        checked += 1
+        fast += _outcome(sexpr._scan_split, text) != ("ok", "None")
+        diff = compare(text)
+        if diff:
+            differ += 1
+            if differ <= 20:
+                print(f"DIFF {label}: {text[:200]!r}\n  old: {diff[0]}\n  new: {diff[1]}")
+    print(f"{checked} inputs, {differ} differ; {fast} took the split scanner")
+    return 1 if differ else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
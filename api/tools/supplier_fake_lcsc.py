@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Exercise services/supplier.lcsc_details against a fake local LCSC.
+
+Starts a threaded HTTP server on 127.0.0.1 that answers the LCSC product
+detail endpoint. The product code picks the behaviour:
+
+    OK…     200 with a product
+    NONE…   200 with `result: null` (an unknown part, a real answer)
+    SLOW…   200 after SLOW_S
+    R429…   429 with Retry-After: 1 once, then 200
+    R503…   503 twice, then 200
+    DEAD…   500 every time
+    E404…   404 (final, no retry)
+
+It points supplier.py at the server and checks:
+
+    concurrency  the fan-out keeps `supplier_concurrency` requests in flight,
+                 no more
+    pacing       request starts never outrun the token bucket
+                 (`supplier_rate_per_s`, burst of one second's worth)
+    retries      429/5xx are retried and Retry-After is honoured, 4xx is not
+                 retried, and a part that keeps failing comes back None
+    caching      answers, including "unknown part", are cached and served
+                 without a request, failures are not cached, and
+                 use_cache=False goes to the server anyway
+
+The `supplier_responses` table is swapped for a dict so no database is
+needed; what is checked is which answers lcsc_details stores and reuses.
+Needs the API's dependencies installed (it imports app.services.supplier).
+
+Usage, from platform/api:
+    python tools/supplier_fake_lcsc.py
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings  # noqa: E402 — after the sys.path line above
+from app.services import supplier  # noqa: E402
+
+SLOW_S = 0.3
+
+
+class FakeLCSC:
+    """Request log and in-flight counter shared by the handler threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.starts: list[float] = []
+        self.hits: dict[str, list[float]] = defaultdict(list)
+        self.in_flight = 0
+        self.peak = 0
+
+    def reset(self) -> None:
+        with self.lock:
+            self.starts.clear()
+            self.hits.clear()
+            self.peak = 0
+
+    def begin(self, code: str) -> int:
+        with self.lock:
+            now = time.monotonic()
+            self.starts.append(now)
+            self.hits[code].append(now)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            return len(self.hits[code])
+
+    def end(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+
+fake = FakeLCSC()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the real client pools connections
+
+    def do_GET(self):  # noqa: N802 — BaseHTTPRequestHandler's name
+        code = parse_qs(urlsplit(self.path).query).get("productCode", [""])[0]
+        attempt = fake.begin(code)
+        try:
+            if code.startswith("SLOW"):
+                time.sleep(SLOW_S)
+            if code.startswith("R429") and attempt == 1:
+                return self._send(429, {"msg": "slow down"}, {"Retry-After": "1"})
+            if code.startswith("R503") and attempt <= 2:
+                return self._send(503, {"msg": "unavailable"})
+            if code.startswith("DEAD"):
+                return self._send(500, {"msg": "boom"})
+            if code.startswith("E404"):
+                return self._send(404, {"msg": "no such page"})
+            if code.startswith("NONE"):
+                return self._send(200, {"code": 200, "result": None})
+            return self._send(200, {"code": 200, "result": {"productCode": code, "stockNumber": 1000}})
+        finally:
+            fake.end()
+
+    def _send(self, status: int, body: dict, headers: dict | None = None) -> None:
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops connects when the whole fan-out dials at
+    # once, and the SYN retransmit would show up as a one-second stall.
+    request_queue_size = 64
+
+
+# ---- Harness ----------------------------------------------------------------
+
+failures: list[str] = []
+
+
+def check(ok: bool, what: str) -> None:
+    print(f"  {'ok  ' if ok else 'FAIL'} {what}")
+    if not ok:
+        failures.append(what)
+
+
+def configure(concurrency: int, rate: float) -> None:
+    """Fresh client and buckets for the given settings, as a new process would have."""
+    settings.supplier_concurrency = concurrency
+    settings.supplier_rate_per_s = rate
+    supplier._client = None
+    supplier._buckets.clear()
+    fake.reset()
+
+
+def scenario_concurrency() -> None:
+    print(f"concurrency: 16 slow parts, supplier_concurrency=8, {SLOW_S}s each")
+    configure(concurrency=8, rate=1000)
+    start = time.monotonic()
+    out = supplier.lcsc_details([f"SLOW{i}" for i in range(16)], use_cache=False)
+    took = time.monotonic() - start
+    check(all(out[f"SLOW{i}"] for i in range(16)), "every part answered")
+    check(fake.peak == 8, f"peak in flight is 8 (got {fake.peak})")
+    check(took < 4 * SLOW_S, f"two waves, not sixteen ({took:.2f}s)")
+
+
+def scenario_pacing() -> None:
+    rate = 5.0
+    print(f"pacing: 20 parts at supplier_rate_per_s={rate:g}, supplier_concurrency=8")
+    configure(concurrency=8, rate=rate)
+    called = time.monotonic()
+    supplier.lcsc_details([f"OK{i}" for i in range(20)], use_cache=False)
+    # The bucket starts full (one second's worth), then admits `rate` a
+    # second: request i is due (i + 1 - rate) / rate after the call.
+    starts = [t - called for t in sorted(fake.starts)]
+    early = [i for i, t in enumerate(starts) if t < (i + 1 - rate) / rate]
+    check(not early, f"no request before its token was due (early: {early})")
+    due = (len(starts) - rate) / rate
+    check(starts[-1] < due + 0.5, f"and no needless waiting: last at {starts[-1]:.2f}s, due {due:.2f}s")
+
+
+def scenario_retries() -> None:
+    print(f"retries: RETRIES={supplier.RETRIES}, BACKOFF_S={supplier.BACKOFF_S:g}")
+    configure(concurrency=8, rate=1000)
+    out = supplier.lcsc_details(["R4291", "R5031", "DEAD1", "E4041"], use_cache=False)
+    h = fake.hits
+    check(len(h["R4291"]) == 2 and out["R4291"] is not None, "429 retried once, then answered")
+    gap = h["R4291"][1] - h["R4291"][0] if len(h["R4291"]) == 2 else 0.0
+    check(gap >= 0.95, f"Retry-After: 1 honoured ({gap:.2f}s between attempts)")
+    check(len(h["R5031"]) == 3 and out["R5031"] is not None, "503 retried twice, then answered")
+    check(len(h["DEAD1"]) == supplier.RETRIES + 1 and out["DEAD1"] is None,
+          f"500 tried {supplier.RETRIES + 1} times, then None")
+    check(len(h["E4041"]) == 1 and out["E4041"] is None, "404 not retried")
+
+
+def scenario_caching() -> None:
+    print("caching: dict-backed supplier_responses")
+    store: dict[str, dict | None] = {}
+    real = supplier._cached, supplier._store
+    supplier._cached = lambda keys: {k: store[k] for k in keys if k in store}
+    supplier._store = store.update
+    try:
+        configure(concurrency=8, rate=1000)
+        codes = ["OK1", "NONE1", "DEAD1", "E4041"]
+        first = supplier.lcsc_details(codes)
+        check(first["OK1"] is not None and first["NONE1"] is None, "first call answered from the server")
+        check(set(store) == {"lcsc:detail:OK1", "lcsc:detail:NONE1"},
+              f"answers cached, failures not ({sorted(store)})")
+        fake.reset()
+        second = supplier.lcsc_details(codes)
+        check(second["OK1"] == first["OK1"] and second["NONE1"] is None, "second call gives the same answers")
+        check("OK1" not in fake.hits and "NONE1" not in fake.hits, "cached parts made no request")
+        check("DEAD1" in fake.hits and "E4041" in fake.hits, "failed parts were asked again")
+        fake.reset()
+        supplier.lcsc_details(["OK1"], use_cache=False)
+        check(len(fake.hits["OK1"]) == 1, "use_cache=False went to the server")
+    finally:
+        supplier._cached, supplier._store = real
+
+
+def main() -> int:
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    supplier.LCSC_DETAIL_URL = f"http://127.0.0.1:{server.server_port}/ftps/wm/product/detail?productCode={{}}"
+    supplier.BACKOFF_S = 0.05  # keep the retry scenarios short; Retry-After still wins
+    try:
+        for scenario in (scenario_concurrency, scenario_pacing, scenario_retries, scenario_caching):
+            scenario()
+    finally:
+        server.shutdown()
+    print(f"{len(failures)} failed" if failures else "all checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
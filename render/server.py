@@ -4,12 +4,21 @@ Runs inside the official KiCad Docker image so previews are pixel-exact
 KiCad output.
 POST /render {kind: symbol|footprint|footprint3d, name, source_text, theme}
   -> SVG (symbol/footprint) or binary GLB board view (footprint3d).
+POST /render-batch {kind: symbol|footprint, theme, items: [{name, source_text}]}
+  -> {"results": [{name, svg} | {name, error}]} in item order — one kicad-cli
+  launch per batch instead of one per item.
 footprint3d needs SEVENSIGMA_DIR pointing at the mounted mirror (3D models).
+
+Every kicad-cli launch takes one of RENDER_WORKERS slots (default: CPU
+count), so a burst of requests queues here instead of starting dozens of
+KiCad processes at once; /health reports the queue.
 """
 import os
 import re
 import subprocess
 import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException
@@ -24,6 +33,36 @@ DATA_ROOT = Path(os.environ.get("DATA_ROOT", "/data"))
 
 app = FastAPI(title="kicad-render")
 
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", "0")) or os.cpu_count() or 1
+_slots = threading.BoundedSemaphore(RENDER_WORKERS)
+_stats_lock = threading.Lock()
+_stats = {"queued": 0, "running": 0, "completed": 0, "failed": 0, "batches": 0, "batch_items": 0}
+
+
+@contextmanager
+def _slot():
+    """Hold one kicad-cli slot for the duration of the block."""
+    with _stats_lock:
+        _stats["queued"] += 1
+    _slots.acquire()
+    with _stats_lock:
+        _stats["queued"] -= 1
+        _stats["running"] += 1
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        _slots.release()
+        with _stats_lock:
+            _stats["running"] -= 1
+            _stats["completed" if ok else "failed"] += 1
+
+
+def _run_cli(cmd: list[str], timeout: int = 150) -> subprocess.CompletedProcess:
+    with _slot():
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+
 _COORD_RE = re.compile(r"\((?:at|start|end|xy|center|mid)\s+(-?\d+(?:\.\d+)?)\s+(-?\d+(?:\.\d+)?)")
 _FOOTPRINT_HEADER_RE = re.compile(r'^(\(footprint\s+"[^"]+")')
 
@@ -56,7 +95,8 @@ class RenderRequest(BaseModel):
 
 @app.get("/health")
 def health():
-    return {"ok": True}
+    with _stats_lock:
+        return {"ok": True, "workers": RENDER_WORKERS, **_stats}
 
 
 @app.post("/render")
@@ -86,7 +126,7 @@ def render(req: RenderRequest):
                 "--include-silkscreen", "--include-soldermask", "--force",
                 "-o", str(out / "render.glb"), str(board),
             ]
-        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=150)
+        proc = _run_cli(cmd)
         want = "*.glb" if req.kind == "footprint3d" else "*.svg"
         outputs = sorted(out.glob(want))
         if proc.returncode != 0 or not outputs:
@@ -97,6 +137,144 @@ def render(req: RenderRequest):
         return Response(content=outputs[0].read_bytes(), media_type=media)
 
 
+# ------------------------------------------------------------------- batches
+
+class BatchItem(BaseModel):
+    name: str
+    source_text: str
+
+
+class BatchRequest(BaseModel):
+    kind: str  # "symbol" | "footprint"
+    theme: str = ""
+    items: list[BatchItem]
+
+
+# Structure of an s-expression: parens, and whole quoted strings (so a paren
+# inside one is skipped). Enough to cut a library into its root children.
+_SEXP_RE = re.compile(r'"(?:\\.|[^"\\])*"|[()]')
+_SYMBOL_HEAD_RE = re.compile(r'\(\s*symbol\s+"((?:\\.|[^"\\])*)"')
+# What kicad-cli cannot put in a file name (wxPATH_DOS forbidden chars); it
+# writes a space instead, and lower-cases symbol names.
+_FILENAME_FORBIDDEN_RE = re.compile(r'[\\/:*?"<>|]')
+
+
+def _root_symbols(lib_text: str) -> list[tuple[str, str]]:
+    """[(name, text)] for the `(symbol ...)` children of a .kicad_sym root."""
+    out = []
+    depth = 0
+    start = -1
+    for m in _SEXP_RE.finditer(lib_text):
+        tok = m.group()
+        if tok == "(":
+            depth += 1
+            if depth == 2:
+                start = m.start()
+        elif tok == ")":
+            if depth == 2 and start >= 0:
+                chunk = lib_text[start : m.end()]
+                head = _SYMBOL_HEAD_RE.match(chunk)
+                if head:
+                    out.append((head.group(1), chunk))
+                start = -1
+            depth -= 1
+    return out
+
+
+def _output_stem(kind: str, name: str) -> str:
+    return _FILENAME_FORBIDDEN_RE.sub(" ", name).lower() if kind == "symbol" else name.lower()
+
+
+def _groups(kind: str, items: list[BatchItem]) -> list[list[int]]:
+    """Split item indexes into groups that can share one library: no two
+    members may define the same symbol/footprint or write the same output
+    file. A proposal's draft and current version share a name, so they always
+    land in different groups."""
+    groups: list[tuple[list[int], set[str]]] = []
+    for i, item in enumerate(items):
+        if kind == "symbol":
+            keys = {_output_stem(kind, n) for n, _ in _root_symbols(item.source_text)}
+        else:
+            keys = {_output_stem(kind, item.name)}
+        for members, taken in groups:
+            if not keys & taken:
+                members.append(i)
+                taken |= keys
+                break
+        else:
+            groups.append(([i], set(keys)))
+    return [members for members, _ in groups]
+
+
+def _pick_output(kind: str, name: str, outputs: list[Path]) -> Path | None:
+    """The SVG kicad-cli wrote for `name` — the first of its unit/De Morgan
+    variants, which is what a single-item render returns."""
+    stem = _output_stem(kind, name)
+    pattern = re.compile(re.escape(stem) + (r"(?:_unit\d+)?(?:_demorgan)?" if kind == "symbol" else ""))
+    matches = [p for p in outputs if pattern.fullmatch(p.stem.lower())]
+    return sorted(matches)[0] if matches else None
+
+
+def _render_group(kind: str, theme: str, items: list[BatchItem]) -> list[str | None]:
+    """One kicad-cli export for a whole group. None for an item whose output
+    could not be found — the caller renders it on its own."""
+    with tempfile.TemporaryDirectory() as td:
+        tmp = Path(td)
+        out = tmp / "out"
+        out.mkdir()
+        theme_args = ["-t", theme] if theme else []
+        if kind == "symbol":
+            chunks = [chunk for item in items for _, chunk in _root_symbols(item.source_text)]
+            # version/generator header of the first source, every symbol after it
+            first = items[0].source_text
+            header_end = first.find("(symbol")
+            header = first[:header_end].rstrip() if header_end > 0 else "(kicad_symbol_lib"
+            src = tmp / "render.kicad_sym"
+            src.write_text(header + "\n" + "\n".join(chunks) + "\n)\n", encoding="utf-8")
+            cmd = [KICAD_CLI, "sym", "export", "svg", *theme_args, "-o", str(out), str(src)]
+        else:
+            pretty = tmp / "render.pretty"
+            pretty.mkdir()
+            for item in items:
+                (pretty / f"{item.name}.kicad_mod").write_text(item.source_text, encoding="utf-8")
+            cmd = [KICAD_CLI, "fp", "export", "svg", *theme_args, "-o", str(out), str(pretty)]
+        _run_cli(cmd, timeout=300)
+        outputs = sorted(out.glob("*.svg"))
+        picked = [_pick_output(kind, item.name, outputs) for item in items]
+        return [p.read_text(encoding="utf-8") if p is not None else None for p in picked]
+
+
+@app.post("/render-batch")
+def render_batch(req: BatchRequest):
+    if req.kind not in ("symbol", "footprint"):
+        raise HTTPException(422, "kind must be symbol or footprint")
+    with _stats_lock:
+        _stats["batches"] += 1
+        _stats["batch_items"] += len(req.items)
+    results: list[dict | None] = [None] * len(req.items)
+    for members in _groups(req.kind, req.items):
+        group = [req.items[i] for i in members]
+        try:
+            svgs = _render_group(req.kind, req.theme, group) if len(group) > 1 else [None]
+        except subprocess.TimeoutExpired:
+            svgs = [None] * len(group)
+        for i, svg in zip(members, svgs):
+            if svg is not None:
+                results[i] = {"name": req.items[i].name, "svg": svg}
+    # Whatever the shared export did not produce — a lone item, a source the
+    # merged library could not carry, a kicad-cli failure — goes through the
+    # single-item path, which also yields the same error text /render would.
+    for i, item in enumerate(req.items):
+        if results[i] is None:
+            try:
+                resp = render(RenderRequest(kind=req.kind, name=item.name,
+                                            source_text=item.source_text, theme=req.theme))
+                results[i] = {"name": item.name, "svg": resp.body.decode("utf-8")}
+            except HTTPException as e:
+                results[i] = {"name": item.name, "error": str(e.detail)}
+    return {"results": results}
+
+
 class ProjectRenderRequest(BaseModel):
     """op on a project file under the shared /data volume (path is relative
     to it, e.g. checkouts/3/<sha>/pcb/zenith.kicad_pcb). gerber_svg: path is
@@ -117,10 +295,11 @@ def render_project(req: ProjectRenderRequest):
         raise HTTPException(422, "path escapes the data root")
     with tempfile.TemporaryDirectory() as td:
         try:
-            data, media = run_op(
-                KICAD_CLI, req.op, src, td,
-                variant=req.variant, layer=req.layer, theme=req.theme, files=req.files,
-            )
+            with _slot():
+                data, media = run_op(
+                    KICAD_CLI, req.op, src, td,
+                    variant=req.variant, layer=req.layer, theme=req.theme, files=req.files,
+                )
         except OpError as e:
             raise HTTPException(500, str(e)) from e
         return Response(content=data, media_type=media)
@@ -821,6 +821,8 @@ export interface DatasheetFetchStatus {
   mode: string | null;
   done: number;
   total: number;
+  /** Supplier hosts in the run, each fetched from serially. */
+  domains: number;
   new_versions: number;
   unchanged: number;
   errors: number;
@@ -1396,6 +1398,8 @@ export interface MaterialDiff {
   suggest_recheck: boolean;
   affected_components: number;
   affected_signed: number;
+  // Projects whose latest snapshot places an affected component.
+  affected_projects: { project_id: number; project_name: string; ref: string; components: string[] }[];
 }
 
 export function getMaterialDiff(
@@ -1854,7 +1858,13 @@ export interface CurvePoint {
   extra_per_device: number | null;
   cost_per_device: number | null;
   run_total: number | null;
+  order_parts_total: number | null;
+  // What the run costs to order: parts as bought (MOQ / multiples) + cost items.
+  order_total: number | null;
   unpriced_lines: number;
+  // Largest volume up to twice this one whose order costs no more (tier break / MOQ).
+  better_volume: number | null;
+  better_order_total: number | null;
 }
 
 export function getBomCurve(
@@ -25,6 +25,10 @@ import CostCurve from "./CostCurve";
 
 import { price as money } from "../../format";
 
+// Dense enough that tier breaks and MOQs show up between points; the API
+// caps a curve at 60 volumes.
+const CURVE_VOLUMES = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000];
+
 interface Props {
   project: ProjectInfo;
   snapshot: SnapshotInfo;
@@ -70,7 +74,7 @@ export default function BomTab({ project, snapshot, snapshots, board, variant }:
         setError(errorMessage(err));
         setLoading(false);
       });
-    getBomCurve(snapshot.id, board, variant, [1, 10, 100, 1000], currency, ctrl.signal)
+    getBomCurve(snapshot.id, board, variant, CURVE_VOLUMES, currency, ctrl.signal)
       .then(setCurve)
       .catch(() => setCurve(null));
     return () => ctrl.abort();
@@ -1,6 +1,8 @@
 /** Cost-vs-volume curve: unit cost per device across production volumes.
  *  Single series → no legend (the title names it); endpoint direct-labeled;
- *  crosshair + tooltip on hover; values table below carries every number. */
+ *  crosshair + tooltip on hover; values table below carries every number.
+ *  A volume where building more is the cheaper order (a tier break or MOQ
+ *  within 2×, `better_volume`) gets a warn-coloured dot and a table pill. */
 import { useMemo, useRef, useState } from "react";
 import type { CurvePoint } from "../../api";
 
@@ -96,7 +98,7 @@ export default function CostCurve({ points, currency }: { points: CurvePoint[];
         {xs.map((x, i) => (
           <circle
             key={data[i].volume}
-            className={`chart-dot${hover === i ? " on" : ""}`}
+            className={`chart-dot${data[i].better_volume ? " better" : ""}${hover === i ? " on" : ""}`}
             cx={x}
             cy={ys[i]}
             r={4}
@@ -113,6 +115,9 @@ export default function CostCurve({ points, currency }: { points: CurvePoint[];
             {fmtMoney(data[hover].device_total, currency)}/device · parts{" "}
             {fmtMoney(data[hover].bom_per_device, currency)} · costs{" "}
             {fmtMoney(data[hover].cost_per_device, currency)}
+            {data[hover].better_volume
+              ? ` · ${data[hover].better_volume!.toLocaleString()} pcs cost no more to order`
+              : ""}
           </span>
         </div>
       ) : null}
@@ -126,6 +131,8 @@ export default function CostCurve({ points, currency }: { points: CurvePoint[];
               <th className="num">Costs / device</th>
               <th className="num">Total / device</th>
               <th className="num">Run total</th>
+              <th className="num">Order total</th>
+              <th>Build more?</th>
             </tr>
           </thead>
           <tbody>
@@ -137,6 +144,17 @@ export default function CostCurve({ points, currency }: { points: CurvePoint[];
                 <td className="num">{fmtMoney(p.cost_per_device, currency)}</td>
                 <td className="num">{fmtMoney(p.device_total, currency)}</td>
                 <td className="num">{fmtMoney(p.run_total, currency)}</td>
+                <td className="num">{fmtMoney(p.order_total, currency)}</td>
+                <td>
+                  {p.better_volume ? (
+                    <span
+                      className="pill warn"
+                      title="Tier breaks and MOQs make this larger order cost no more"
+                    >
+                      {p.better_volume.toLocaleString()} pcs · {fmtMoney(p.better_order_total, currency)}
+                    </span>
+                  ) : null}
+                </td>
               </tr>
             ))}
           </tbody>